@@ -1,5 +1,22 @@
 """Agent implementations for AI-powered evaluation configuration."""
 
 from app.agents.evaluation_agent import EvaluationAgent
+from app.agents.intent_classifier import (
+    IntentClassifier,
+    IntentPrediction,
+    LexiconIntentClassifier,
+)
+from app.agents.llm_client import LLMClient, LLMError
+from app.agents.local_recommender import LocalRecommender
+from app.agents.retrieval import CatalogRetriever
 
-__all__ = ["EvaluationAgent"]
+__all__ = [
+    "CatalogRetriever",
+    "EvaluationAgent",
+    "IntentClassifier",
+    "IntentPrediction",
+    "LexiconIntentClassifier",
+    "LLMClient",
+    "LLMError",
+    "LocalRecommender",
+]
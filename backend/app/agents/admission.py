@@ -0,0 +1,208 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from app.agents.llm_client import LLMError, LLMOverloadedError
+from app.config import settings
+from app.metrics import LLM_CONCURRENCY_LIMIT, LLM_QUEUE_LENGTH, LLM_REJECTED
+
+# Weight of the newest latency in the moving average used to predict queue waits.
+LATENCY_EWMA_WEIGHT = 0.1
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for LLM calls, with a bounded FIFO wait queue.
+
+    The limit grows by about one per limit's worth of successful calls while
+    it is in use, and shrinks by ``backoff`` when a call is congested: it
+    fails with a transient error or takes longer than ``latency_threshold``.
+    Only calls started after the previous decrease can shrink it again, so
+    one slow burst lowers it once rather than once per call in the burst.
+
+    Calls over the limit wait in the queue. A call is rejected with
+    :class:`LLMOverloadedError` straight away when the queue is full or its
+    predicted wait exceeds what it may wait, and after waiting that long
+    otherwise, so overload turns into quick 503s instead of every request
+    timing out together.
+    """
+
+    def __init__(
+        self,
+        initial_limit: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        backoff: Optional[float] = None,
+        latency_threshold_ms: Optional[float] = None,
+        max_queue: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ) -> None:
+        """Initialize the limiter; every option defaults to its ``settings.llm_*`` value.
+
+        Args:
+            initial_limit: Concurrent calls allowed at start
+            min_limit: Lower bound of the limit
+            max_limit: Upper bound of the limit
+            backoff: Factor applied to the limit on congestion
+            latency_threshold_ms: Call duration above which a call counts as congested
+            max_queue: Calls allowed to wait for a slot
+            max_wait_ms: Longest a call may wait for a slot
+        """
+
+        def pick(value, default):
+            return default if value is None else value
+
+        self.min_limit = pick(min_limit, settings.llm_concurrency_min)
+        self.max_limit = pick(max_limit, settings.llm_concurrency_max)
+        self.limit = float(pick(initial_limit, settings.llm_concurrency_initial))
+        self.backoff = pick(backoff, settings.llm_concurrency_backoff)
+        self.latency_threshold = (
+            pick(latency_threshold_ms, settings.llm_concurrency_latency_threshold_ms) / 1000
+        )
+        self.max_queue = pick(max_queue, settings.llm_queue_max)
+        self.max_wait = pick(max_wait_ms, settings.llm_queue_max_wait_ms) / 1000
+        self.inflight = 0
+        self.mean_latency: Optional[float] = None
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self._last_decrease = 0.0
+        self.admitted = 0
+        self.queued_total = 0
+        self.decreases = 0
+        self.rejected: Dict[str, int] = {}
+        self._publish()
+
+    @property
+    def current_limit(self) -> int:
+        """The whole number of calls currently allowed in flight."""
+        return max(self.min_limit, int(self.limit))
+
+    def has_capacity(self) -> bool:
+        """Whether a call would be admitted without waiting."""
+        return not self._waiters and self.inflight < self.current_limit
+
+    def expected_wait(self) -> Optional[float]:
+        """Predicted seconds a call joining the queue now would wait, if latency is known."""
+        if self.mean_latency is None:
+            return None
+        return self.mean_latency * (len(self._waiters) + 1) / self.current_limit
+
+    @asynccontextmanager
+    async def admit(
+        self, wait: bool = True, timeout: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """Hold a slot for the duration of one LLM call.
+
+        Args:
+            wait: Queue for a slot when none is free, instead of failing at once
+            timeout: Seconds left before the caller's deadline, capping the wait
+
+        Raises:
+            LLMOverloadedError: If no slot can be had in time
+        """
+        await self._acquire(wait, timeout)
+        started = time.perf_counter()
+        try:
+            yield
+        except LLMError as e:
+            self._release(started, congested=e.transient)
+            raise
+        except BaseException:
+            # Cancelled (a lost hedge, the deadline) or failed for unrelated reasons.
+            self._release(started, congested=None)
+            raise
+        else:
+            slow = time.perf_counter() - started > self.latency_threshold
+            self._release(started, congested=slow)
+
+    async def _acquire(self, wait: bool, timeout: Optional[float]) -> None:
+        if self.has_capacity():
+            self.inflight += 1
+            self.admitted += 1
+            self._publish()
+            return
+        max_wait = self.max_wait if timeout is None else min(self.max_wait, timeout)
+        if not wait:
+            self._reject("no_capacity", "No LLM capacity for an extra call")
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full", f"LLM wait queue is full ({self.max_queue} requests)")
+        expected = self.expected_wait()
+        if expected is not None and expected > max_wait:
+            self._reject(
+                "predicted_wait", f"LLM queue wait of ~{expected:.1f}s exceeds {max_wait:.1f}s"
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        self._publish()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), max(max_wait, 0))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # The slot was granted just as the wait ended: hand it on.
+                self._release(time.perf_counter(), congested=None)
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+                self._publish()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject("wait_timeout", f"No LLM capacity within {max_wait:.1f}s")
+        self.admitted += 1
+
+    def _release(self, started: float, congested: Optional[bool]) -> None:
+        self.inflight -= 1
+        elapsed = time.perf_counter() - started
+        if congested is not None:
+            self._adjust(started, elapsed, congested)
+        self._dispatch()
+
+    def _adjust(self, started: float, elapsed: float, congested: bool) -> None:
+        if self.mean_latency is None:
+            self.mean_latency = elapsed
+        else:
+            self.mean_latency += LATENCY_EWMA_WEIGHT * (elapsed - self.mean_latency)
+        if congested:
+            if started >= self._last_decrease:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = time.perf_counter()
+                self.decreases += 1
+            return
+        # Only grow while the limit is what holds calls back.
+        if self._waiters or 2 * (self.inflight + 1) >= self.current_limit:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+    def _dispatch(self) -> None:
+        while self._waiters and self.inflight < self.current_limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+        self._publish()
+
+    def _reject(self, reason: str, message: str) -> None:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        LLM_REJECTED.labels(reason).inc()
+        estimate = self.expected_wait() or self.mean_latency or 1.0
+        raise LLMOverloadedError(message, retry_after=max(1, math.ceil(estimate)))
+
+    def _publish(self) -> None:
+        LLM_CONCURRENCY_LIMIT.set(self.current_limit)
+        LLM_QUEUE_LENGTH.set(len(self._waiters))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit, in-flight and queued calls, and admission counters."""
+        return {
+            "limit": self.current_limit,
+            "in_flight": self.inflight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected": dict(self.rejected),
+            "decreases": self.decreases,
+            "mean_latency_ms": (
+                None if self.mean_latency is None else round(self.mean_latency * 1000, 3)
+            ),
+        }
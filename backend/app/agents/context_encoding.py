@@ -0,0 +1,104 @@
+from typing import Callable, Optional, Sequence, Tuple
+
+from app.agents.text import estimate_tokens
+from app.models.agent import AgentModel
+from app.models.dataset import Dataset
+from app.models.metric import Metric
+from app.models.scenario import Scenario
+
+ContextEncoder = Callable[..., str]
+
+
+def truncate(text: str, limit: Optional[int]) -> str:
+    """Cut ``text`` to at most ``limit`` characters at a word boundary, marking the cut."""
+    if limit is None or len(text) <= limit:
+        return text
+    if limit <= 1:
+        return ""
+    cut = text[: limit - 1]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def _cell(value: str) -> str:
+    return value.replace("|", "/").replace("\n", " ")
+
+
+def encode_compact(
+    datasets: Sequence[Dataset],
+    metrics: Sequence[Metric],
+    scenarios: Sequence[Scenario],
+    agents: Sequence[AgentModel],
+    description_limit: Optional[int] = None,
+) -> str:
+    """Encode the resources as one ``|``-separated row per entry under a short column header.
+
+    Carries the same fields as the verbose layout without its per-field
+    labels and indentation. Empty descriptions are left as trailing ``|``.
+    """
+    lines = ["AVAILABLE RESOURCES (one row per entry, columns separated by |):"]
+
+    lines.append("DATASETS id|name|tags|desc")
+    for d in datasets:
+        desc = truncate(d.description, description_limit)
+        lines.append(f"{d.id}|{_cell(d.name)}|{_cell(','.join(d.tags))}|{_cell(desc)}")
+
+    lines.append("METRICS id|name|category|desc")
+    for m in metrics:
+        desc = truncate(m.description, description_limit)
+        lines.append(f"{m.id}|{_cell(m.name)}|{_cell(m.category)}|{_cell(desc)}")
+
+    lines.append("SCENARIOS id|name|desc")
+    for s in scenarios:
+        desc = truncate(s.description, description_limit)
+        lines.append(f"{s.id}|{_cell(s.name)}|{_cell(desc)}")
+
+    lines.append("AGENTS id|name|type")
+    for a in agents:
+        lines.append(f"{a.id}|{_cell(a.name)}|{_cell(a.type)}")
+
+    return "\n".join(lines)
+
+
+def fit_to_budget(
+    encode: ContextEncoder, collections: Sequence[Sequence], budget: int
+) -> Tuple[str, int, Optional[int]]:
+    """Encode ``collections``, shortening descriptions until the estimate fits ``budget`` tokens.
+
+    One length cap applies to every description, and the largest cap that
+    fits is found by binary search, so the longest descriptions are cut
+    first and the result depends only on the inputs and the budget. If even
+    the context without descriptions exceeds the budget, that smallest
+    encoding is returned; entries themselves are never dropped.
+
+    Args:
+        encode: Layout function taking the four collections and ``description_limit``
+        collections: ``(datasets, metrics, scenarios, agents)``
+        budget: Maximum estimated tokens; ``0`` or less disables the budget
+
+    Returns:
+        Tuple of (context, estimated tokens, description cap applied or ``None``)
+    """
+    context = encode(*collections)
+    tokens = estimate_tokens(context)
+    if budget <= 0 or tokens <= budget:
+        return context, tokens, None
+
+    best_cap = 0
+    best = encode(*collections, description_limit=0)
+    best_tokens = estimate_tokens(best)
+    if best_tokens > budget:
+        return best, best_tokens, 0
+
+    # Invariant: cap ``best_cap`` is within budget, cap ``too_long`` is not.
+    too_long = max(len(item.description) for items in collections[:3] for item in items)
+    while too_long - best_cap > 1:
+        cap = (best_cap + too_long) // 2
+        candidate = encode(*collections, description_limit=cap)
+        candidate_tokens = estimate_tokens(candidate)
+        if candidate_tokens <= budget:
+            best_cap, best, best_tokens = cap, candidate, candidate_tokens
+        else:
+            too_long = cap
+    return best, best_tokens, best_cap
@@ -1,14 +1,27 @@
-import json
 import asyncio
-from zhipuai import ZhipuAI
-
+import time
+from contextlib import aclosing, nullcontext
+
+from app.agents.admission import AdaptiveLimiter
+from app.agents.context_encoding import encode_compact, fit_to_budget, truncate
+from app.agents.hedging import HedgedCaller
+from app.agents.json_extract import extract_json_object
+from app.agents.json_stream import IncrementalJSONObjectParser
+from app.agents.llm_client import LLMClient, LLMError, LLMOverloadedError
+from app.agents.retrieval import CatalogRetriever
+from app.agents.text import estimate_tokens
 from app.config import settings
+from app.metrics import AGENT_STAGE_SECONDS, LLM_ERRORS, LLM_JSON_REPAIRS
 from app.models.dataset import Dataset
 from app.models.metric import Metric
 from app.models.scenario import Scenario
 from app.models.agent import AgentModel
+from app.models.catalog import Catalog
 from app.models.recommendation import Recommendation
-from typing import List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+# Entries per collection rendered to estimate the size of the full-catalog prompt.
+CONTEXT_SIZE_SAMPLE = 64
 
 
 class EvaluationAgent:
@@ -47,12 +60,39 @@ Return responses in this JSON format:
 
     def __init__(self) -> None:
         """Initialize the evaluation agent."""
-        self.client: Optional[ZhipuAI] = None
+        self.client: Optional[LLMClient] = None
+        self.limiter = AdaptiveLimiter() if settings.llm_admission_enabled else None
+        self.caller = HedgedCaller(limiter=self.limiter)
+        self._system_message: Optional[Tuple[tuple, Tuple[str, int, Optional[int]]]] = None
+        self._retriever: Optional[Tuple[str, CatalogRetriever]] = None
+        self._retriever_lock = asyncio.Lock()
+        self._context_estimate: Optional[Tuple[tuple, int]] = None
+        self._prompt_count = 0
+        self._prompt_tokens_total = 0
+        self._prompt_tokens_max = 0
+        self._prompt_tokens_last = 0
+        self._prompt_truncated = 0
 
     async def initialize(self) -> None:
-        """Initialize the ZhipuAI client."""
+        """Initialize the pooled async LLM client."""
         if self.client is None:
-            self.client = ZhipuAI(api_key=settings.zai_api_key)
+            self.client = LLMClient()
+
+    async def aclose(self) -> None:
+        """Release the LLM client's connection pool."""
+        if self.client is not None:
+            await self.client.aclose()
+
+    async def prepare(self, catalog: Catalog) -> None:
+        """Prebuild, off the event loop, the prompt context requests against ``catalog`` use.
+
+        That is the retrieval index when retrieval applies, and the shared
+        full-catalog system prompt otherwise.
+        """
+        if self._uses_retrieval(catalog):
+            await self.get_retriever(catalog)
+        else:
+            await asyncio.to_thread(self.get_system_message, catalog)
 
     async def process_request(
         self,
@@ -77,99 +117,317 @@ Return responses in this JSON format:
         Raises:
             ValueError: If LLM response is invalid or missing required fields
         """
-        await self.initialize()
+        catalog = Catalog(datasets, metrics, scenarios, agents)
+        result = await self.extract_result(user_input, catalog)
+        return self.respond(result, catalog)
 
-        # Build context for the LLM
-        context = self._build_context(datasets, metrics, scenarios, agents)
+    async def extract_result(
+        self, user_input: str, catalog: Catalog, state: Optional[str] = None
+    ) -> dict:
+        """Call the LLM and return its validated JSON result (intent plus ids).
 
-        messages = [
-            {"role": "system", "content": self.SYSTEM_PROMPT + "\n\n" + context},
-            {"role": "user", "content": user_input},
-        ]
+        The result only references catalog entries by id, so it can be cached
+        and later turned into a response against the current catalog objects.
+        ``state`` is a follow-up's compact conversation state (see
+        :class:`ChatSession`), sent ahead of the new message.
+
+        Raises:
+            ValueError: If LLM response is invalid or missing required fields
+            LLMOverloadedError: If admission control turned the call away
+        """
+        await self.initialize()
+
+        with AGENT_STAGE_SECONDS.labels("build_prompt").time():
+            messages = await self._build_messages(user_input, catalog, state)
 
         try:
-            # Run synchronous client call in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=settings.zai_model,
-                messages=messages,
-                temperature=settings.agent_temperature,
-                max_tokens=settings.agent_max_tokens,
-            )
-        except Exception as e:
+            with AGENT_STAGE_SECONDS.labels("llm_call").time():
+                response = await self.caller.call(
+                    lambda: self.client.create_chat_completion(
+                        messages=messages,
+                        model=settings.zai_model,
+                        temperature=settings.agent_temperature,
+                        max_tokens=settings.agent_max_tokens,
+                    )
+                )
+        except LLMOverloadedError:
+            raise
+        except LLMError as e:
             raise ValueError(f"LLM API call failed: {e}")
 
-        if not hasattr(response, 'choices') or len(response.choices) == 0:
+        with AGENT_STAGE_SECONDS.labels("parse").time():
+            return self._parse_completion(response)
+
+    def _parse_completion(self, response: Any) -> dict:
+        """Extract and validate the JSON result from a chat-completions body."""
+        choices = response.get("choices") if isinstance(response, dict) else None
+        if not choices:
+            LLM_ERRORS.labels("no_choices").inc()
             raise ValueError("LLM returned no choices")
 
-        choice = response.choices[0]
-        if not hasattr(choice, 'message'):
+        choice = choices[0]
+        if not isinstance(choice, dict) or "message" not in choice:
+            LLM_ERRORS.labels("no_choices").inc()
             raise ValueError("LLM choice has no message")
 
-        message = choice.message
-        content = message.content if hasattr(message, 'content') else None
+        message = choice["message"] or {}
+        content = message.get("content")
 
         if not content:
+            LLM_ERRORS.labels("empty_response").inc()
             raise ValueError("LLM returned empty response")
 
-        # Strip markdown code blocks if present (LLMs sometimes wrap JSON in ```json ... ```)
-        if content.startswith("```"):
-            lines = content.split("\n")
-            # Remove first line (```json or ```)
-            if lines[0].startswith("```"):
-                lines = lines[1:]
-            # Remove last line if it's ```
-            if lines and lines[-1].strip() == "```":
-                lines = lines[:-1]
-            content = "\n".join(lines).strip()
-
+        # Tolerates preamble, code fences and the usual syntax slips instead of
+        # failing the request; every repair that was needed is counted.
         try:
-            result = json.loads(content)
-        except json.JSONDecodeError as e:
+            extraction = extract_json_object(content)
+        except ValueError as e:
+            LLM_ERRORS.labels("invalid_json").inc()
             raise ValueError(f"Invalid JSON response from LLM: {e}")
+        for repair in extraction.repairs:
+            LLM_JSON_REPAIRS.labels(repair).inc()
 
-        # Validate required fields
+        result = extraction.value
+        self._validate_result(result)
+        return result
+
+    async def stream_result(
+        self, user_input: str, catalog: Catalog
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream the LLM completion and yield each top-level field as soon as it is parsed.
+
+        The caller assembles the yielded ``(field, value)`` pairs into the
+        result; required fields are validated once the completion ends.
+
+        Raises:
+            ValueError: If the LLM call fails or its output is invalid or incomplete
+            LLMOverloadedError: If admission control turned the call away
+        """
+        await self.initialize()
+
+        with AGENT_STAGE_SECONDS.labels("build_prompt").time():
+            messages = await self._build_messages(user_input, catalog)
+
+        started = time.perf_counter()
+        parser = IncrementalJSONObjectParser()
+        stream = self.client.stream_chat_completion(
+            messages=messages,
+            model=settings.zai_model,
+            temperature=settings.agent_temperature,
+            max_tokens=settings.agent_max_tokens,
+        )
+        admission = self.limiter.admit() if self.limiter is not None else nullcontext()
+        try:
+            async with admission, aclosing(stream):
+                async for delta in stream:
+                    for field in parser.feed(delta):
+                        yield field
+                    if parser.done:
+                        break
+        except LLMOverloadedError:
+            raise
+        except LLMError as e:
+            raise ValueError(f"LLM API call failed: {e}")
+        AGENT_STAGE_SECONDS.labels("llm_stream").observe(time.perf_counter() - started)
+
+        if not parser.fields:
+            LLM_ERRORS.labels("empty_response").inc()
+            raise ValueError("LLM returned empty response")
+        self._validate_result(parser.fields)
+
+    @staticmethod
+    def _validate_result(result: dict) -> None:
+        """Raise ValueError if the parsed LLM result lacks a required field."""
         required_fields = ["intent", "dataset_id", "metric_ids", "scenario_id", "agent_id"]
         missing_fields = [f for f in required_fields if f not in result]
         if missing_fields:
+            LLM_ERRORS.labels("missing_fields").inc()
             raise ValueError(f"LLM response missing required fields: {missing_fields}")
 
-        # Build recommendation
-        recommendation = self._build_recommendation(
-            result, datasets, metrics, scenarios, agents
+    def respond(self, result: dict, catalog: Catalog) -> Tuple[str, Optional[Recommendation]]:
+        """Turn a parsed LLM result into response content and a recommendation."""
+        with AGENT_STAGE_SECONDS.labels("build_recommendation").time():
+            recommendation = self._build_recommendation(result, catalog)
+        with AGENT_STAGE_SECONDS.labels("generate_response").time():
+            response_content = self._generate_response(result, recommendation)
+        return response_content, recommendation
+
+    def get_system_message(self, catalog: Catalog) -> str:
+        """Return the system prompt plus catalog context, built once per catalog version.
+
+        The same string object is returned for every request against one
+        catalog version, so the prompt prefix is byte-identical and
+        provider-side prompt caching can hit. Unversioned catalogs are
+        rebuilt each call.
+        """
+        return self._full_system_message(catalog)[0]
+
+    def _full_system_message(self, catalog: Catalog) -> Tuple[str, int, Optional[int]]:
+        """Return the full-catalog system prompt, its token estimate and description cap."""
+        key = (catalog.version, settings.context_encoding, settings.context_token_budget)
+        cached = self._system_message
+        if catalog.version and cached is not None and cached[0] == key:
+            return cached[1]
+
+        built = self._render_system_message(catalog.collections)
+        if catalog.version:
+            self._system_message = (key, built)
+        return built
+
+    def _render_system_message(
+        self, collections: Sequence[Sequence]
+    ) -> Tuple[str, int, Optional[int]]:
+        """Encode the context in the configured layout within ``settings.context_token_budget``.
+
+        Returns:
+            Tuple of (system message, estimated tokens, description cap or ``None``)
+        """
+        encode = encode_compact if settings.context_encoding == "compact" else self._build_context
+        context, context_tokens, limit = fit_to_budget(
+            encode, collections, settings.context_token_budget
         )
+        message = self.SYSTEM_PROMPT + "\n\n" + context
+        return message, estimate_tokens(self.SYSTEM_PROMPT + "\n\n") + context_tokens, limit
+
+    async def system_message_for(self, user_input: str, catalog: Catalog) -> str:
+        """Return the system prompt for one request.
+
+        When retrieval is enabled, the full-catalog prompt is estimated (see
+        :meth:`estimate_context_tokens`) above
+        ``settings.context_retrieval_min_tokens`` and any of datasets,
+        metrics or scenarios has more than ``settings.context_top_k``
+        entries, the context holds only the top-k BM25 matches for
+        ``user_input`` per collection (plus the selected scenarios'
+        recommended metrics). Otherwise the shared full-catalog prompt from
+        :meth:`get_system_message` is returned, which keeps provider-side
+        prompt caching effective for small catalogs.
+        """
+        return (await self._system_message_for(user_input, catalog))[0]
+
+    async def _system_message_for(
+        self, user_input: str, catalog: Catalog
+    ) -> Tuple[str, int, Optional[int]]:
+        if not self._uses_retrieval(catalog):
+            return self._full_system_message(catalog)
+        retriever = await self.get_retriever(catalog)
+        selection = retriever.select(user_input, settings.context_top_k)
+        return self._render_system_message(selection.collections)
+
+    async def _build_messages(
+        self, user_input: str, catalog: Catalog, state: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for one request and record their estimated size.
+
+        A follow-up's ``state`` is prepended to the user message, so the
+        earlier messages it summarizes also steer retrieval.
+        """
+        if state is not None:
+            user_input = f"{state}\n\nFOLLOW-UP: {user_input}"
+        system, system_tokens, limit = await self._system_message_for(user_input, catalog)
+        tokens = system_tokens + estimate_tokens(user_input)
+        self._prompt_count += 1
+        self._prompt_tokens_total += tokens
+        self._prompt_tokens_max = max(self._prompt_tokens_max, tokens)
+        self._prompt_tokens_last = tokens
+        if limit is not None:
+            self._prompt_truncated += 1
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user_input},
+        ]
 
-        # Generate friendly response
-        response_content = self._generate_response(result, recommendation)
+    def prompt_stats(self) -> Dict[str, Any]:
+        """Return estimated prompt sizes (system plus user message) of the LLM requests sent."""
+        count = self._prompt_count
+        return {
+            "count": count,
+            "mean_tokens": round(self._prompt_tokens_total / count, 1) if count else 0.0,
+            "max_tokens": self._prompt_tokens_max,
+            "last_tokens": self._prompt_tokens_last,
+            "truncated": self._prompt_truncated,
+            "encoding": settings.context_encoding,
+            "token_budget": settings.context_token_budget,
+        }
 
-        return response_content, recommendation
+    def _uses_retrieval(self, catalog: Catalog) -> bool:
+        if not settings.context_retrieval_enabled:
+            return False
+        k = settings.context_top_k
+        if not any(len(items) > k for items in catalog.collections[:3]):
+            return False
+        return self.estimate_context_tokens(catalog) > settings.context_retrieval_min_tokens
+
+    def estimate_context_tokens(self, catalog: Catalog) -> int:
+        """Estimate the tokens of the full-catalog system prompt without rendering it.
+
+        Renders the first ``CONTEXT_SIZE_SAMPLE`` entries of each collection
+        in the configured layout and scales by the collection's size, so the
+        cost does not grow with the catalog and a lazily loaded catalog only
+        materializes the sample. Any token budget is ignored. Computed once
+        per catalog version.
+        """
+        key = (catalog.version, settings.context_encoding)
+        cached = self._context_estimate
+        if catalog.version and cached is not None and cached[0] == key:
+            return cached[1]
+
+        encode = encode_compact if settings.context_encoding == "compact" else self._build_context
+        collections = catalog.collections
+        estimate = estimate_tokens(self.SYSTEM_PROMPT + "\n\n")
+        for position, items in enumerate(collections):
+            sample = list(items[:CONTEXT_SIZE_SAMPLE])
+            if not sample:
+                continue
+            only = [sample if i == position else [] for i in range(len(collections))]
+            estimate += estimate_tokens(encode(*only)) * len(items) // len(sample)
+        if catalog.version:
+            self._context_estimate = (key, estimate)
+        return estimate
+
+    async def get_retriever(self, catalog: Catalog) -> CatalogRetriever:
+        """Return the retrieval index for ``catalog``, built once per version off the event loop."""
+        version = catalog.version
+        async with self._retriever_lock:
+            cached = self._retriever
+            if version and cached is not None and cached[0] == version:
+                return cached[1]
+            retriever = await asyncio.to_thread(CatalogRetriever, catalog)
+            if version:
+                self._retriever = (version, retriever)
+            return retriever
 
     def _build_context(
         self,
-        datasets: List[Dataset],
-        metrics: List[Metric],
-        scenarios: List[Scenario],
-        agents: List[AgentModel],
+        datasets: Sequence[Dataset],
+        metrics: Sequence[Metric],
+        scenarios: Sequence[Scenario],
+        agents: Sequence[AgentModel],
+        description_limit: Optional[int] = None,
     ) -> str:
-        """Build context string with available resources."""
+        """Build context string with available resources.
+
+        ``description_limit`` caps each description's length (``0`` drops them).
+        """
         lines = ["AVAILABLE RESOURCES:"]
 
         lines.append("\nDATASETS:")
         for d in datasets:
             lines.append(f"  - {d.id}: {d.name}")
-            lines.append(f"    Description: {d.description}")
+            if description_limit != 0:
+                lines.append(f"    Description: {truncate(d.description, description_limit)}")
             lines.append(f"    Tags: {', '.join(d.tags)}")
 
         lines.append("\nMETRICS:")
         for m in metrics:
             lines.append(f"  - {m.id}: {m.name} ({m.category})")
-            lines.append(f"    Description: {m.description}")
+            if description_limit != 0:
+                lines.append(f"    Description: {truncate(m.description, description_limit)}")
 
         lines.append("\nSCENARIOS:")
         for s in scenarios:
             lines.append(f"  - {s.id}: {s.name}")
-            lines.append(f"    Description: {s.description}")
+            if description_limit != 0:
+                lines.append(f"    Description: {truncate(s.description, description_limit)}")
 
         lines.append("\nAGENTS:")
         for a in agents:
@@ -177,55 +435,55 @@ Return responses in this JSON format:
 
         return "\n".join(lines)
 
-    def _build_recommendation(
-        self,
-        result: dict,
-        datasets: List[Dataset],
-        metrics: List[Metric],
-        scenarios: List[Scenario],
-        agents: List[AgentModel],
-    ) -> Optional[Recommendation]:
-        """Build Recommendation object from LLM response."""
-        if not datasets or not metrics or not scenarios or not agents:
+    def _build_recommendation(self, result: dict, catalog: Catalog) -> Optional[Recommendation]:
+        """Build Recommendation object from LLM response using the catalog's id indexes."""
+        if not all(catalog.collections):
             return None
 
-        dataset = next(
-            (d for d in datasets if d.id == result.get("dataset_id")), datasets[0]
-        )
-        selected_metrics = [
-            m for m in metrics if m.id in result.get("metric_ids", [])
-        ] or [metrics[0]]
-        scenario = next(
-            (s for s in scenarios if s.id == result.get("scenario_id")), scenarios[0]
-        )
-        agent = next(
-            (a for a in agents if a.id == result.get("agent_id")), agents[0]
-        )
+        dataset = catalog.get_dataset(result.get("dataset_id")) or catalog.datasets[0]
+        selected_metrics = catalog.get_metrics(result.get("metric_ids") or []) or [
+            catalog.metrics[0]
+        ]
+        scenario = catalog.get_scenario(result.get("scenario_id")) or catalog.scenarios[0]
+        agent = catalog.get_agent(result.get("agent_id")) or catalog.agents[0]
 
         return Recommendation(
             dataset=dataset,
             metrics=selected_metrics,
             agent=agent,
             scenario=scenario,
-            reason=result.get("reason", "Based on your request, here's a recommended configuration."),
+            reason=result.get(
+                "reason", "Based on your request, here's a recommended configuration."
+            ),
         )
 
-    def _generate_response(
-        self, result: dict, recommendation: Optional[Recommendation]
-    ) -> str:
+    def _generate_response(self, result: dict, recommendation: Optional[Recommendation]) -> str:
         """Generate friendly response message."""
         intent = result.get("intent", "general_chat")
 
         responses = {
-            "rag_safety": "Since you're focused on safety for your RAG system, I've prioritized metrics that detect hallucinations, toxicity, and jailbreak attempts.",
-            "rag_accuracy": "For RAG accuracy evaluation, I've selected metrics that measure context adherence and faithfulness to retrieved documents.",
-            "code_eval": "For coding evaluation, I've chosen execution-based metrics that verify code correctness.",
-            "general_chat": "For general conversation capabilities, I've selected metrics that evaluate relevance, coherence, and tone.",
-            "safety": "For safety testing, I've included comprehensive metrics to detect toxic content and adversarial prompt resistance.",
+            "rag_safety": (
+                "Since you're focused on safety for your RAG system, I've prioritized metrics "
+                "that detect hallucinations, toxicity, and jailbreak attempts."
+            ),
+            "rag_accuracy": (
+                "For RAG accuracy evaluation, I've selected metrics that measure context "
+                "adherence and faithfulness to retrieved documents."
+            ),
+            "code_eval": (
+                "For coding evaluation, I've chosen execution-based metrics that verify "
+                "code correctness."
+            ),
+            "general_chat": (
+                "For general conversation capabilities, I've selected metrics that evaluate "
+                "relevance, coherence, and tone."
+            ),
+            "safety": (
+                "For safety testing, I've included comprehensive metrics to detect toxic "
+                "content and adversarial prompt resistance."
+            ),
         }
 
-        base_response = responses.get(
-            intent, "Based on your request, here's my recommendation."
-        )
+        base_response = responses.get(intent, "Based on your request, here's my recommendation.")
         reason = recommendation.reason if recommendation else ""
         return f"{base_response}\n\n{reason}" if reason else base_response
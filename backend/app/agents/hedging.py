@@ -0,0 +1,217 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from app.agents.admission import AdaptiveLimiter
+from app.agents.llm_client import LLMError
+from app.config import settings
+from app.metrics import LLM_ERRORS, LLM_HEDGES_FIRED, LLM_HEDGES_WON, LLM_RETRIES
+
+T = TypeVar("T")
+
+
+class LatencyWindow:
+    """The most recent successful call durations, for percentile estimates."""
+
+    def __init__(self, size: int = 256) -> None:
+        """Initialize an empty window keeping the last ``size`` samples."""
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add one observed duration in seconds."""
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile (``q`` in 0..100), or None without samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, -(-len(ordered) * q // 100))
+        return ordered[int(rank) - 1]
+
+
+class HedgedCaller:
+    """Run LLM calls with hedging, bounded retries and a total deadline.
+
+    Each attempt starts one call; if it has not finished after the hedge
+    delay (the ``hedge_percentile`` of recent call latencies, so only the
+    slowest few percent of calls are duplicated), an identical second call
+    is started and whichever succeeds first is used, cancelling the other.
+    A failed call only fails the attempt once no duplicate is still running,
+    and an attempt whose calls all failed reports the primary call's error.
+
+    Attempts failing with a transient :class:`LLMError` are retried up to
+    ``max_retries`` times after a full-jitter exponential backoff. Retries,
+    hedges and backoff sleeps all run under ``deadline_seconds``.
+
+    With a ``limiter``, every call first takes one of its slots, waiting at
+    most until the deadline; a duplicate is only started when a slot is free
+    right away, so hedging backs off by itself under load.
+    """
+
+    def __init__(
+        self,
+        hedge_enabled: Optional[bool] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_initial_delay_ms: Optional[float] = None,
+        hedge_min_delay_ms: Optional[float] = None,
+        hedge_min_samples: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base_ms: Optional[float] = None,
+        retry_max_ms: Optional[float] = None,
+        deadline_seconds: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+    ) -> None:
+        """Initialize the caller; every option defaults to its ``settings.llm_*`` value.
+
+        Args:
+            hedge_enabled: Start duplicate calls for slow attempts
+            hedge_percentile: Latency percentile used as the hedge delay
+            hedge_initial_delay_ms: Hedge delay until ``hedge_min_samples`` latencies are known
+            hedge_min_delay_ms: Lower bound of the hedge delay
+            hedge_min_samples: Latencies needed before the percentile is trusted
+            max_retries: Retries after the first attempt for transient errors
+            retry_base_ms: Backoff cap of the first retry, doubled per retry
+            retry_max_ms: Upper bound of the backoff cap
+            deadline_seconds: Total time for all attempts (0 = no deadline)
+            rng: Random source for the backoff jitter
+            limiter: Admission control every call goes through
+        """
+
+        def pick(value, default):
+            return default if value is None else value
+
+        self.hedge_enabled = pick(hedge_enabled, settings.llm_hedge_enabled)
+        self.hedge_percentile = pick(hedge_percentile, settings.llm_hedge_percentile)
+        self.hedge_initial_delay = (
+            pick(hedge_initial_delay_ms, settings.llm_hedge_initial_delay_ms) / 1000
+        )
+        self.hedge_min_delay = pick(hedge_min_delay_ms, settings.llm_hedge_min_delay_ms) / 1000
+        self.hedge_min_samples = pick(hedge_min_samples, settings.llm_hedge_min_samples)
+        self.max_retries = pick(max_retries, settings.llm_max_retries)
+        self.retry_base = pick(retry_base_ms, settings.llm_retry_base_ms) / 1000
+        self.retry_max = pick(retry_max_ms, settings.llm_retry_max_ms) / 1000
+        self.deadline_seconds = pick(deadline_seconds, settings.llm_deadline_seconds)
+        self.rng = rng or random.Random()
+        self.limiter = limiter
+        self.latencies = LatencyWindow()
+        self.calls = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.retries = 0
+        self.deadline_exceeded = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging an attempt, or None when hedging is off."""
+        if not self.hedge_enabled:
+            return None
+        if len(self.latencies) < self.hedge_min_samples:
+            return self.hedge_initial_delay
+        return max(self.hedge_min_delay, self.latencies.percentile(self.hedge_percentile))
+
+    def backoff(self, retry: int) -> float:
+        """Full-jitter delay in seconds before retry number ``retry`` (from 0)."""
+        return self.rng.uniform(0, min(self.retry_max, self.retry_base * 2**retry))
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn`` (a zero-argument coroutine factory) hedged, retried and under the deadline.
+
+        Raises:
+            LLMError: The last error once retries are exhausted, or a deadline error
+            LLMOverloadedError: If the limiter has no slot for the call in time
+        """
+        self.calls += 1
+        if self.deadline_seconds <= 0:
+            return await self._with_retries(fn, None)
+        deadline = asyncio.get_running_loop().time() + self.deadline_seconds
+        try:
+            return await asyncio.wait_for(self._with_retries(fn, deadline), self.deadline_seconds)
+        except asyncio.TimeoutError:
+            self.deadline_exceeded += 1
+            LLM_ERRORS.labels("deadline").inc()
+            raise LLMError(f"No LLM response within the {self.deadline_seconds:g}s deadline")
+
+    async def _with_retries(self, fn: Callable[[], Awaitable[T]], deadline: Optional[float]) -> T:
+        loop = asyncio.get_running_loop()
+        retry = 0
+        while True:
+            try:
+                return await self._attempt(fn, deadline)
+            except LLMError as e:
+                if not e.transient or retry >= self.max_retries:
+                    raise
+                delay = self.backoff(retry)
+                # Report the real error rather than sleeping into the deadline.
+                if deadline is not None and loop.time() + delay >= deadline:
+                    raise
+            self.retries += 1
+            LLM_RETRIES.inc()
+            await asyncio.sleep(delay)
+            retry += 1
+
+    async def _timed(
+        self, fn: Callable[[], Awaitable[T]], deadline: Optional[float], wait: bool = True
+    ) -> T:
+        if self.limiter is None:
+            started = time.perf_counter()
+            result = await fn()
+        else:
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - asyncio.get_running_loop().time()
+            async with self.limiter.admit(wait=wait, timeout=timeout):
+                started = time.perf_counter()
+                result = await fn()
+        self.latencies.record(time.perf_counter() - started)
+        return result
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], deadline: Optional[float]) -> T:
+        """One call, plus a duplicate if it is still running after the hedge delay."""
+        primary = asyncio.ensure_future(self._timed(fn, deadline))
+        started: List["asyncio.Future[T]"] = [primary]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(started, timeout=delay)
+                if not done and (self.limiter is None or self.limiter.has_capacity()):
+                    started.append(asyncio.ensure_future(self._timed(fn, deadline, wait=False)))
+                    self.hedges_fired += 1
+                    LLM_HEDGES_FIRED.inc()
+            pending = set(started)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedges_won += 1
+                            LLM_HEDGES_WON.inc()
+                        return task.result()
+            # Every call failed. Report the primary's error: a refused or failed
+            # duplicate must not hide a transient primary error and skip the retry.
+            raise primary.exception()
+        finally:
+            for task in started:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Mark a losing failure as retrieved so it is not logged as unhandled.
+                    task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call, hedge, retry and deadline counters and the current hedge delay."""
+        delay = self.hedge_delay()
+        return {
+            "calls": self.calls,
+            "hedge_delay_ms": None if delay is None else round(delay * 1000, 3),
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "retries": self.retries,
+            "deadline_exceeded": self.deadline_exceeded,
+            "latency_samples": len(self.latencies),
+        }
@@ -0,0 +1,141 @@
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Protocol, Tuple
+
+from app.agents.text import tokenize
+
+
+@dataclass(frozen=True)
+class IntentPrediction:
+    """Intent predicted locally together with a confidence in ``[0, 1]``."""
+
+    intent: str
+    confidence: float
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+class IntentClassifier(Protocol):
+    """Anything that maps a user message to an :class:`IntentPrediction`."""
+
+    def classify(self, message: str) -> IntentPrediction: ...
+
+
+# Evidence weights per topic. Intents are combinations of topics (see INTENT_TOPICS).
+TOPIC_LEXICON: Mapping[str, Mapping[str, float]] = {
+    "rag": {
+        "rag": 2.0,
+        "retrieval": 1.5,
+        "retriever": 1.5,
+        "retrieved": 1.0,
+        "grounded": 1.0,
+        "grounding": 1.0,
+        "knowledge-base": 1.0,
+        "documents": 0.5,
+    },
+    "safety": {
+        "safety": 2.0,
+        "safe": 1.0,
+        "jailbreak": 2.0,
+        "jailbreaks": 2.0,
+        "adversarial": 1.5,
+        "red-teaming": 2.0,
+        "red-team": 2.0,
+        "toxic": 1.5,
+        "toxicity": 1.5,
+        "harmful": 1.5,
+        "injection": 1.5,
+        "bias": 1.0,
+        "alignment": 1.0,
+        "hallucination": 1.0,
+        "hallucinations": 1.0,
+        "hallucinate": 1.0,
+    },
+    "accuracy": {
+        "accuracy": 2.0,
+        "accurate": 1.5,
+        "faithfulness": 2.0,
+        "faithful": 1.5,
+        "factual": 1.0,
+        "correctness": 1.0,
+        "adherence": 1.0,
+        "precision": 1.0,
+    },
+    "code": {
+        "code": 2.0,
+        "coding": 2.0,
+        "programming": 2.0,
+        "python": 1.5,
+        "javascript": 1.5,
+        "sql": 1.5,
+        "debugging": 1.5,
+        "debug": 1.5,
+        "humaneval": 2.0,
+        "codegen": 2.0,
+    },
+    "chat": {
+        "chat": 1.5,
+        "chatbot": 1.5,
+        "conversation": 2.0,
+        "conversational": 2.0,
+        "dialogue": 2.0,
+        "tone": 1.0,
+        "coherence": 1.0,
+        "coherent": 1.0,
+    },
+}
+
+# intent -> (topics that must all be present, topics whose evidence the intent explains)
+INTENT_TOPICS: Mapping[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "rag_safety": (("rag", "safety"), ("rag", "safety")),
+    "rag_accuracy": (("rag",), ("rag", "accuracy")),
+    "code_eval": (("code",), ("code",)),
+    "general_chat": (("chat",), ("chat",)),
+    "safety": (("safety",), ("safety",)),
+}
+
+
+class LexiconIntentClassifier:
+    """Weighted-lexicon intent classifier that runs in microseconds.
+
+    Each token adds weight to one or more topics. An intent's score is the
+    topic evidence it explains; its confidence is the explained share of all
+    evidence, damped by ``1 - exp(-score / saturation)`` so a single weak
+    keyword never looks certain.
+    """
+
+    def __init__(
+        self,
+        lexicon: Mapping[str, Mapping[str, float]] = TOPIC_LEXICON,
+        intent_topics: Mapping[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = INTENT_TOPICS,
+        saturation: float = 2.0,
+    ) -> None:
+        """Initialize the classifier and invert the lexicon for token lookup."""
+        self.intent_topics = intent_topics
+        self.saturation = saturation
+        self._term_weights: Dict[str, Tuple[Tuple[str, float], ...]] = {}
+        for topic, terms in lexicon.items():
+            for term, weight in terms.items():
+                self._term_weights[term] = self._term_weights.get(term, ()) + ((topic, weight),)
+
+    def classify(self, message: str) -> IntentPrediction:
+        """Return the best-supported intent, or ``general_chat`` with zero confidence."""
+        evidence: Dict[str, float] = {}
+        for token in tokenize(message):
+            for topic, weight in self._term_weights.get(token, ()):
+                evidence[topic] = evidence.get(topic, 0.0) + weight
+
+        total = sum(evidence.values())
+        if total == 0:
+            return IntentPrediction(intent="general_chat", confidence=0.0)
+
+        scores: Dict[str, float] = {}
+        for intent, (required, explained) in self.intent_topics.items():
+            if all(evidence.get(t) for t in required):
+                scores[intent] = sum(evidence.get(t, 0.0) for t in explained)
+        if not scores:
+            return IntentPrediction(intent="general_chat", confidence=0.0)
+
+        intent = max(scores, key=scores.__getitem__)
+        best = scores[intent]
+        confidence = (best / total) * (1.0 - math.exp(-best / self.saturation))
+        return IntentPrediction(intent=intent, confidence=round(confidence, 4), scores=scores)
@@ -0,0 +1,247 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Raw newlines and tabs inside strings are accepted without counting as a repair.
+_DECODER = json.JSONDecoder(strict=False)
+
+_WHITESPACE = re.compile(r"[ \t\r\n]+")
+_DOUBLE_QUOTED = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SINGLE_QUOTED = re.compile(r"'(?:[^'\\]|\\.)*'", re.DOTALL)
+_BARE = re.compile(r"(?:[^\s,:{}\[\]\"'/]|/(?![/*]))+")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_LITERALS = {"true": "true", "false": "false", "null": "null"}
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+# Candidate ``{`` positions tried before giving up.
+MAX_CANDIDATES = 16
+
+
+@dataclass(frozen=True)
+class Extraction:
+    """A JSON object found in free text, with the repairs needed to parse it."""
+
+    value: dict
+    repairs: Tuple[str, ...]
+    start: int
+    end: int
+
+
+class _Frame:
+    __slots__ = ("closer", "state", "key_start", "comma")
+
+    def __init__(self, closer: str) -> None:
+        self.closer = closer
+        # Objects: key -> colon -> value -> after; arrays: value -> after.
+        self.state = "key" if closer == "}" else "value"
+        self.key_start = 0
+        self.comma: Optional[int] = None
+
+
+def _single_to_double(literal: str) -> str:
+    """Re-quote a single-quoted string literal (quotes included) with double quotes."""
+    body = literal[1:-1].replace("\\'", "'").replace('"', '\\"')
+    return f'"{body}"'
+
+
+def _repair(text: str, start: int) -> Tuple[str, int, List[str]]:
+    """Rewrite the object starting at ``text[start] == "{"`` as strict JSON in one pass.
+
+    Returns the rewritten text, the index just past the object in ``text``
+    and the repairs applied, in order of first use.
+
+    Raises:
+        ValueError: If the object cannot be repaired
+    """
+    out: List[str] = []
+    repairs: List[str] = []
+    stack: List[_Frame] = []
+
+    def repaired(name: str) -> None:
+        if name not in repairs:
+            repairs.append(name)
+
+    def begin_value() -> _Frame:
+        frame = stack[-1]
+        if frame.state == "after":
+            out.append(",")
+            repaired("missing_comma")
+            frame.state = "key" if frame.closer == "}" else "value"
+        return frame
+
+    def end_value(frame: _Frame) -> None:
+        frame.comma = None
+        if frame.state == "key":
+            frame.state = "colon"
+        else:
+            frame.state = "after"
+
+    def close(frame: _Frame) -> None:
+        if frame.state == "colon":
+            raise ValueError("object key without a value")
+        if frame.state == "value" and frame.closer == "}":
+            out.append("null")
+            repaired("missing_value")
+        if frame.comma is not None:
+            out[frame.comma] = ""
+            repaired("trailing_comma")
+        out.append(frame.closer)
+
+    i, n = start, len(text)
+    while i < n:
+        ch = text[i]
+        if ch in " \t\r\n":
+            i = _WHITESPACE.match(text, i).end()
+            continue
+        if ch == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+            repaired("comments")
+            continue
+        if ch == "/" and text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            repaired("comments")
+            continue
+
+        if ch in "{[":
+            if stack:
+                frame = begin_value()
+                if frame.state in ("key", "colon"):
+                    raise ValueError("object key must be a string")
+            out.append(ch)
+            stack.append(_Frame("}" if ch == "{" else "]"))
+            i += 1
+            continue
+
+        if ch in "}]":
+            frame = stack[-1]
+            if ch != frame.closer:
+                if frame.closer == "]" and len(stack) > 1:
+                    # ``[1, 2}``: the array was never closed; close it and retry ``}``.
+                    repaired("missing_bracket")
+                    close(stack.pop())
+                    end_value(stack[-1])
+                    continue
+                repaired("stray_bracket")
+                i += 1
+                continue
+            close(stack.pop())
+            i += 1
+            if not stack:
+                return "".join(out), i, repairs
+            end_value(stack[-1])
+            continue
+
+        if ch == ",":
+            frame = stack[-1]
+            if frame.state == "after":
+                frame.comma = len(out)
+                out.append(",")
+                frame.state = "key" if frame.closer == "}" else "value"
+            else:
+                repaired("extra_comma")
+            i += 1
+            continue
+
+        if ch == ":":
+            frame = stack[-1]
+            if frame.state != "colon":
+                raise ValueError("unexpected ':'")
+            out.append(":")
+            frame.state = "value"
+            i += 1
+            continue
+
+        frame = begin_value()
+        if frame.state == "colon":
+            raise ValueError("missing ':' after object key")
+        if frame.state == "key":
+            frame.key_start = len(out)
+
+        if ch == '"' or ch == "'":
+            match = (_DOUBLE_QUOTED if ch == '"' else _SINGLE_QUOTED).match(text, i)
+            if match is None:
+                # Truncated inside a string: close it and let the end-of-text pass finish.
+                literal = text[i:] + ch
+                if literal.endswith("\\" + ch) and not literal.endswith("\\\\" + ch):
+                    literal = literal[:-2] + ch
+                repaired("truncated")
+                i = n
+            else:
+                literal = match.group()
+                i = match.end()
+            if ch == "'":
+                literal = _single_to_double(literal)
+                repaired("single_quotes")
+            out.append(literal)
+            end_value(frame)
+            continue
+
+        match = _BARE.match(text, i)
+        token = match.group()
+        i = match.end()
+        if frame.state == "key":
+            out.append(json.dumps(token))
+            repaired("unquoted_keys")
+        elif token in _LITERALS or _NUMBER.fullmatch(token):
+            out.append(_LITERALS.get(token, token))
+        elif token in _PYTHON_LITERALS:
+            out.append(_PYTHON_LITERALS[token])
+            repaired("python_literals")
+        else:
+            out.append(json.dumps(token))
+            repaired("unquoted_values")
+        end_value(frame)
+
+    # The text ended inside the object: close whatever is still open.
+    repaired("truncated")
+    while stack:
+        frame = stack.pop()
+        if frame.state == "colon":
+            del out[frame.key_start :]
+            frame.state = "key"
+        if frame.state in ("key", "value") and frame.comma is None and out[-1] == ",":
+            frame.comma = len(out) - 1
+        close(frame)
+        if stack:
+            end_value(stack[-1])
+    return "".join(out), n, repairs
+
+
+def extract_json_object(text: str) -> Extraction:
+    """Find and parse the first JSON object in ``text``, repairing common LLM defects.
+
+    Preamble, markdown fences and trailing commentary around the object are
+    ignored. Each ``{`` is tried in turn: first with the C JSON decoder,
+    and only if that fails with a single repairing pass that fixes trailing
+    and missing commas, single quotes, unquoted keys, Python literals,
+    comments and a truncated end. The repairs applied are reported by
+    name in :attr:`Extraction.repairs` (empty when the object was valid).
+
+    Raises:
+        ValueError: If no object in ``text`` can be parsed, even with repairs
+    """
+    start = text.find("{")
+    first_error: Optional[str] = None
+    for _ in range(MAX_CANDIDATES):
+        if start < 0:
+            break
+        try:
+            value, end = _DECODER.raw_decode(text, start)
+            if isinstance(value, dict):
+                return Extraction(value, (), start, end)
+        except json.JSONDecodeError as e:
+            first_error = first_error or str(e)
+        try:
+            repaired_text, end, repairs = _repair(text, start)
+            value = _DECODER.decode(repaired_text)
+            if isinstance(value, dict):
+                return Extraction(value, tuple(repairs), start, end)
+        except ValueError as e:
+            first_error = first_error or str(e)
+        start = text.find("{", start + 1)
+    if first_error is None:
+        raise ValueError("no JSON object found")
+    raise ValueError(first_error)
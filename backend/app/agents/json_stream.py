@@ -0,0 +1,91 @@
+import json
+from typing import Any, List, Tuple
+
+
+class IncrementalJSONObjectParser:
+    """Parse the top-level fields of a JSON object as its text arrives in chunks.
+
+    Text before the opening ``{`` (such as a markdown fence) is ignored. Each
+    call to :meth:`feed` scans only the new characters and returns the
+    ``(key, value)`` pairs whose values were completed by them, so a field can
+    be acted on long before the object is closed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser in the state before the object starts."""
+        self._state = "seek_object"
+        self._buf: List[str] = []
+        self._key = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.done = False
+        self.fields: dict = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume ``chunk`` and return the fields completed by it.
+
+        Raises:
+            ValueError: If a completed value is not valid JSON
+        """
+        completed: List[Tuple[str, Any]] = []
+        for ch in chunk:
+            if self.done:
+                break
+            state = self._state
+            if state == "value":
+                if self._in_string:
+                    self._buf.append(ch)
+                    if self._escape:
+                        self._escape = False
+                    elif ch == "\\":
+                        self._escape = True
+                    elif ch == '"':
+                        self._in_string = False
+                elif self._depth == 0 and ch in ",}":
+                    completed.append(self._finish_value())
+                    self._state = "seek_key"
+                    if ch == "}":
+                        self.done = True
+                else:
+                    self._buf.append(ch)
+                    if ch == '"':
+                        self._in_string = True
+                    elif ch in "{[":
+                        self._depth += 1
+                    elif ch in "}]":
+                        self._depth -= 1
+            elif state == "key":
+                if self._escape:
+                    self._escape = False
+                    self._buf.append(ch)
+                elif ch == "\\":
+                    self._escape = True
+                    self._buf.append(ch)
+                elif ch == '"':
+                    self._key = json.loads('"' + "".join(self._buf) + '"')
+                    self._buf = []
+                    self._state = "seek_colon"
+                else:
+                    self._buf.append(ch)
+            elif state == "seek_key":
+                if ch == '"':
+                    self._state = "key"
+                elif ch == "}":
+                    self.done = True
+            elif state == "seek_colon":
+                if ch == ":":
+                    self._state = "value"
+            elif ch == "{":
+                self._state = "seek_key"
+        return completed
+
+    def _finish_value(self) -> Tuple[str, Any]:
+        text = "".join(self._buf).strip()
+        self._buf = []
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON value for field '{self._key}': {e}")
+        self.fields[self._key] = value
+        return self._key, value
@@ -0,0 +1,193 @@
+import json
+
+import httpx
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.config import settings
+from app.metrics import LLM_ERRORS, LLM_INFLIGHT
+
+# Statuses worth retrying: the same request may well succeed a moment later.
+TRANSIENT_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class LLMError(Exception):
+    """Raised when the chat-completions endpoint cannot be reached or returns an error.
+
+    ``transient`` is set for failures a retry may fix (timeouts, connection
+    errors, 429 and 5xx responses).
+    """
+
+    def __init__(self, message: str, transient: bool = False) -> None:
+        super().__init__(message)
+        self.transient = transient
+
+
+class LLMOverloadedError(LLMError):
+    """Raised without calling the LLM when no capacity frees up for the request in time.
+
+    ``retry_after`` is a whole number of seconds for the ``Retry-After`` header.
+    """
+
+    def __init__(self, message: str, retry_after: int = 1) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _error_type(error: Exception) -> str:
+    """Label for ``aeval_llm_errors_total``: ``http_<status>``, ``timeout`` or ``transport``."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    return "transport"
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in TRANSIENT_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+
+class LLMClient:
+    """Native asyncio client for the OpenAI-compatible z.ai chat-completions endpoint.
+
+    A single ``httpx.AsyncClient`` is shared by every request so connections are
+    kept alive and reused from a bounded pool instead of being set up per call,
+    and no request ever occupies a thread from the default executor.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """Initialize the client; the underlying connection pool is created lazily.
+
+        Args:
+            base_url: Endpoint root (defaults to ``settings.zai_base_url``)
+            api_key: Bearer token (defaults to ``settings.zai_api_key``)
+            transport: Optional custom transport, mainly for tests
+        """
+        self.base_url = (base_url or settings.zai_base_url).rstrip("/")
+        self.api_key = api_key or settings.zai_api_key
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Return the shared pooled HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_keepalive_connections,
+                    keepalive_expiry=settings.llm_keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    connect=settings.llm_connect_timeout,
+                    read=settings.llm_read_timeout,
+                    write=settings.llm_write_timeout,
+                    pool=settings.llm_pool_timeout,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def create_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> Dict[str, Any]:
+        """Call ``POST /chat/completions`` and return the decoded JSON body.
+
+        Raises:
+            LLMError: On transport failures, non-2xx status codes or a non-JSON body
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        LLM_INFLIGHT.inc()
+        try:
+            response = await self.http_client.post("/chat/completions", json=payload)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            LLM_ERRORS.labels(_error_type(e)).inc()
+            raise LLMError(
+                f"HTTP {e.response.status_code} from chat completions: {e.response.text[:200]}",
+                transient=_is_transient(e),
+            ) from e
+        except httpx.HTTPError as e:
+            LLM_ERRORS.labels(_error_type(e)).inc()
+            raise LLMError(f"{type(e).__name__}: {e}", transient=_is_transient(e)) from e
+        except ValueError as e:
+            LLM_ERRORS.labels("invalid_body").inc()
+            raise LLMError(f"Invalid JSON body from chat completions: {e}") from e
+        finally:
+            LLM_INFLIGHT.dec()
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> AsyncIterator[str]:
+        """Call ``POST /chat/completions`` with ``stream=True`` and yield content deltas.
+
+        Raises:
+            LLMError: On transport failures, non-2xx status codes or malformed events
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        LLM_INFLIGHT.inc()
+        try:
+            async with self.http_client.stream(
+                "POST", "/chat/completions", json=payload
+            ) as response:
+                if response.status_code >= 400:
+                    body = (await response.aread()).decode(errors="replace")
+                    LLM_ERRORS.labels(f"http_{response.status_code}").inc()
+                    raise LLMError(
+                        f"HTTP {response.status_code} from chat completions: {body[:200]}",
+                        transient=response.status_code in TRANSIENT_STATUSES,
+                    )
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        event = json.loads(data)
+                    except ValueError as e:
+                        LLM_ERRORS.labels("invalid_body").inc()
+                        raise LLMError(f"Invalid stream event from chat completions: {e}") from e
+                    for choice in event.get("choices") or []:
+                        delta = (choice.get("delta") or {}).get("content")
+                        if delta:
+                            yield delta
+        except httpx.HTTPError as e:
+            LLM_ERRORS.labels(_error_type(e)).inc()
+            raise LLMError(f"{type(e).__name__}: {e}", transient=_is_transient(e)) from e
+        finally:
+            LLM_INFLIGHT.dec()
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,225 @@
+import asyncio
+import threading
+from array import array
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Mapping, Optional, Sequence, Set, Tuple, TypeVar
+
+from app.agents.text import tokenize
+from app.models.catalog import Catalog
+from app.models.scenario import Scenario
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class IntentProfile:
+    """Catalog vocabulary associated with one intent."""
+
+    terms: FrozenSet[str]
+    agent_types: FrozenSet[str] = frozenset()
+    metric_categories: FrozenSet[str] = frozenset()
+
+
+INTENT_PROFILES: Mapping[str, IntentProfile] = {
+    "rag_safety": IntentProfile(
+        terms=frozenset(
+            {"rag", "retrieval", "hallucination", "safety", "adversarial", "jailbreak"}
+        ),
+        agent_types=frozenset({"rag"}),
+        metric_categories=frozenset({"safety", "rag"}),
+    ),
+    "rag_accuracy": IntentProfile(
+        terms=frozenset({"rag", "retrieval", "retrieved", "accuracy", "documents", "qa"}),
+        agent_types=frozenset({"rag"}),
+        metric_categories=frozenset({"rag", "accuracy"}),
+    ),
+    "code_eval": IntentProfile(
+        terms=frozenset({"code", "coding", "python", "debugging", "generation", "sql"}),
+        agent_types=frozenset({"coding", "code"}),
+        metric_categories=frozenset({"code"}),
+    ),
+    "general_chat": IntentProfile(
+        terms=frozenset({"chat", "conversation", "coherent", "general", "tone", "support"}),
+        agent_types=frozenset({"chatbot", "chat", "conversational"}),
+        metric_categories=frozenset({"quality", "style"}),
+    ),
+    "safety": IntentProfile(
+        terms=frozenset({"safety", "jailbreak", "adversarial", "harmful", "toxic", "red-teaming"}),
+        metric_categories=frozenset({"safety"}),
+    ),
+}
+
+
+def _best(items: Sequence[T], score) -> Optional[T]:
+    """Return the highest-scoring item, preferring catalog order on ties."""
+    best, best_score = None, 0.0
+    for item in items:
+        s = score(item)
+        if s > best_score:
+            best, best_score = item, s
+    return best
+
+
+def _terms(*text_parts: str) -> FrozenSet[str]:
+    return frozenset(tokenize(" ".join(text_parts)))
+
+
+class CatalogTerms:
+    """Token sets of one catalog's entries, built once per catalog version.
+
+    Datasets get postings (token -> positions) rather than one set per
+    entry, so scoring a message only visits the datasets sharing a token
+    with it. Scenarios, agents and metrics are few per request and keep a
+    token set each.
+    """
+
+    def __init__(self, catalog: Catalog) -> None:
+        """Tokenize every entry of ``catalog`` (blocking; O(catalog size))."""
+        self.scenarios: Tuple[FrozenSet[str], ...] = tuple(
+            _terms(s.name, s.description) for s in catalog.scenarios
+        )
+        self.dataset_labels: Dict[str, array] = {}
+        self.dataset_tags: Dict[str, array] = {}
+        for position, d in enumerate(catalog.datasets):
+            tags = _terms(*d.tags)
+            for token in tags | _terms(d.name):
+                self.dataset_labels.setdefault(token, array("I")).append(position)
+            for token in tags:
+                self.dataset_tags.setdefault(token, array("I")).append(position)
+        self.agents: Dict[str, FrozenSet[str]] = {}
+        for a in catalog.agents:
+            self.agents.setdefault(a.id, _terms(a.name, a.description, *(a.capabilities or [])))
+        self.metrics: Dict[str, FrozenSet[str]] = {}
+        for m in catalog.metrics:
+            self.metrics.setdefault(m.id, _terms(m.name, m.description))
+
+    def best_dataset(
+        self, message_tokens: Set[str], profile_terms: FrozenSet[str]
+    ) -> Optional[int]:
+        """Return the position of the dataset best matching the message and intent, or ``None``.
+
+        A dataset scores two per message token in its tags or name and one
+        per intent term in its tags; ties go to the earlier dataset.
+        """
+        scores: Dict[int, int] = {}
+        for token in message_tokens:
+            for position in self.dataset_labels.get(token, ()):
+                scores[position] = scores.get(position, 0) + 2
+        for token in profile_terms:
+            for position in self.dataset_tags.get(token, ()):
+                scores[position] = scores.get(position, 0) + 1
+        return min(scores, key=lambda p: (-scores[p], p)) if scores else None
+
+
+class LocalRecommender:
+    """Builds an LLM-shaped result (intent plus catalog ids) from the catalog alone.
+
+    Scenarios, datasets and agents are picked by vocabulary overlap with the
+    intent profile and the user's message; metrics come from the scenario's
+    ``recommended_metrics``, topped up with matching metrics from the
+    intent's categories.
+
+    Scoring uses the catalog's token sets (:class:`CatalogTerms`), which cost
+    O(catalog size) to build. Build them off the event loop with
+    :meth:`prepare`, and from the loop only call :meth:`recommend` in a
+    worker thread once :meth:`ready_terms` returns them.
+    """
+
+    def __init__(
+        self, profiles: Mapping[str, IntentProfile] = INTENT_PROFILES, max_metrics: int = 5
+    ) -> None:
+        """Initialize with per-intent profiles and a cap on recommended metrics."""
+        self.profiles = profiles
+        self.max_metrics = max_metrics
+        self._terms: Optional[Tuple[str, CatalogTerms]] = None
+        # Serializes builds; only ever taken in worker threads, never on the event loop.
+        self._build_lock = threading.Lock()
+
+    def ready_terms(self, catalog: Catalog) -> Optional[CatalogTerms]:
+        """Return the token sets of ``catalog`` if they are already built, without blocking."""
+        cached = self._terms
+        if catalog.version and cached is not None and cached[0] == catalog.version:
+            return cached[1]
+        return None
+
+    def terms_for(self, catalog: Catalog) -> CatalogTerms:
+        """Return the token sets of ``catalog``, building them once per version.
+
+        Blocks for the whole build on a miss, so call it from a worker
+        thread. Unversioned catalogs are tokenized on every call.
+        """
+        terms = self.ready_terms(catalog)
+        if terms is not None:
+            return terms
+        with self._build_lock:
+            terms = self.ready_terms(catalog)
+            if terms is None:
+                terms = CatalogTerms(catalog)
+                if catalog.version:
+                    self._terms = (catalog.version, terms)
+            return terms
+
+    async def prepare(self, catalog: Catalog) -> None:
+        """Build the token sets of ``catalog`` in a worker thread."""
+        await asyncio.to_thread(self.terms_for, catalog)
+
+    def recommend(self, intent: str, message: str, catalog: Catalog) -> dict:
+        """Return a result dict with the same fields the LLM is asked to produce."""
+        datasets, metrics, scenarios, agents = catalog.collections
+        terms = self.terms_for(catalog)
+        profile = self.profiles.get(intent, self.profiles["general_chat"])
+        message_tokens = set(tokenize(message))
+        vocabulary = set(profile.terms) | message_tokens
+
+        best_scenario = _best(
+            list(zip(scenarios, terms.scenarios)),
+            lambda pair: 2 * len(profile.terms & pair[1]) + len(message_tokens & pair[1]),
+        )
+        scenario = best_scenario[0] if best_scenario else (scenarios[0] if scenarios else None)
+        position = terms.best_dataset(message_tokens, profile.terms)
+        dataset = datasets[position if position is not None else 0] if datasets else None
+        # Prefer agents of the intent's types (via the type index), then by vocabulary.
+        typed = [a for t in sorted(profile.agent_types) for a in catalog.find_agents(t)]
+        pool = typed or list(agents)
+        agent = _best(
+            pool,
+            lambda a: bool(typed) + len(vocabulary & terms.agents.get(a.id, frozenset())),
+        ) or (pool[0] if pool else None)
+
+        metric_ids = self._select_metrics(profile, vocabulary, scenario, catalog, terms)
+
+        return {
+            "intent": intent,
+            "dataset_id": dataset.id if dataset else None,
+            "metric_ids": metric_ids,
+            "scenario_id": scenario.id if scenario else None,
+            "agent_id": agent.id if agent else None,
+            "reason": (
+                f"Matched your request to the {scenario.name} scenario and its recommended metrics."
+                if scenario
+                else "Based on your request, here's a recommended configuration."
+            ),
+        }
+
+    def _select_metrics(
+        self,
+        profile: IntentProfile,
+        vocabulary: Set[str],
+        scenario: Optional[Scenario],
+        catalog: Catalog,
+        terms: CatalogTerms,
+    ) -> List[str]:
+        selected = [
+            m
+            for m in ((scenario.recommended_metrics or []) if scenario else [])
+            if m in catalog.metrics_by_id
+        ]
+        candidates = catalog.get_metrics(
+            m.id for category in profile.metric_categories for m in catalog.find_metrics(category)
+        )
+        for m in candidates:
+            if len(selected) >= self.max_metrics:
+                break
+            if m.id not in selected and vocabulary & terms.metrics.get(m.id, frozenset()):
+                selected.append(m.id)
+        return selected
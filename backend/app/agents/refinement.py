@@ -0,0 +1,116 @@
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from app.agents.text import tokenize
+from app.models.catalog import Catalog
+from app.models.metric import Metric
+
+COST_RANK: Mapping[str, int] = {"low": 0, "medium": 1, "high": 2}
+
+# Tokenized follow-up -> refinement operation. Only these exact phrasings are
+# handled locally; anything else is a free-form follow-up for the LLM.
+REFINEMENT_PHRASES: Mapping[str, str] = {
+    "make it cheaper": "cheaper",
+    "cheaper": "cheaper",
+    "cheaper metrics": "cheaper",
+    "use cheaper metrics": "cheaper",
+    "add more safety metrics": "add_safety",
+    "add safety metrics": "add_safety",
+    "more safety metrics": "add_safety",
+    "more safety": "add_safety",
+}
+
+
+def _cost(metric: Metric) -> int:
+    return COST_RANK.get(metric.cost.casefold(), len(COST_RANK))
+
+
+def _names(metrics: Sequence[Metric]) -> str:
+    names = [m.name for m in metrics]
+    return names[0] if len(names) == 1 else ", ".join(names[:-1]) + " and " + names[-1]
+
+
+class RefinementEngine:
+    """Applies quick-reply refinements to the previous result using the catalog indexes.
+
+    ``cheaper`` swaps each High-cost metric for the cheapest Low or Medium
+    one of the same category; ``add_safety`` adds the cheapest Safety
+    metrics not yet selected. The other selected ids and the intent are
+    kept, and the reason explains what changed.
+    """
+
+    def __init__(
+        self,
+        phrases: Mapping[str, str] = REFINEMENT_PHRASES,
+        safety_category: str = "Safety",
+        safety_metrics_added: int = 2,
+    ) -> None:
+        """Initialize with the recognised phrases and how many Safety metrics one request adds."""
+        self.phrases = phrases
+        self.safety_category = safety_category
+        self.safety_metrics_added = safety_metrics_added
+        self._operations: Dict[str, Callable[[List[Metric], Catalog], Tuple[List[Metric], str]]] = {
+            "cheaper": self._cheaper,
+            "add_safety": self._add_safety,
+        }
+
+    def match(self, message: str) -> Optional[str]:
+        """Return the refinement operation ``message`` asks for, or ``None``."""
+        return self.phrases.get(" ".join(tokenize(message)))
+
+    def refine(self, message: str, previous: dict, catalog: Catalog) -> Optional[dict]:
+        """Apply the refinement ``message`` asks for to ``previous``, a result dict.
+
+        Returns:
+            The refined result, or ``None`` if ``message`` is not a known
+            refinement or ``previous`` has no metrics to refine
+        """
+        operation = self.match(message)
+        if operation is None:
+            return None
+        selected = catalog.get_metrics(previous.get("metric_ids") or [])
+        if not selected:
+            return None
+        metrics, reason = self._operations[operation](selected, catalog)
+        return {**previous, "metric_ids": [m.id for m in metrics], "reason": reason}
+
+    def _cheaper(self, selected: List[Metric], catalog: Catalog) -> Tuple[List[Metric], str]:
+        taken = {m.id for m in selected}
+        metrics: List[Metric] = []
+        swaps: List[str] = []
+        kept: List[Metric] = []
+        for metric in selected:
+            if metric.cost.casefold() != "high":
+                metrics.append(metric)
+                continue
+            candidates = [
+                c
+                for c in catalog.find_metrics(metric.category)
+                if c.id not in taken and _cost(c) < _cost(metric)
+            ]
+            if not candidates:
+                metrics.append(metric)
+                kept.append(metric)
+                continue
+            cheapest = min(candidates, key=_cost)
+            taken.add(cheapest.id)
+            metrics.append(cheapest)
+            swaps.append(
+                f"{metric.name} ({metric.cost} cost) for {cheapest.name} ({cheapest.cost} cost)"
+            )
+
+        if not swaps and not kept:
+            return metrics, "All selected metrics are already Low or Medium cost."
+        parts = []
+        if swaps:
+            parts.append("Swapped " + "; ".join(swaps) + ".")
+        if kept:
+            parts.append(f"Kept {_names(kept)}: no cheaper metric of the same category.")
+        return metrics, " ".join(parts)
+
+    def _add_safety(self, selected: List[Metric], catalog: Catalog) -> Tuple[List[Metric], str]:
+        taken = {m.id for m in selected}
+        candidates = [m for m in catalog.find_metrics(self.safety_category) if m.id not in taken]
+        added = sorted(candidates, key=_cost)[: self.safety_metrics_added]
+        if not added:
+            return selected, f"All {self.safety_category} metrics are already included."
+        return selected + added, f"Added {_names(added)} for broader safety coverage."
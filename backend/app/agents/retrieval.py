@@ -0,0 +1,148 @@
+import heapq
+import math
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from app.agents.text import tokenize
+from app.models.agent import AgentModel
+from app.models.catalog import Catalog
+from app.models.dataset import Dataset
+from app.models.metric import Metric
+from app.models.scenario import Scenario
+
+
+def index_terms(text: str) -> List[str]:
+    """Tokenize ``text`` and fold simple plurals so "metrics" matches "metric"."""
+    return [
+        t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t
+        for t in tokenize(text)
+    ]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents, with compact array postings.
+
+    Each term maps to parallel arrays of document positions and term
+    frequencies, so the index for hundreds of thousands of entries stays a
+    few bytes per posting.
+    """
+
+    def __init__(
+        self, documents: Iterable[Sequence[str]], k1: float = 1.5, b: float = 0.75
+    ) -> None:
+        """Index ``documents`` (each a sequence of terms) by position."""
+        self.k1 = k1
+        self.b = b
+        self._lengths = array("I")
+        postings: Dict[str, Tuple[array, array]] = {}
+        for position, terms in enumerate(documents):
+            self._lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                docs, counts = postings.setdefault(term, (array("I"), array("H")))
+                docs.append(position)
+                counts.append(min(count, 0xFFFF))
+        self._postings = postings
+        total = len(self._lengths)
+        self._avg_length = (sum(self._lengths) / total) if total else 0.0
+        self._idf = {
+            term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, (docs, _) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def search(self, query_terms: Iterable[str], limit: int) -> List[Tuple[int, float]]:
+        """Return up to ``limit`` ``(position, score)`` pairs with a positive score, best first.
+
+        Ties are broken by position, so results are deterministic.
+        """
+        scores: Dict[int, float] = {}
+        k1, b, avg, lengths = self.k1, self.b, self._avg_length or 1.0, self._lengths
+        for term in dict.fromkeys(query_terms):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            idf = self._idf[term]
+            for position, tf in zip(*posting):
+                norm = tf + k1 * (1 - b + b * lengths[position] / avg)
+                scores[position] = scores.get(position, 0.0) + idf * tf * (k1 + 1) / norm
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+@dataclass(frozen=True)
+class CatalogSelection:
+    """The catalog entries sent to the LLM for one request, in catalog order."""
+
+    datasets: Sequence[Dataset]
+    metrics: Sequence[Metric]
+    scenarios: Sequence[Scenario]
+    agents: Sequence[AgentModel]
+
+    @property
+    def collections(self) -> Tuple[Sequence, Sequence, Sequence, Sequence]:
+        """Return ``(datasets, metrics, scenarios, agents)`` for positional unpacking."""
+        return self.datasets, self.metrics, self.scenarios, self.agents
+
+
+class CatalogRetriever:
+    """Lexical top-k retrieval of datasets, metrics and scenarios for a user message.
+
+    Datasets are indexed on name, description and tags (tags counted twice),
+    metrics on name, description and category, scenarios on name and
+    description. Agents are few and always included in full.
+    """
+
+    def __init__(self, catalog: Catalog) -> None:
+        """Build the per-collection indexes for ``catalog`` (blocking; O(catalog size))."""
+        self.catalog = catalog
+        self.datasets = BM25Index(
+            index_terms(" ".join([d.name, d.description, *d.tags, *d.tags]))
+            for d in catalog.datasets
+        )
+        self.metrics = BM25Index(
+            index_terms(" ".join([m.name, m.description, m.category])) for m in catalog.metrics
+        )
+        self.scenarios = BM25Index(
+            index_terms(" ".join([s.name, s.description])) for s in catalog.scenarios
+        )
+
+    @staticmethod
+    def _top(index: BM25Index, items: Sequence, terms: List[str], k: int) -> List[int]:
+        """Positions of the ``k`` best matches, padded in catalog order when fewer match."""
+        if len(items) <= k:
+            return list(range(len(items)))
+        positions = [position for position, _ in index.search(terms, k)]
+        chosen = set(positions)
+        for position in range(len(items)):
+            if len(positions) >= k:
+                break
+            if position not in chosen:
+                positions.append(position)
+        return sorted(positions)
+
+    def select(self, message: str, k: int) -> CatalogSelection:
+        """Return the top-``k`` datasets, metrics and scenarios for ``message``.
+
+        The metrics recommended by the selected scenarios are always added,
+        so a scenario the LLM may pick arrives with its metrics.
+        """
+        catalog = self.catalog
+        terms = index_terms(message)
+        scenarios = [
+            catalog.scenarios[p] for p in self._top(self.scenarios, catalog.scenarios, terms, k)
+        ]
+        top_metrics = [
+            catalog.metrics[p].id for p in self._top(self.metrics, catalog.metrics, terms, k)
+        ]
+        recommended = [m for s in scenarios for m in s.recommended_metrics or []]
+        return CatalogSelection(
+            datasets=[
+                catalog.datasets[p] for p in self._top(self.datasets, catalog.datasets, terms, k)
+            ],
+            metrics=catalog.get_metrics(top_metrics + recommended),
+            scenarios=scenarios,
+            agents=catalog.agents,
+        )
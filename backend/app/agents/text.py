@@ -0,0 +1,31 @@
+import re
+from typing import List
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case ``text`` and split it into alphanumeric (optionally hyphenated) tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+_PIECE_RE = re.compile(r"[A-Za-z]+|[0-9]+|\n| {2,}|\t+|[^\sA-Za-z0-9]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the LLM token count of ``text`` without a tokenizer.
+
+    Approximates BPE tokenizers on English prose and JSON-ish text: a word
+    costs one token per five letters (rounded up), a number one per three
+    digits, a newline or a run of indentation one token, and every other
+    non-space character one token. Single spaces merge into the next word.
+    """
+    count = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece[0].isalpha():
+            count += (len(piece) + 4) // 5
+        elif piece[0].isdigit():
+            count += (len(piece) + 2) // 3
+        else:
+            count += 1
+    return count
@@ -1,34 +1,176 @@
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
-from app.models.recommendation import ChatRequest, ChatResponse
+from app.agents.llm_client import LLMOverloadedError
+from app.config import settings
+from app.models.recommendation import (
+    BatchChatItem,
+    BatchChatRequest,
+    BatchChatResponse,
+    ChatRequest,
+    ChatResponse,
+)
 from app.services.chat_service import ChatService, get_chat_service
-
+from app.services.response_encoder import RawJSONResponse
 
 router = APIRouter()
 
 
-@router.post("/chat", response_model=ChatResponse)
+@router.post("/chat", response_model=ChatResponse, response_class=RawJSONResponse)
 async def chat(
     request: ChatRequest,
     chat_service: ChatService = Depends(get_chat_service),
-) -> ChatResponse:
+) -> RawJSONResponse:
     """Process user message and return AI response with recommendation.
 
+    The body is assembled from pre-serialized catalog entries and returned
+    as-is; ``response_model`` only documents its schema.
+
+    When ``deadline_ms`` (or the server's ``chat_deadline_ms``) passes before
+    the LLM answers, a local catalog-based recommendation is returned with
+    ``degraded`` set.
+
+    Set ``start_session`` to start a conversation, and pass the returned
+    ``session_id`` back to continue it: the follow-up is answered from the
+    session's compact state plus the new message. Requests with neither are
+    stateless.
+
     Args:
-        request: Chat request with user message
+        request: Chat request with user message, optional deadline and session fields
         chat_service: Injected chat service singleton
 
     Returns:
         ChatResponse with AI content, recommendation, and quick replies
 
     Raises:
-        HTTPException: If message processing fails
+        HTTPException: If message processing fails, or 503 with ``Retry-After``
+            when the LLM is at capacity
     """
     try:
-        return await chat_service.process_message(request.message)
+        return RawJSONResponse(
+            await chat_service.process_message_json(
+                request.message, request.deadline_ms, request.session_id, request.start_session
+            )
+        )
+    except LLMOverloadedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except FileNotFoundError as e:
         raise HTTPException(status_code=500, detail=f"Data file error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+def _error_status(error: Exception) -> Tuple[int, str]:
+    """Map a processing error to the status code and detail /api/chat would return."""
+    if isinstance(error, LLMOverloadedError):
+        return 503, str(error)
+    if isinstance(error, ValueError):
+        return 400, str(error)
+    if isinstance(error, FileNotFoundError):
+        return 500, f"Data file error: {str(error)}"
+    return 500, f"Internal server error: {str(error)}"
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    chat_service: ChatService = Depends(get_chat_service),
+) -> StreamingResponse:
+    """Stream the recommendation as server-sent events while the LLM generates it.
+
+    Emits ``intent``, ``dataset``, ``metrics``, ``scenario``, ``agent`` and
+    ``reason`` events as each field is parsed, then ``done`` with the full
+    ChatResponse. Failures after the stream has started are sent as an
+    ``error`` event carrying the status code the JSON endpoint would return.
+
+    Args:
+        request: Chat request with user message
+        chat_service: Injected chat service singleton
+
+    Returns:
+        StreamingResponse with media type ``text/event-stream``
+    """
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event, data in chat_service.stream_message(request.message):
+                yield _sse(event, data)
+        except Exception as e:
+            status_code, detail = _error_status(e)
+            yield _sse("error", {"status_code": status_code, "detail": detail})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(
+    request: BatchChatRequest,
+    stream: bool = False,
+    chat_service: ChatService = Depends(get_chat_service),
+):
+    """Process many messages with bounded concurrency.
+
+    Messages are fanned out through the chat service with at most
+    ``settings.batch_concurrency`` in flight. Each item carries its input
+    ``index`` and either a ``response`` or an ``error`` with the status code
+    /api/chat would have returned, so one failure never fails the batch.
+
+    Args:
+        request: Batch request with the list of messages
+        stream: If true, return NDJSON with one item per line in completion order
+        chat_service: Injected chat service singleton
+
+    Returns:
+        BatchChatResponse with results in input order, or an NDJSON stream
+
+    Raises:
+        HTTPException: If the batch exceeds ``settings.batch_max_messages``
+    """
+    if len(request.messages) > settings.batch_max_messages:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch exceeds the limit of {settings.batch_max_messages} messages",
+        )
+
+    def to_item(index: int, outcome) -> BatchChatItem:
+        if isinstance(outcome, Exception):
+            status_code, detail = _error_status(outcome)
+            return BatchChatItem(index=index, status_code=status_code, error=detail)
+        return BatchChatItem(index=index, response=outcome)
+
+    if stream:
+
+        async def lines() -> AsyncIterator[str]:
+            async for index, outcome in chat_service.process_batch(request.messages):
+                yield to_item(index, outcome).model_dump_json() + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    results: List[Optional[BatchChatItem]] = [None] * len(request.messages)
+    async for index, outcome in chat_service.process_batch(request.messages):
+        results[index] = to_item(index, outcome)
+    return BatchChatResponse(results=results)
+
+
+@router.get("/chat/stats")
+async def chat_stats(
+    chat_service: ChatService = Depends(get_chat_service),
+) -> dict:
+    """Return chat pipeline counters (cache, coalescing, per-path latency)."""
+    return chat_service.stats()
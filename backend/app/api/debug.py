@@ -0,0 +1,26 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+
+from app.profiling import PROFILES
+
+router = APIRouter()
+
+
+@router.get("/profiles")
+async def list_profiles() -> List[dict]:
+    """Return the stored request profiles, newest first, without their call trees."""
+    return PROFILES.summaries()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str) -> dict:
+    """Return one stored request profile with its call tree.
+
+    Raises:
+        HTTPException: If no profile with that id is stored (any more)
+    """
+    profile = PROFILES.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found: {profile_id}")
+    return profile
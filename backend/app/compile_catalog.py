@@ -0,0 +1,38 @@
+"""Compile the catalog directory into a binary snapshot for fast cold starts.
+
+Run after changing the catalog files (e.g. as a deploy step); workers load
+the snapshot instead of the JSON while it is newer than every source file.
+
+Usage:
+    python -m app.compile_catalog [--data-dir data] [--output data/catalog.snapshot]
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+from app.config import settings
+from app.services.catalog_snapshot import compile_snapshot
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile the catalog into a binary snapshot.")
+    parser.add_argument("--data-dir", type=Path, default=Path(settings.data_dir))
+    parser.add_argument(
+        "--output", type=Path, help="snapshot path (default: <data-dir>/CATALOG_SNAPSHOT_FILE)"
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    header = asyncio.run(compile_snapshot(args.data_dir, args.output))
+    size = Path(header["path"]).stat().st_size
+    print(
+        f"wrote {header['path']} ({size / 1e6:.1f} MB, catalog version {header['version']}, "
+        f"{len(header['sources'])} sources) in {time.perf_counter() - start:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
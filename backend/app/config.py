@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,6 +9,39 @@ class Settings(BaseSettings):
     # z.ai API Configuration
     zai_api_key: str
     zai_model: str = "glm-4.7"
+    zai_base_url: str = "https://open.bigmodel.cn/api/paas/v4"
+
+    # LLM HTTP connection pool
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 30.0
+    llm_connect_timeout: float = 5.0
+    llm_read_timeout: float = 60.0
+    llm_write_timeout: float = 10.0
+    llm_pool_timeout: float = 10.0
+
+    # LLM call resilience: duplicate calls slower than the given latency percentile,
+    # retry transient errors with jittered exponential backoff, all under one deadline
+    llm_hedge_enabled: bool = True
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_initial_delay_ms: float = 5000.0
+    llm_hedge_min_delay_ms: float = 100.0
+    llm_hedge_min_samples: int = 20
+    llm_max_retries: int = 2
+    llm_retry_base_ms: float = 200.0
+    llm_retry_max_ms: float = 2000.0
+    llm_deadline_seconds: float = 30.0
+
+    # Adaptive (AIMD) limit on concurrent LLM calls with a bounded wait queue;
+    # calls that cannot get a slot in time are answered 503 with Retry-After
+    llm_admission_enabled: bool = True
+    llm_concurrency_initial: int = 20
+    llm_concurrency_min: int = 2
+    llm_concurrency_max: int = 100
+    llm_concurrency_backoff: float = 0.9
+    llm_concurrency_latency_threshold_ms: float = 10000.0
+    llm_queue_max: int = 200
+    llm_queue_max_wait_ms: float = 5000.0
 
     # API Configuration
     api_host: str = "0.0.0.0"
@@ -17,9 +52,64 @@ class Settings(BaseSettings):
     agent_temperature: float = 0.7
     agent_max_tokens: int = 2000
 
+    # Prompt context: send only the top-k BM25 matches per collection instead of the whole
+    # catalog, once the full-catalog prompt is estimated above context_retrieval_min_tokens
+    context_retrieval_enabled: bool = True
+    context_top_k: int = 8
+    context_retrieval_min_tokens: int = 8000
+
+    # Prompt context layout; descriptions are shortened to fit the budget (0 = no budget)
+    context_encoding: Literal["verbose", "compact"] = "verbose"
+    context_token_budget: int = 0
+
+    # Response cache (parsed LLM results keyed on message + catalog version)
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 1024
+    response_cache_ttl_seconds: float = 3600.0
+
+    # Local fast path (skip the LLM for confidently classified requests)
+    fast_path_enabled: bool = True
+    fast_path_confidence_threshold: float = 0.8
+
+    # Time budget for /api/chat; past it the local recommendation is returned
+    # marked degraded while the LLM call finishes in the background (0 = none)
+    chat_deadline_ms: float = 0.0
+
+    # Multi-turn sessions (compact history kept in an in-process LRU + TTL store)
+    session_enabled: bool = True
+    session_max_entries: int = 10000
+    session_ttl_seconds: float = 1800.0
+    session_max_turns: int = 5
+    session_summary_chars: int = 80
+
+    # Apply quick-reply refinements to a session's previous result without the LLM
+    refinement_enabled: bool = True
+
+    # Batch chat
+    batch_concurrency: int = 16
+    batch_max_messages: int = 1000
+
     # Data directory
     data_dir: str = "data"
 
+    # Catalog hot reload (mtime polling of the data directory)
+    catalog_watch_enabled: bool = True
+    catalog_watch_interval_seconds: float = 2.0
+
+    # Compiled catalog snapshot (python -m app.compile_catalog), relative to data_dir
+    catalog_snapshot_enabled: bool = True
+    catalog_snapshot_file: str = "catalog.snapshot"
+
+    # Prometheus metrics at /metrics
+    metrics_enabled: bool = True
+
+    # Per-request diagnostics: Server-Timing on /api/chat, opt-in sampling profiler
+    server_timing_enabled: bool = True
+    profiling_enabled: bool = False
+    profile_sample_rate: float = 0.0
+    profile_interval_ms: float = 5.0
+    profile_max_stored: int = 20
+
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=False,
@@ -1,11 +1,45 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 
 from app.api.chat import router as chat_router
+from app.api.debug import router as debug_router
 from app.config import settings
+from app.metrics import CONTENT_TYPE, REGISTRY
+from app.middleware import ProfilingMiddleware, ServerTimingMiddleware
+from app.profiling import PROFILES
+from app.services.catalog_watcher import CatalogWatcher
+from app.services.chat_service import ChatService, get_chat_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan.
 
+    Warms the catalog and LLM client in the background (see ``/ready``),
+    watches the catalog for changes, and closes LLM connections on shutdown.
+    """
+    chat_service = await get_chat_service()
+    warm_up = asyncio.create_task(chat_service.warm_up())
+    watcher = None
+    if settings.catalog_watch_enabled:
+        watcher = CatalogWatcher(
+            chat_service.data_service,
+            settings.catalog_watch_interval_seconds,
+            on_reload=chat_service.prepare_catalog,
+        )
+        watcher.start()
+    yield
+    warm_up.cancel()
+    if watcher is not None:
+        await watcher.stop()
+    await chat_service.aclose()
 
-app = FastAPI(title="AEval Backend", version="0.1.0")
+
+app = FastAPI(title="AEval Backend", version="0.1.0", lifespan=lifespan)
 
 # CORS for frontend
 app.add_middleware(
@@ -16,10 +50,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.server_timing_enabled:
+    app.add_middleware(ServerTimingMiddleware)
+
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=PROFILES,
+        sample_rate=settings.profile_sample_rate,
+        interval_seconds=settings.profile_interval_ms / 1000,
+    )
+
 app.include_router(chat_router, prefix="/api", tags=["chat"])
+if settings.profiling_enabled:
+    app.include_router(debug_router, prefix="/debug", tags=["debug"])
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check(chat_service: ChatService = Depends(get_chat_service)):
+    """Readiness endpoint: 200 once the catalog and LLM client are warm, 503 before."""
+    readiness = chat_service.readiness()
+    status = "ready" if readiness["ready"] else "not_ready"
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content={"status": status, **readiness},
+    )
+
+
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics in the text exposition format."""
+        return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,363 @@
+"""Process-wide Prometheus metrics, rendered in the text exposition format at ``/metrics``.
+
+Recording an observation is a few dict and list operations with no
+locking and no I/O; all formatting happens when ``/metrics`` is scraped.
+Callback gauges (e.g. executor queue depth) are only evaluated at scrape
+time, so they cost nothing between scrapes. Observations are made from
+the event loop thread.
+
+Stage histograms also add each timed block to the stage breakdown of the
+current request when one is being recorded (see :func:`record_stages`),
+which is what the ``Server-Timing`` header reports.
+"""
+
+import abc
+import asyncio
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Local stages take well under a millisecond, LLM calls tens of seconds.
+STAGE_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+)  # fmt: skip
+
+
+_request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stages", default=None)
+
+
+@contextmanager
+def record_stages() -> Iterator[Dict[str, float]]:
+    """Collect ``{stage: seconds}`` for stage timers run in this context (and tasks it starts).
+
+    Repeated stages are summed. Timers in tasks created before recording
+    started are not seen.
+    """
+    stages: Dict[str, float] = {}
+    token = _request_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _request_stages.reset(token)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric(abc.ABC):
+    """Base class: a named family of children, one per label-value combination.
+
+    Subclasses implement :meth:`_new_child` and :meth:`_samples`; one missing
+    either fails when it is instantiated, not at scrape time.
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self.labels()
+
+    @abc.abstractmethod
+    def _new_child(self, values: Tuple[str, ...]) -> object:
+        """Create the child holding the values for one label combination."""
+
+    def labels(self, *values: str):
+        """Return the child for the given label values, creating it on first use."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child(values)
+        return child
+
+    @abc.abstractmethod
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        """Return ``(sample name, label text, value)`` for every exposed sample."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count; ``name`` should end in ``_total``."""
+
+    type_name = "counter"
+
+    def _new_child(self, values: Tuple[str, ...]) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        return [
+            (self.name, _label_text(self.labelnames, values), child.value)
+            for values, child in self._children.items()
+        ]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def _new_child(self, values: Tuple[str, ...]) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        if self.function is not None:
+            return [(self.name, "", self.function())]
+        return [
+            (self.name, _label_text(self.labelnames, values), child.value)
+            for values, child in self._children.items()
+        ]
+
+
+class _Timer:
+    __slots__ = ("_child", "_started")
+
+    def __init__(self, child: "_HistogramChild") -> None:
+        self._child = child
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self._started
+        self._child.observe(elapsed)
+        stage = self._child.stage
+        if stage is not None:
+            stages = _request_stages.get()
+            if stages is not None:
+                stages[stage] = stages.get(stage, 0.0) + elapsed
+
+
+class _HistogramChild:
+    __slots__ = ("_upper_bounds", "counts", "sum", "stage")
+
+    def __init__(self, upper_bounds: Sequence[float], stage: Optional[str] = None) -> None:
+        self._upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.stage = stage
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self._upper_bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> _Timer:
+        """Context manager observing the duration of its block in seconds."""
+        return _Timer(self)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative ``le`` buckets, plus sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = STAGE_BUCKETS,
+        request_stages: bool = False,
+    ) -> None:
+        """Create the histogram.
+
+        Args:
+            name: Metric name, ending in the unit (e.g. ``_seconds``)
+            documentation: HELP text
+            labelnames: Label names
+            buckets: Upper bounds of the finite buckets
+            request_stages: Also report ``time()`` blocks to :func:`record_stages`,
+                named after the first label value
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.request_stages = request_stages
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self, values: Tuple[str, ...]) -> _HistogramChild:
+        stage = values[0] if self.request_stages and values else None
+        return _HistogramChild(self.buckets, stage)
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        samples = []
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                samples.append(
+                    (f"{self.name}_bucket", _label_text(self.labelnames, values, le), cumulative)
+                )
+            labels = _label_text(self.labelnames, values)
+            samples.append((f"{self.name}_sum", labels, child.sum))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add ``metric``; names must be unique."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric name: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+def _executor_queue_depth() -> float:
+    """Work items waiting for a thread in the running loop's default executor."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return 0
+    executor = getattr(loop, "_default_executor", None)
+    queue = getattr(executor, "_work_queue", None)
+    return queue.qsize() if queue is not None else 0
+
+
+REGISTRY = Registry()
+
+CHAT_STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "aeval_chat_stage_seconds",
+        "Time spent in each stage of ChatService message processing.",
+        ["stage"],
+        request_stages=True,
+    )
+)
+CHAT_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "aeval_chat_request_seconds",
+        "End-to-end ChatService message processing time by the path that answered.",
+        ["path"],
+    )
+)
+AGENT_STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "aeval_agent_stage_seconds",
+        "Time spent in each stage of EvaluationAgent request processing.",
+        ["stage"],
+        request_stages=True,
+    )
+)
+LLM_ERRORS = REGISTRY.register(
+    Counter("aeval_llm_errors_total", "Failed LLM requests by error type.", ["type"])
+)
+LLM_JSON_REPAIRS = REGISTRY.register(
+    Counter(
+        "aeval_llm_json_repairs_total",
+        "Repairs applied to malformed JSON in LLM completions, by repair.",
+        ["repair"],
+    )
+)
+LLM_RETRIES = REGISTRY.register(
+    Counter("aeval_llm_retries_total", "LLM calls retried after a transient error.")
+)
+LLM_HEDGES_FIRED = REGISTRY.register(
+    Counter("aeval_llm_hedges_fired_total", "Duplicate LLM calls started for slow attempts.")
+)
+LLM_HEDGES_WON = REGISTRY.register(
+    Counter("aeval_llm_hedges_won_total", "Hedged attempts answered by the duplicate call first.")
+)
+LLM_REJECTED = REGISTRY.register(
+    Counter(
+        "aeval_llm_rejected_total",
+        "LLM calls refused by admission control (answered 503), by reason.",
+        ["reason"],
+    )
+)
+LLM_CONCURRENCY_LIMIT = REGISTRY.register(
+    Gauge("aeval_llm_concurrency_limit", "Current adaptive limit on concurrent LLM calls.")
+)
+LLM_QUEUE_LENGTH = REGISTRY.register(
+    Gauge("aeval_llm_queue_length", "LLM calls waiting for a slot under the concurrency limit.")
+)
+CHAT_INFLIGHT = REGISTRY.register(
+    Gauge("aeval_chat_inflight_requests", "Chat messages currently being processed.")
+)
+LLM_INFLIGHT = REGISTRY.register(
+    Gauge("aeval_llm_inflight_requests", "LLM chat-completion requests currently in flight.")
+)
+EXECUTOR_QUEUE_DEPTH = REGISTRY.register(
+    Gauge(
+        "aeval_executor_queue_depth",
+        "Work items waiting for a thread in the default executor (asyncio.to_thread).",
+        function=_executor_queue_depth,
+    )
+)
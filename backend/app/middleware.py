@@ -0,0 +1,124 @@
+import random
+import threading
+import time
+import uuid
+from typing import Dict, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import record_stages
+from app.profiling import ProfileStore, SamplingProfiler
+
+PROFILE_REQUEST_HEADER = "x-debug-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+def server_timing(stages: Dict[str, float], total_seconds: float) -> str:
+    """Format a ``Server-Timing`` value, durations in milliseconds, ``total`` last."""
+    entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in stages.items()]
+    entries.append(f"total;dur={total_seconds * 1000:.3f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """Adds a ``Server-Timing`` header with the request's stage breakdown.
+
+    Stages are the ``aeval_chat_stage_seconds`` and ``aeval_agent_stage_seconds``
+    timers run while handling the request. The header is sent with the
+    response start, so streamed responses only report the stages finished
+    before their first byte.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Sequence[str] = ("/api/chat",)) -> None:
+        """Wrap ``app``, timing requests whose path is one of ``paths``."""
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        with record_stages() as stages:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing", server_timing(stages, time.perf_counter() - started)
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+
+class ProfilingMiddleware:
+    """Profiles requests that ask for it (``X-Debug-Profile: 1``) or are sampled.
+
+    One request is profiled at a time; others pass through untouched while a
+    profile is running. Finished profiles go to ``store`` and the response
+    carries their id in ``X-Profile-Id``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        sample_rate: float = 0.0,
+        interval_seconds: float = 0.005,
+    ) -> None:
+        """Wrap ``app``.
+
+        Args:
+            app: The ASGI application
+            store: Where finished profiles are kept
+            sample_rate: Fraction of requests profiled without the debug header
+            interval_seconds: Stack sampling interval
+        """
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.interval_seconds = interval_seconds
+        self._active = False
+
+    def _wanted(self, scope: Scope) -> bool:
+        if Headers(scope=scope).get(PROFILE_REQUEST_HEADER, "").lower() in ("1", "true"):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._active or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        self._active = True
+        started_at = time.time()
+        started = time.perf_counter()
+        profiler = SamplingProfiler(threading.get_ident(), self.interval_seconds)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            tree = profiler.stop()
+            self._active = False
+            self.store.add(
+                {
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "started_at": started_at,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    "samples": tree["samples"],
+                    "error": profiler.error,
+                    "tree": tree,
+                }
+            )
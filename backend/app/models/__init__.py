@@ -2,14 +2,28 @@ from app.models.dataset import Dataset
 from app.models.metric import Metric
 from app.models.scenario import Scenario
 from app.models.agent import AgentModel
-from app.models.recommendation import Recommendation, ChatRequest, ChatResponse
+from app.models.catalog import Catalog
+from app.models.jsonl_collection import JsonlCollection
+from app.models.recommendation import (
+    Recommendation,
+    ChatRequest,
+    ChatResponse,
+    BatchChatRequest,
+    BatchChatItem,
+    BatchChatResponse,
+)
 
 __all__ = [
     "Dataset",
     "Metric",
     "Scenario",
     "AgentModel",
+    "Catalog",
+    "JsonlCollection",
     "Recommendation",
     "ChatRequest",
     "ChatResponse",
+    "BatchChatRequest",
+    "BatchChatItem",
+    "BatchChatResponse",
 ]
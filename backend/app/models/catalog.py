@@ -0,0 +1,178 @@
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+from app.models.dataset import Dataset
+from app.models.metric import Metric
+from app.models.scenario import Scenario
+from app.models.agent import AgentModel
+from app.models.jsonl_collection import JsonlCollection
+
+T = TypeVar("T")
+
+# Collection -> fields grouped into attribute indexes (see Catalog.find_*)
+INDEX_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "datasets": ("tags",),
+    "metrics": ("category", "cost"),
+    "scenarios": (),
+    "agents": ("type",),
+}
+
+
+def _by_id(items: Sequence[T]) -> Mapping[str, T]:
+    """Index items by id; the first occurrence wins, like a linear scan would."""
+    if isinstance(items, JsonlCollection):
+        return items.by_id()
+    index: Dict[str, T] = {}
+    for item in items:
+        index.setdefault(item.id, item)
+    return MappingProxyType(index)
+
+
+def _group(items: Sequence[T], field_name: str) -> Mapping[str, Sequence[T]]:
+    """Group items under each of their (case-folded) ``field_name`` values, in catalog order."""
+    if isinstance(items, JsonlCollection):
+        return items.group_by(field_name)
+    groups: Dict[str, List[T]] = {}
+    for item in items:
+        value = getattr(item, field_name)
+        keys: Iterable[str] = [value] if isinstance(value, str) else value
+        for key in dict.fromkeys(k.casefold() for k in keys):
+            groups.setdefault(key, []).append(item)
+    return MappingProxyType({key: tuple(group) for key, group in groups.items()})
+
+
+def _positions(items: Sequence[T]) -> Mapping[str, int]:
+    """Map each id to the position of its first occurrence."""
+    if isinstance(items, JsonlCollection):
+        return items.positions
+    positions: Dict[str, int] = {}
+    for position, item in enumerate(items):
+        positions.setdefault(item.id, position)
+    return MappingProxyType(positions)
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Immutable snapshot of every evaluation resource plus a content version.
+
+    ``version`` is a hash of the source files, so two snapshots with the same
+    version hold identical data and anything keyed on it (caches, prompts)
+    can be reused safely. ``generation`` counts the snapshots a DataService
+    has swapped in. Id and attribute indexes are built once at construction
+    and are read-only.
+
+    A collection may be a :class:`JsonlCollection`, in which case it is kept
+    as-is and its prebuilt position indexes back the lookups, so entries are
+    only materialized when they are returned.
+    """
+
+    datasets: Sequence[Dataset]
+    metrics: Sequence[Metric]
+    scenarios: Sequence[Scenario]
+    agents: Sequence[AgentModel]
+    version: str = ""
+    generation: int = 0
+
+    datasets_by_id: Mapping[str, Dataset] = field(init=False, repr=False, compare=False)
+    metrics_by_id: Mapping[str, Metric] = field(init=False, repr=False, compare=False)
+    scenarios_by_id: Mapping[str, Scenario] = field(init=False, repr=False, compare=False)
+    agents_by_id: Mapping[str, AgentModel] = field(init=False, repr=False, compare=False)
+    datasets_by_tag: Mapping[str, Sequence[Dataset]] = field(init=False, repr=False, compare=False)
+    metrics_by_category: Mapping[str, Sequence[Metric]] = field(
+        init=False, repr=False, compare=False
+    )
+    metrics_by_cost: Mapping[str, Sequence[Metric]] = field(init=False, repr=False, compare=False)
+    agents_by_type: Mapping[str, Sequence[AgentModel]] = field(
+        init=False, repr=False, compare=False
+    )
+    _metric_positions: Mapping[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        set_ = object.__setattr__
+        for name in INDEX_FIELDS:
+            items = getattr(self, name)
+            if not isinstance(items, JsonlCollection):
+                set_(self, name, tuple(items))
+
+        set_(self, "datasets_by_id", _by_id(self.datasets))
+        set_(self, "metrics_by_id", _by_id(self.metrics))
+        set_(self, "scenarios_by_id", _by_id(self.scenarios))
+        set_(self, "agents_by_id", _by_id(self.agents))
+        set_(self, "datasets_by_tag", _group(self.datasets, "tags"))
+        set_(self, "metrics_by_category", _group(self.metrics, "category"))
+        set_(self, "metrics_by_cost", _group(self.metrics, "cost"))
+        set_(self, "agents_by_type", _group(self.agents, "type"))
+        set_(self, "_metric_positions", _positions(self.metrics))
+
+    def __getstate__(self) -> Dict[str, object]:
+        # Read-only index views are not picklable; store their dicts so a
+        # compiled snapshot restores the indexes without rebuilding them.
+        return {
+            name: dict(value) if isinstance(value, MappingProxyType) else value
+            for name, value in self.__dict__.items()
+        }
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        for name, value in state.items():
+            if isinstance(value, dict):
+                value = MappingProxyType(value)
+            object.__setattr__(self, name, value)
+
+    def with_generation(self, generation: int) -> "Catalog":
+        """Return this snapshot under another generation, sharing its data and indexes."""
+        clone = object.__new__(Catalog)
+        clone.__dict__.update(self.__dict__)
+        object.__setattr__(clone, "generation", generation)
+        return clone
+
+    @property
+    def collections(
+        self,
+    ) -> Tuple[Sequence[Dataset], Sequence[Metric], Sequence[Scenario], Sequence[AgentModel]]:
+        """Return ``(datasets, metrics, scenarios, agents)`` for positional unpacking."""
+        return self.datasets, self.metrics, self.scenarios, self.agents
+
+    def get_dataset(self, dataset_id: Optional[str]) -> Optional[Dataset]:
+        """Return the dataset with ``dataset_id``, or ``None``."""
+        return self.datasets_by_id.get(dataset_id) if isinstance(dataset_id, str) else None
+
+    def get_metric(self, metric_id: Optional[str]) -> Optional[Metric]:
+        """Return the metric with ``metric_id``, or ``None``."""
+        return self.metrics_by_id.get(metric_id) if isinstance(metric_id, str) else None
+
+    def get_scenario(self, scenario_id: Optional[str]) -> Optional[Scenario]:
+        """Return the scenario with ``scenario_id``, or ``None``."""
+        return self.scenarios_by_id.get(scenario_id) if isinstance(scenario_id, str) else None
+
+    def get_agent(self, agent_id: Optional[str]) -> Optional[AgentModel]:
+        """Return the agent with ``agent_id``, or ``None``."""
+        return self.agents_by_id.get(agent_id) if isinstance(agent_id, str) else None
+
+    def get_metrics(self, metric_ids: Iterable[str]) -> List[Metric]:
+        """Return the known metrics among ``metric_ids`` in catalog order, without duplicates."""
+        positions = self._metric_positions
+        found = {positions[i] for i in metric_ids if isinstance(i, str) and i in positions}
+        return [self.metrics[p] for p in sorted(found)]
+
+    def find_datasets(self, tag: str) -> Sequence[Dataset]:
+        """Return datasets carrying ``tag`` (case-insensitive)."""
+        return self.datasets_by_tag.get(tag.casefold(), ())
+
+    def find_metrics(
+        self, category: Optional[str] = None, cost: Optional[str] = None
+    ) -> Sequence[Metric]:
+        """Return metrics with ``category`` and/or ``cost`` (case-insensitive), in catalog order."""
+        if category is None and cost is None:
+            return self.metrics
+        if category is None:
+            return self.metrics_by_cost.get(cost.casefold(), ())
+        by_category = self.metrics_by_category.get(category.casefold(), ())
+        if cost is None:
+            return by_category
+        cost = cost.casefold()
+        return tuple(m for m in by_category if m.cost.casefold() == cost)
+
+    def find_agents(self, agent_type: str) -> Sequence[AgentModel]:
+        """Return agents of ``agent_type`` (case-insensitive)."""
+        return self.agents_by_type.get(agent_type.casefold(), ())
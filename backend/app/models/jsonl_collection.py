@@ -0,0 +1,217 @@
+import hashlib
+import mmap
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+from typing import (
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    overload,
+)
+
+from pydantic import BaseModel, ValidationError
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class JsonlCollection(Sequence[T], Generic[T]):
+    """Read-only sequence of models backed by a memory-mapped JSONL file.
+
+    Opening the file makes one streaming pass over it that validates every
+    line, hashes the bytes and records each entry's byte range, id and the
+    values of the requested index fields. No model is kept: an entry is
+    parsed from its byte range when it is accessed, and only the most
+    recently used ``cache_size`` models stay in memory. Resident memory is
+    therefore the byte-offset arrays plus the id and field indexes, while
+    the file contents are paged in by the OS on demand. The cache is guarded
+    by a lock, since entries are read from worker threads and the event loop
+    at the same time.
+
+    The mapping pins the file that was opened, so catalogs must be replaced
+    by writing a new file and renaming it over the old one; truncating a
+    mapped file in place invalidates pages a live snapshot may still read.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        model: Type[T],
+        index_fields: Iterable[str] = (),
+        cache_size: int = 1024,
+    ) -> None:
+        """Map ``path`` and index it.
+
+        Args:
+            path: JSONL file with one JSON object per line (blank lines are skipped)
+            model: Pydantic model each line is validated against
+            index_fields: Fields to group entry positions by (string or list of strings)
+            cache_size: Number of materialized models kept in the LRU cache
+
+        Raises:
+            FileNotFoundError: If the file is not found
+            ValueError: If a line is not valid JSON or fails validation
+        """
+        self.path = Path(path)
+        self.model = model
+        self._cache_size = max(0, cache_size)
+        self._cache: "OrderedDict[int, T]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._starts = array("Q")
+        self._ends = array("Q")
+        positions: Dict[str, int] = {}
+        groups: Dict[str, Dict[str, array]] = {name: {} for name in index_fields}
+
+        with open(self.path, "rb") as f:
+            size = f.seek(0, 2)
+            self._mm: Union[mmap.mmap, bytes] = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+        self.digest = hashlib.sha256(self._mm).hexdigest()
+
+        for position, (start, end, raw) in enumerate(self._scan()):
+            try:
+                item = model.model_validate_json(raw)
+            except ValidationError as e:
+                invalid_json = e.errors()[0]["type"] == "json_invalid"
+                kind = "Invalid JSON" if invalid_json else "Data validation error"
+                raise ValueError(f"{kind} in {self.path} at byte {start}: {e}")
+            self._starts.append(start)
+            self._ends.append(end)
+            positions.setdefault(item.id, position)
+            for name, group in groups.items():
+                value = getattr(item, name)
+                keys = [value] if isinstance(value, str) else value or ()
+                for key in dict.fromkeys(k.casefold() for k in keys):
+                    group.setdefault(key, array("I")).append(position)
+
+        self.positions: Mapping[str, int] = MappingProxyType(positions)
+        self._groups = groups
+
+    def _scan(self) -> Iterator[Tuple[int, int, bytes]]:
+        """Yield ``(start, end, line)`` for every non-blank line of the mapping."""
+        mm = self._mm
+        size = len(mm)
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", start)
+            if end == -1:
+                end = size
+            line = mm[start:end]
+            if line.strip():
+                yield start, end, line
+            start = end + 1
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[T]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("JsonlCollection index out of range")
+        cache = self._cache
+        with self._cache_lock:
+            item = cache.get(index)
+            if item is not None:
+                cache.move_to_end(index)
+                return item
+        # Parse outside the lock; a concurrent miss on the same entry just parses it twice.
+        item = self.model.model_validate_json(self._mm[self._starts[index] : self._ends[index]])
+        if self._cache_size:
+            with self._cache_lock:
+                cache[index] = item
+                cache.move_to_end(index)
+                while len(cache) > self._cache_size:
+                    cache.popitem(last=False)
+        return item
+
+    def __iter__(self) -> Iterator[T]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def get(self, item_id: str) -> Optional[T]:
+        """Return the first entry with ``item_id``, or ``None``."""
+        position = self.positions.get(item_id)
+        return None if position is None else self[position]
+
+    def by_id(self) -> Mapping[str, T]:
+        """Return a read-only id -> model mapping that materializes entries on lookup."""
+        return _LazyIdIndex(self)
+
+    def group_by(self, field: str) -> Mapping[str, Sequence[T]]:
+        """Return a read-only mapping of case-folded ``field`` value -> matching entries.
+
+        Raises:
+            KeyError: If ``field`` was not listed in ``index_fields``
+        """
+        return MappingProxyType(
+            {key: JsonlView(self, positions) for key, positions in self._groups[field].items()}
+        )
+
+    def stats(self) -> dict:
+        """Return the entry count, mapped size and materialization cache fill."""
+        return {
+            "path": str(self.path),
+            "entries": len(self),
+            "mapped_bytes": len(self._mm),
+            "cached_models": len(self._cache),
+        }
+
+
+class JsonlView(Sequence[T]):
+    """Sequence of selected positions in a :class:`JsonlCollection`, materialized on access."""
+
+    def __init__(self, collection: JsonlCollection[T], positions: Sequence[int]) -> None:
+        self._collection = collection
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._collection[p] for p in self._positions[index]]
+        return self._collection[self._positions[index]]
+
+    def __iter__(self) -> Iterator[T]:
+        for position in self._positions:
+            yield self._collection[position]
+
+
+class _LazyIdIndex(Mapping[str, T]):
+    """Id -> model mapping over a :class:`JsonlCollection`'s position index."""
+
+    def __init__(self, collection: JsonlCollection[T]) -> None:
+        self._collection = collection
+
+    def __getitem__(self, item_id: str) -> T:
+        return self._collection[self._collection.positions[item_id]]
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._collection.positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._collection.positions)
+
+    def __len__(self) -> int:
+        return len(self._collection.positions)
@@ -20,6 +20,9 @@ class ChatRequest(BaseModel):
     """Request model for chat endpoint."""
 
     message: str = Field(..., min_length=1, max_length=10000)
+    deadline_ms: Optional[float] = Field(None, ge=0, le=600000)
+    session_id: Optional[str] = Field(None, max_length=64)
+    start_session: bool = False
 
     @field_validator("message")
     @classmethod
@@ -36,3 +39,32 @@ class ChatResponse(BaseModel):
     content: str
     recommendation: Optional[Recommendation] = None
     quick_replies: List[str] = Field(default_factory=list)
+    degraded: bool = False
+    session_id: Optional[str] = None
+
+
+class BatchChatRequest(BaseModel):
+    """Request model for batch chat endpoint."""
+
+    messages: List[str] = Field(..., min_length=1)
+
+    @field_validator("messages")
+    @classmethod
+    def validate_messages(cls, v: List[str]) -> List[str]:
+        """Validate each message with the same rules as ChatRequest."""
+        return [ChatRequest(message=m).message for m in v]
+
+
+class BatchChatItem(BaseModel):
+    """Result for one message of a batch, identified by its input position."""
+
+    index: int
+    status_code: int = 200
+    response: Optional[ChatResponse] = None
+    error: Optional[str] = None
+
+
+class BatchChatResponse(BaseModel):
+    """Response model for batch chat endpoint; results are in input order."""
+
+    results: List[BatchChatItem]
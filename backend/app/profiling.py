@@ -0,0 +1,123 @@
+"""Opt-in sampling profiler for individual requests.
+
+While a profiled request is in flight, a daemon thread samples the stack of
+the event loop thread every few milliseconds and folds the samples into a
+call tree. Coroutines only appear on that stack while they are running, so
+the tree shows where the loop spent CPU for the request; time spent
+awaiting I/O shows up under the loop's selector. Work of other requests
+running concurrently on the same loop is sampled too.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+MAX_DEPTH = 128
+
+
+class _Node:
+    __slots__ = ("samples", "children")
+
+    def __init__(self) -> None:
+        self.samples = 0
+        self.children: Dict[str, "_Node"] = {}
+
+    def to_dict(self, name: str) -> Dict[str, Any]:
+        children = sorted(self.children.items(), key=lambda item: -item[1].samples)
+        return {
+            "name": name,
+            "samples": self.samples,
+            "children": [child.to_dict(child_name) for child_name, child in children],
+        }
+
+
+def _frame_name(code) -> str:
+    # co_qualname is new in Python 3.11; older versions only have the bare name.
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval and builds a call tree.
+
+    If sampling fails, the thread stops and the failure is kept in ``error``
+    so the profile is not silently empty.
+    """
+
+    def __init__(self, thread_id: int, interval_seconds: float = 0.005) -> None:
+        """Prepare to sample ``thread_id`` every ``interval_seconds``."""
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self._root = _Node()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[str] = None
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop sampling and return the call tree (root node ``"all"``)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self._root.to_dict("all")
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.wait(self.interval_seconds):
+                frame = sys._current_frames().get(self.thread_id)
+                if frame is None:
+                    return
+                self._add(frame)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+
+    def _add(self, frame) -> None:
+        stack: List[str] = []
+        while frame is not None:
+            stack.append(_frame_name(frame.f_code))
+            frame = frame.f_back
+        node = self._root
+        node.samples += 1
+        for name in reversed(stack[-MAX_DEPTH:]):
+            child = node.children.get(name)
+            if child is None:
+                child = node.children[name] = _Node()
+            child.samples += 1
+            node = child
+
+
+class ProfileStore:
+    """The most recent request profiles, oldest dropped first."""
+
+    def __init__(self, max_profiles: int = 20) -> None:
+        """Keep at most ``max_profiles`` profiles."""
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        """Store ``profile`` under its ``id``, evicting the oldest beyond capacity."""
+        self._profiles[profile["id"]] = profile
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Return a stored profile with its call tree, or ``None``."""
+        return self._profiles.get(profile_id)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """Return every stored profile without its call tree, newest first."""
+        return [
+            {key: value for key, value in profile.items() if key != "tree"}
+            for profile in reversed(self._profiles.values())
+        ]
+
+
+PROFILES = ProfileStore(settings.profile_max_stored)
@@ -1,6 +1,7 @@
 """Services for business logic and data access."""
 
 from app.services.data_service import DataService
+from app.services.response_cache import ResponseCache
 from app.services.chat_service import ChatService, get_chat_service
 
-__all__ = ["DataService", "ChatService", "get_chat_service"]
+__all__ = ["DataService", "ResponseCache", "ChatService", "get_chat_service"]
@@ -0,0 +1,151 @@
+"""Compiled binary catalog snapshots.
+
+A snapshot holds a validated :class:`Catalog` with its indexes already
+built, so a worker can start without parsing or validating the JSON
+sources. Layout::
+
+    MAGIC | header length (4 bytes, big-endian) | JSON header | pickle payload
+
+The header records the format version, the catalog content version, the
+source file names and a SHA-256 of the payload. Snapshots are produced by
+this repository's own build step and are trusted like the rest of the data
+directory; never load one from an untrusted location.
+
+Snapshots are compiled with ``python -m app.compile_catalog``.
+"""
+
+import gc
+import hashlib
+import json
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app.models.catalog import Catalog
+
+SNAPSHOT_MAGIC = b"AEVALCAT"
+SNAPSHOT_FORMAT = 1
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is unreadable, corrupt or of another format."""
+
+
+def write_snapshot(catalog: Catalog, sources: Sequence[Path], path: Path) -> Dict[str, Any]:
+    """Serialize ``catalog`` to ``path`` atomically and return the header written.
+
+    Raises:
+        TypeError: If a collection cannot be snapshotted (e.g. a memory-mapped JSONL one)
+    """
+    payload = pickle.dumps(catalog.with_generation(0), protocol=pickle.HIGHEST_PROTOCOL)
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": catalog.version,
+        "sources": [Path(source).name for source in sources],
+        "payload_sha256": hashlib.sha256(payload).hexdigest(),
+        "created_at": time.time(),
+    }
+    header_bytes = json.dumps(header).encode()
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(len(header_bytes).to_bytes(4, "big"))
+        f.write(header_bytes)
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_header(path: Path) -> Tuple[Dict[str, Any], int]:
+    """Return a snapshot's header and the offset its payload starts at.
+
+    Raises:
+        FileNotFoundError: If the snapshot does not exist
+        SnapshotError: If the file is not a snapshot of the supported format
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(len(SNAPSHOT_MAGIC) + 4)
+        if len(prefix) < len(SNAPSHOT_MAGIC) + 4 or not prefix.startswith(SNAPSHOT_MAGIC):
+            raise SnapshotError(f"Not a catalog snapshot: {path}")
+        length = int.from_bytes(prefix[len(SNAPSHOT_MAGIC) :], "big")
+        try:
+            header = json.loads(f.read(length))
+        except ValueError as e:
+            raise SnapshotError(f"Corrupt snapshot header in {path}: {e}")
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(
+            f"Unsupported snapshot format {header.get('format')!r} in {path}"
+            f" (expected {SNAPSHOT_FORMAT})"
+        )
+    return header, len(prefix) + length
+
+
+def read_snapshot(path: Path) -> Catalog:
+    """Load the catalog stored in a snapshot, verifying its payload hash.
+
+    Raises:
+        FileNotFoundError: If the snapshot does not exist
+        SnapshotError: If the file is corrupt or of another format
+    """
+    header, offset = read_header(path)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        payload = f.read()
+    if hashlib.sha256(payload).hexdigest() != header["payload_sha256"]:
+        raise SnapshotError(f"Snapshot payload hash mismatch in {path}")
+    # Unpickling allocates one container per record and none of them are
+    # garbage; pausing the cyclic collector avoids repeated full-heap passes.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        catalog = pickle.loads(payload)
+    except Exception as e:
+        raise SnapshotError(f"Cannot unpickle snapshot {path}: {e}")
+    finally:
+        if gc_enabled:
+            gc.enable()
+    if not isinstance(catalog, Catalog) or catalog.version != header["version"]:
+        raise SnapshotError(f"Snapshot {path} does not hold the catalog its header describes")
+    return catalog
+
+
+def is_fresh(path: Path, sources: Sequence[Path]) -> bool:
+    """Return whether the snapshot exists, covers ``sources`` and is newer than all of them."""
+    try:
+        header, _ = read_header(path)
+        snapshot_mtime = path.stat().st_mtime_ns
+        source_mtimes = [Path(source).stat().st_mtime_ns for source in sources]
+    except (FileNotFoundError, SnapshotError):
+        return False
+    if header["sources"] != [Path(source).name for source in sources]:
+        return False
+    return all(mtime <= snapshot_mtime for mtime in source_mtimes)
+
+
+async def compile_snapshot(data_dir: Path, output: Optional[Path] = None) -> Dict[str, Any]:
+    """Load the JSON catalog in ``data_dir`` and compile it into a snapshot.
+
+    Returns:
+        The header written, plus ``path``
+
+    Raises:
+        FileNotFoundError: If a data file is not found
+        ValueError: If JSON is invalid, validation fails, or a source is JSONL
+    """
+    from app.services.data_service import DataService
+
+    service = DataService(data_dir, use_snapshot=False)
+    sources = service.source_files()
+    jsonl = [source.name for source in sources if source.suffix == ".jsonl"]
+    if jsonl:
+        raise ValueError(
+            f"JSONL collections are memory-mapped at load time and cannot be snapshotted: {jsonl}"
+        )
+    catalog = await service.load_catalog()
+    path = Path(output) if output else service.snapshot_path
+    header = write_snapshot(catalog, sources, path)
+    return {**header, "path": str(path)}
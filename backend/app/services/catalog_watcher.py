@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Tuple
+
+from app.services.data_service import DataService
+
+logger = logging.getLogger(__name__)
+
+FileSignature = Tuple[Tuple[str, int, int], ...]
+
+
+class CatalogWatcher:
+    """Poll the catalog source files' mtimes and hot-reload the DataService on change.
+
+    Polling ``stat`` results needs no extra dependency and behaves the same on
+    every platform and on network mounts where inotify is unreliable.
+    """
+
+    def __init__(
+        self,
+        data_service: DataService,
+        interval_seconds: float = 2.0,
+        on_reload: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> None:
+        """Initialize the watcher; call :meth:`start` to begin polling.
+
+        Args:
+            data_service: Service whose catalog is reloaded
+            interval_seconds: Seconds between polls
+            on_reload: Coroutine function awaited after each swap, e.g. to
+                prebuild structures derived from the new catalog
+        """
+        self.data_service = data_service
+        self.interval_seconds = interval_seconds
+        self.on_reload = on_reload
+        self._signature: Optional[FileSignature] = None
+        self._task: Optional[asyncio.Task] = None
+        self.reloads = 0
+        self.failures = 0
+
+    def _stat_files(self) -> FileSignature:
+        signature = []
+        for path in self.data_service.source_files():
+            try:
+                stat = path.stat()
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((str(path), -1, -1))
+        return tuple(signature)
+
+    async def check(self) -> bool:
+        """Reload the catalog if any source file changed since the last check.
+
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        signature = await asyncio.to_thread(self._stat_files)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            swapped = await self.data_service.reload()
+        except (FileNotFoundError, ValueError) as e:
+            self.failures += 1
+            logger.error("Catalog reload failed, keeping the current snapshot: %s", e)
+            return False
+        if swapped:
+            self.reloads += 1
+            logger.info(
+                "Catalog reloaded: generation %s, version %s",
+                self.data_service.status()["generation"],
+                self.data_service.status()["version"],
+            )
+            if self.on_reload is not None:
+                try:
+                    await self.on_reload()
+                except Exception:
+                    logger.exception("Preparing the reloaded catalog failed")
+        return swapped
+
+    async def _run(self) -> None:
+        # Record the files' current state so the first poll only reacts to changes.
+        self._signature = await asyncio.to_thread(self._stat_files)
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Catalog watcher check failed")
+
+    def start(self) -> None:
+        """Start polling in a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """Return reload counters."""
+        return {"reloads": self.reloads, "failures": self.failures}
@@ -1,16 +1,74 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple, Union
+
 from app.agents.evaluation_agent import EvaluationAgent
+from app.agents.intent_classifier import IntentClassifier, LexiconIntentClassifier
+from app.agents.local_recommender import LocalRecommender
+from app.agents.refinement import RefinementEngine
+from app.config import settings
+from app.metrics import CHAT_INFLIGHT, CHAT_REQUEST_SECONDS, CHAT_STAGE_SECONDS
 from app.services.data_service import DataService
+from app.models.catalog import Catalog
+from app.services.response_cache import CacheKey, ResponseCache
+from app.services.response_encoder import ResponseEncoder
+from app.services.session_store import ChatSession, SessionStore
+from app.services.single_flight import SingleFlight
+from app.services.stats import LatencyStats
 from app.models.recommendation import ChatResponse
 
+# Weight of the newest build time in the moving average of the fallback cost.
+FALLBACK_COST_WEIGHT = 0.2
+
 
 class ChatService:
     """Service that orchestrates chat interactions with the evaluation agent."""
 
+    QUICK_REPLIES = [
+        "Accept and continue",
+        "Make it cheaper",
+        "Add more safety metrics",
+    ]
+
+    # LLM result field -> server-sent event name used by stream_message
+    STREAM_EVENTS = {
+        "intent": "intent",
+        "dataset_id": "dataset",
+        "metric_ids": "metrics",
+        "scenario_id": "scenario",
+        "agent_id": "agent",
+        "reason": "reason",
+    }
+
     def __init__(self) -> None:
         """Initialize the chat service."""
         self.agent = EvaluationAgent()
         self.data_service = DataService()
+        self.response_cache = ResponseCache(
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+        )
+        self.sessions = SessionStore(
+            max_entries=settings.session_max_entries,
+            ttl_seconds=settings.session_ttl_seconds,
+            max_turns=settings.session_max_turns,
+            summary_chars=settings.session_summary_chars,
+        )
+        self._inflight: SingleFlight[dict] = SingleFlight()
+        self.response_encoder = ResponseEncoder()
+        self.classifier: IntentClassifier = LexiconIntentClassifier()
+        self.local_recommender = LocalRecommender()
+        self.refiner = RefinementEngine()
+        # Background build of the recommender's token sets for a new catalog version.
+        self._terms_build: Optional[Tuple[str, asyncio.Task]] = None
+        # Moving average of the time it takes to build a deadline fallback.
+        self._fallback_seconds = 0.0
+        self._path_latency: Dict[str, LatencyStats] = {
+            path: LatencyStats() for path in ("refinement", "cache", "fast_path", "llm", "fallback")
+        }
+        self._classifier_latency = LatencyStats()
         self._initialized = False
+        self.warmup_error: Optional[str] = None
 
     async def ensure_initialized(self) -> None:
         """Ensure the agent is initialized."""
@@ -18,38 +76,421 @@ class ChatService:
             await self.agent.initialize()
             self._initialized = True
 
-    async def process_message(self, message: str) -> ChatResponse:
+    async def warm_up(self) -> None:
+        """Load the catalog and start the LLM client concurrently, then prebuild the prompt context.
+
+        Failures are recorded in ``warmup_error`` (and reported by
+        :meth:`readiness`) instead of raised, so a failed warm-up never takes
+        the process down; the first request retries whatever is still cold.
+        """
+        try:
+            await asyncio.gather(self.data_service.load_catalog(), self.ensure_initialized())
+            await self.prepare_catalog()
+            self.warmup_error = None
+        except Exception as e:
+            self.warmup_error = f"{type(e).__name__}: {e}"
+
+    async def prepare_catalog(self) -> None:
+        """Prebuild everything derived from the live catalog, off the event loop.
+
+        Runs at warm-up and after each hot reload, so the first request
+        against a new catalog version does not pay for the builds.
+        """
+        catalog = await self.data_service.load_catalog()
+        await asyncio.gather(self.agent.prepare(catalog), self.local_recommender.prepare(catalog))
+
+    def readiness(self) -> Dict[str, Any]:
+        """Report whether the catalog and the LLM client are warm."""
+        catalog_ready = self.data_service.status()["loaded"]
+        llm_ready = self._initialized and self.agent.client is not None
+        return {
+            "ready": catalog_ready and llm_ready,
+            "catalog": catalog_ready,
+            "llm_client": llm_ready,
+            "error": self.warmup_error,
+        }
+
+    async def aclose(self) -> None:
+        """Release resources held by the agent (e.g. pooled LLM connections)."""
+        await self.agent.aclose()
+        self._initialized = False
+
+    async def process_message(
+        self,
+        message: str,
+        deadline_ms: Optional[float] = None,
+        session_id: Optional[str] = None,
+        start_session: bool = False,
+    ) -> ChatResponse:
         """Process a user message and return response with recommendation.
 
+        The parsed LLM result is cached per normalized message and catalog
+        version; a hit skips the LLM call and rebuilds the response from the
+        current catalog objects. Otherwise a local intent classifier answers
+        high-confidence requests straight from the catalog, and only the rest
+        go to the LLM, with concurrent misses for the same key sharing a
+        single call.
+
+        If the LLM has not answered when the deadline passes, the local
+        recommendation is returned with ``degraded`` set; the LLM call keeps
+        running and fills the cache for the next request.
+
+        With sessions enabled, a message with a ``session_id`` continues that
+        session (a new one is started when it has expired), and
+        ``start_session`` starts one; its id is returned in the response.
+        Messages with neither stay stateless. Follow-up turns send the LLM only the
+        session's compact state (prior intent, selected ids and short
+        summaries of earlier messages) plus the new message, and skip the
+        fast path, whose classifier cannot see the conversation. Quick-reply
+        refinements ("Make it cheaper", "Add more safety metrics") are
+        applied to the previous recommendation locally, without the LLM.
+
         Args:
             message: User's input message
+            deadline_ms: Time budget for the response, defaulting to
+                ``settings.chat_deadline_ms`` (0 = wait for the LLM)
+            session_id: Session to continue
+            start_session: Start a session when ``session_id`` is not given
 
         Returns:
             ChatResponse with content, recommendation, and quick replies
         """
+        session = self._session(session_id, start_session)
+        return (await self._process(message, deadline_ms, session))[0]
+
+    async def process_message_json(
+        self,
+        message: str,
+        deadline_ms: Optional[float] = None,
+        session_id: Optional[str] = None,
+        start_session: bool = False,
+    ) -> bytes:
+        """Process a message like :meth:`process_message` and return the response as JSON bytes.
+
+        Catalog entries in the recommendation are spliced in from JSON
+        serialized once per catalog version (see :class:`ResponseEncoder`).
+        """
+        session = self._session(session_id, start_session)
+        response, catalog = await self._process(message, deadline_ms, session)
+        with CHAT_STAGE_SECONDS.labels("encode").time():
+            return self.response_encoder.encode(response, catalog)
+
+    def _session(self, session_id: Optional[str], start: bool) -> Optional[ChatSession]:
+        """Resume or start the session for a message, or ``None`` for a stateless one.
+
+        A started session is not stored yet; :meth:`_process` adds it once
+        the message has been answered, so failed requests leave none behind.
+        """
+        if not settings.session_enabled or (session_id is None and not start):
+            return None
+        session = self.sessions.get(session_id) if session_id else None
+        return session if session is not None else self.sessions.new()
+
+    async def _process(
+        self,
+        message: str,
+        deadline_ms: Optional[float] = None,
+        session: Optional[ChatSession] = None,
+    ) -> Tuple[ChatResponse, Catalog]:
+        """Run the pipeline and return the response with the catalog snapshot it was built from."""
         await self.ensure_initialized()
+        started = time.perf_counter()
+        if deadline_ms is None:
+            deadline_ms = settings.chat_deadline_ms
+        deadline = started + deadline_ms / 1000 if deadline_ms > 0 else None
+        CHAT_INFLIGHT.inc()
+        try:
+            # Load all data
+            with CHAT_STAGE_SECONDS.labels("load_catalog").time():
+                catalog = await self.data_service.load_catalog()
 
-        # Load all data
-        datasets = await self.data_service.load_datasets()
-        metrics = await self.data_service.load_metrics()
-        scenarios = await self.data_service.load_scenarios()
-        agents = await self.data_service.load_agents()
+            state = session.render() if session is not None else None
+            result = None
+            if state is not None and settings.refinement_enabled:
+                path = "refinement"
+                with CHAT_STAGE_SECONDS.labels("refinement").time():
+                    result = self.refiner.refine(message, session.last_result(), catalog)
+            if result is None:
+                with CHAT_STAGE_SECONDS.labels("cache_lookup").time():
+                    # A follow-up's answer depends on the conversation, so its state is in the key.
+                    cache_key = ResponseCache.make_key(
+                        message if state is None else f"{state}\n{message}", catalog.version
+                    )
+                    path = "cache"
+                    result = (
+                        self.response_cache.get(cache_key)
+                        if settings.response_cache_enabled
+                        else None
+                    )
+            if result is None and state is None:
+                path = "fast_path"
+                with CHAT_STAGE_SECONDS.labels("fast_path").time():
+                    result = await self._fast_path_result(message, catalog)
+            if result is None:
+                path = "llm"
+                with CHAT_STAGE_SECONDS.labels("llm").time():
+                    result, degraded = await self._llm_or_fallback(
+                        message, catalog, cache_key, deadline, state
+                    )
+                if degraded:
+                    path = "fallback"
 
-        # Process with agent
-        content, recommendation = await self.agent.process_request(
-            message, datasets, metrics, scenarios, agents
-        )
+            with CHAT_STAGE_SECONDS.labels("build_response").time():
+                response = self._build_response(result, catalog)
+                response.degraded = path == "fallback"
+            if session is not None:
+                if not session.turns:
+                    self.sessions.add(session)
+                session.record(message, result)
+                response.session_id = session.id
+        finally:
+            CHAT_INFLIGHT.dec()
+        self._record_latency(path, time.perf_counter() - started)
+        return response, catalog
+
+    def _record_latency(self, path: str, seconds: float) -> None:
+        self._path_latency[path].record(seconds)
+        CHAT_REQUEST_SECONDS.labels(path).observe(seconds)
+
+    async def stream_message(self, message: str) -> AsyncIterator[Tuple[str, dict]]:
+        """Process a message and yield ``(event, data)`` pairs as results become available.
+
+        One event is yielded per result field (``intent``, ``dataset``,
+        ``metrics``, ``scenario``, ``agent``, ``reason``) with the resolved
+        catalog objects attached, as soon as the field is parsed from the
+        streamed completion. The last event, ``done``, carries the full
+        ChatResponse. Cached and fast-path results are emitted immediately.
+
+        Raises:
+            ValueError: If the LLM call fails or its output is invalid
+        """
+        await self.ensure_initialized()
+        started = time.perf_counter()
+        CHAT_INFLIGHT.inc()
+        try:
+            with CHAT_STAGE_SECONDS.labels("load_catalog").time():
+                catalog = await self.data_service.load_catalog()
+            with CHAT_STAGE_SECONDS.labels("cache_lookup").time():
+                cache_key = ResponseCache.make_key(message, catalog.version)
+                path = "cache"
+                result = (
+                    self.response_cache.get(cache_key) if settings.response_cache_enabled else None
+                )
+            if result is None:
+                path = "fast_path"
+                with CHAT_STAGE_SECONDS.labels("fast_path").time():
+                    result = await self._fast_path_result(message, catalog)
+
+            if result is not None:
+                for key, value in result.items():
+                    event = self._field_event(key, value, catalog)
+                    if event is not None:
+                        yield event
+            else:
+                path = "llm"
+                result = {}
+                async for key, value in self.agent.stream_result(message, catalog):
+                    result[key] = value
+                    event = self._field_event(key, value, catalog)
+                    if event is not None:
+                        yield event
+                if settings.response_cache_enabled:
+                    self.response_cache.set(cache_key, result)
+
+            with CHAT_STAGE_SECONDS.labels("build_response").time():
+                response = self._build_response(result, catalog)
+        finally:
+            CHAT_INFLIGHT.dec()
+        self._record_latency(path, time.perf_counter() - started)
+        yield "done", response.model_dump(mode="json")
+
+    async def process_batch(
+        self, messages: Sequence[str], concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, Union[ChatResponse, Exception]]]:
+        """Process many messages concurrently, yielding ``(index, outcome)`` as each completes.
+
+        At most ``concurrency`` messages (default ``settings.batch_concurrency``)
+        are in flight at once. A failing message yields its exception as the
+        outcome instead of aborting the batch. Closing the iterator early
+        cancels the messages still pending. Batch messages are stateless and
+        start no sessions.
+
+        Args:
+            messages: User messages in input order
+            concurrency: Maximum number of messages processed at the same time
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or settings.batch_concurrency))
 
+        async def run(index: int, message: str) -> Tuple[int, Union[ChatResponse, Exception]]:
+            async with semaphore:
+                try:
+                    return index, (await self._process(message))[0]
+                except Exception as e:
+                    return index, e
+
+        tasks = [asyncio.create_task(run(i, m)) for i, m in enumerate(messages)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _build_response(self, result: dict, catalog: Catalog) -> ChatResponse:
+        """Build the ChatResponse for a parsed result against the given catalog."""
+        content, recommendation = self.agent.respond(result, catalog)
         return ChatResponse(
             content=content,
             recommendation=recommendation,
-            quick_replies=[
-                "Accept and continue",
-                "Make it cheaper",
-                "Add more safety metrics",
-            ],
+            quick_replies=list(self.QUICK_REPLIES),
+        )
+
+    def _field_event(self, key: str, value: Any, catalog: Catalog) -> Optional[Tuple[str, dict]]:
+        """Map one result field to its stream event, resolving ids to catalog objects."""
+        event = self.STREAM_EVENTS.get(key)
+        if event is None:
+            return None
+        data: Dict[str, Any] = {key: value}
+        if key == "metric_ids":
+            data["metrics"] = [m.model_dump(mode="json") for m in catalog.get_metrics(value or [])]
+        elif key in ("dataset_id", "scenario_id", "agent_id"):
+            lookup = {
+                "dataset_id": catalog.get_dataset,
+                "scenario_id": catalog.get_scenario,
+                "agent_id": catalog.get_agent,
+            }[key]
+            match = lookup(value)
+            data[event] = match.model_dump(mode="json") if match else None
+        return event, data
+
+    async def _fast_path_result(self, message: str, catalog: Catalog) -> Optional[dict]:
+        """Classify locally and, above the confidence threshold, build a catalog-only result.
+
+        The result is built in a worker thread from the recommender's
+        prebuilt token sets. While those are still being built for a new
+        catalog version the fast path is skipped and the build is started
+        in the background, so the event loop never waits on it.
+        """
+        if not settings.fast_path_enabled:
+            return None
+        started = time.perf_counter()
+        prediction = self.classifier.classify(message)
+        self._classifier_latency.record(time.perf_counter() - started)
+        if prediction.confidence < settings.fast_path_confidence_threshold:
+            return None
+        if self.local_recommender.ready_terms(catalog) is None:
+            self._start_terms_build(catalog)
+            return None
+        return await asyncio.to_thread(
+            self.local_recommender.recommend, prediction.intent, message, catalog
         )
 
+    def _start_terms_build(self, catalog: Catalog) -> None:
+        """Start building the recommender's token sets for ``catalog``, once per version.
+
+        Unversioned catalogs are skipped: their token sets cannot be kept,
+        so they never get the fast path.
+        """
+        if not catalog.version:
+            return
+        build = self._terms_build
+        if build is not None and build[0] == catalog.version and not build[1].done():
+            return
+        self._terms_build = (
+            catalog.version,
+            asyncio.create_task(self.local_recommender.prepare(catalog)),
+        )
+
+    async def _llm_or_fallback(
+        self,
+        message: str,
+        catalog: Catalog,
+        cache_key: CacheKey,
+        deadline: Optional[float],
+        state: Optional[str] = None,
+    ) -> Tuple[dict, bool]:
+        """Return the LLM result, or the local one with ``True`` if the deadline passes first.
+
+        The local result is only built when the LLM has not answered by the
+        deadline less the recent cost of building it, and then in a worker
+        thread while the LLM call keeps running, so requests the LLM answers
+        in time never pay for it. Giving up only cancels this request's wait
+        on the shared single-flight call, which still completes and fills
+        the response cache.
+        """
+        call = asyncio.ensure_future(
+            self._inflight.do(
+                cache_key, lambda: self._fetch_result(message, catalog, cache_key, state)
+            )
+        )
+        if deadline is None:
+            return await call, False
+
+        def remaining() -> float:
+            return max(0.0, deadline - time.perf_counter())
+
+        try:
+            done, _ = await asyncio.wait(
+                {call}, timeout=max(0.0, remaining() - self._fallback_seconds)
+            )
+            if not done:
+                fallback = asyncio.ensure_future(
+                    asyncio.to_thread(self._fallback_result, message, catalog)
+                )
+                done, _ = await asyncio.wait({call, fallback}, return_when=asyncio.FIRST_COMPLETED)
+                if call not in done:
+                    # The fallback is ready; the LLM may still make the deadline.
+                    done, _ = await asyncio.wait({call}, timeout=remaining())
+                if call not in done:
+                    return fallback.result(), True
+                fallback.add_done_callback(lambda f: f.cancelled() or f.exception())
+            return call.result(), False
+        finally:
+            if not call.done():
+                call.cancel()
+
+    def _fallback_result(self, message: str, catalog: Catalog) -> dict:
+        """Build the deadline fallback result, tracking how long building one takes."""
+        started = time.perf_counter()
+        result = self.local_recommender.recommend(
+            self.classifier.classify(message).intent, message, catalog
+        )
+        elapsed = time.perf_counter() - started
+        self._fallback_seconds += FALLBACK_COST_WEIGHT * (elapsed - self._fallback_seconds)
+        return result
+
+    async def _fetch_result(
+        self, message: str, catalog: Catalog, cache_key: CacheKey, state: Optional[str] = None
+    ) -> dict:
+        """Ask the agent for a parsed result and store it in the response cache.
+
+        Runs as the shared single-flight task, so the cache is filled even if
+        every waiting request has been cancelled by the time the LLM answers.
+        """
+        result = await self.agent.extract_result(message, catalog, state=state)
+        if settings.response_cache_enabled:
+            self.response_cache.set(cache_key, result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return runtime counters for the chat pipeline."""
+        return {
+            "catalog": self.data_service.status(),
+            "response_cache": self.response_cache.stats(),
+            "response_encoder": self.response_encoder.stats(),
+            "single_flight": self._inflight.stats(),
+            "sessions": self.sessions.stats(),
+            "paths": {path: stats.snapshot() for path, stats in self._path_latency.items()},
+            "prompt": self.agent.prompt_stats(),
+            "llm": self.agent.caller.stats(),
+            "admission": self.agent.limiter.stats() if self.agent.limiter else None,
+            "fast_path": {
+                "enabled": settings.fast_path_enabled,
+                "confidence_threshold": settings.fast_path_confidence_threshold,
+                "classifier": self._classifier_latency.snapshot(),
+            },
+        }
+
 
 # Singleton instance
 _chat_service = ChatService()
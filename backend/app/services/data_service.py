@@ -1,106 +1,298 @@
+import asyncio
+import hashlib
 import json
+import logging
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
 
 from app.models.dataset import Dataset
 from app.models.metric import Metric
 from app.models.scenario import Scenario
 from app.models.agent import AgentModel
+from app.models.catalog import INDEX_FIELDS, Catalog
+from app.models.jsonl_collection import JsonlCollection
+from app.services.catalog_snapshot import SnapshotError, is_fresh, read_snapshot
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+# Catalog collection -> (source file, model); a sibling ``.jsonl`` file takes precedence
+CATALOG_FILES: Dict[str, Tuple[str, Type[BaseModel]]] = {
+    "datasets": ("datasets.json", Dataset),
+    "metrics": ("metrics.json", Metric),
+    "scenarios": ("scenarios.json", Scenario),
+    "agents": ("agents.json", AgentModel),
+}
 
 
 class DataService:
-    """Service for loading and caching evaluation data from JSON files."""
+    """Service for loading and caching evaluation data from JSON files.
 
-    def __init__(self, data_dir: Path | None = None) -> None:
-        """Initialize the data service with a data directory."""
+    All four collections live in one immutable :class:`Catalog` snapshot.
+    A collection stored as JSONL (e.g. ``datasets.jsonl`` next to, or instead
+    of, ``datasets.json``) is memory-mapped and indexed in one streaming pass
+    instead of being held as models; see :class:`JsonlCollection`. A compiled
+    snapshot (see :mod:`app.services.catalog_snapshot`) that is newer than
+    every source file is loaded instead of the sources.
+    Files are parsed in parallel worker threads, never on the event loop.
+    Concurrent first callers share one loading task, so each file is parsed
+    exactly once. :meth:`reload` swaps a new snapshot in with a single
+    assignment, so a request that already holds a snapshot keeps using it,
+    and a failed reload leaves the current one live.
+    """
+
+    def __init__(self, data_dir: Path | None = None, use_snapshot: bool | None = None) -> None:
+        """Initialize the data service with a data directory.
+
+        Args:
+            data_dir: Directory holding the catalog files (default ``settings.data_dir``)
+            use_snapshot: Load a fresh compiled snapshot when present
+                (default ``settings.catalog_snapshot_enabled``)
+        """
         from app.config import settings
 
         self.data_dir = Path(data_dir or settings.data_dir)
-        self._datasets: Optional[List[Dataset]] = None
-        self._metrics: Optional[List[Metric]] = None
-        self._scenarios: Optional[List[Scenario]] = None
-        self._agents: Optional[List[AgentModel]] = None
+        self.snapshot_path = self.data_dir / settings.catalog_snapshot_file
+        self.use_snapshot = (
+            settings.catalog_snapshot_enabled if use_snapshot is None else use_snapshot
+        )
+        self.catalog_source: Optional[str] = None
+        self._catalog: Optional[Catalog] = None
+        self._initial_load: Optional["asyncio.Task[Catalog]"] = None
+        self.last_reload_at: Optional[float] = None
+        self.last_reload_error: Optional[str] = None
+
+    def source_files(self) -> List[Path]:
+        """Return the catalog source files read by this service."""
+        return [self._source_path(filename) for filename, _ in CATALOG_FILES.values()]
 
-    async def load_datasets(self) -> List[Dataset]:
-        """Load datasets from JSON file with caching.
+    def _source_path(self, filename: str) -> Path:
+        """Return the JSONL variant of ``filename`` if it exists, else the JSON file."""
+        file_path = self.data_dir / filename
+        jsonl_path = file_path.with_suffix(".jsonl")
+        return jsonl_path if jsonl_path.exists() else file_path
+
+    def _load_collection(
+        self, filename: str, model: Type[T], index_fields: Sequence[str] = ()
+    ) -> Tuple[Sequence[T], str]:
+        """Load one collection and return it with the digest of its bytes.
+
+        JSON files are parsed into a list of models; JSONL files are mapped
+        into a :class:`JsonlCollection` indexed by ``index_fields``.
 
         Raises:
-            FileNotFoundError: If datasets.json file not found
+            FileNotFoundError: If the file is not found
             ValueError: If JSON is invalid or data validation fails
         """
-        if self._datasets is None:
-            file_path = self.data_dir / "datasets.json"
+        file_path = self._source_path(filename)
+        if file_path.suffix == ".jsonl":
             try:
-                with open(file_path) as f:
-                    data = json.load(f)
-                    self._datasets = [Dataset(**d) for d in data]
+                collection = JsonlCollection(file_path, model, index_fields)
             except FileNotFoundError:
                 raise FileNotFoundError(f"Data file not found: {file_path}")
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON in {file_path}: {e}")
-            except Exception as e:
-                raise ValueError(f"Data validation error in {file_path}: {e}")
-        return self._datasets
+            return collection, collection.digest
+        try:
+            raw = file_path.read_bytes()
+            items = [model(**item) for item in json.loads(raw)]
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Data file not found: {file_path}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in {file_path}: {e}")
+        except Exception as e:
+            raise ValueError(f"Data validation error in {file_path}: {e}")
+        return items, hashlib.sha256(raw).hexdigest()
+
+    def _assemble_catalog(
+        self, loaded: Sequence[Tuple[Sequence[BaseModel], str]], generation: int
+    ) -> Catalog:
+        """Build the snapshot and its indexes from parsed collections (blocking).
+
+        The version is a hash over the raw bytes of every source file, so it
+        changes whenever any catalog file's content changes.
+        """
+        collections: Dict[str, Sequence[BaseModel]] = {}
+        digests: Dict[str, str] = {}
+        for (name, (filename, _)), (items, digest) in zip(CATALOG_FILES.items(), loaded):
+            collections[name], digests[filename] = items, digest
+        version = hashlib.sha256(
+            "".join(f"{name}:{digest};" for name, digest in sorted(digests.items())).encode()
+        ).hexdigest()[:16]
+        return Catalog(**collections, version=version, generation=generation)
+
+    def _load_snapshot(self, generation: int) -> Optional[Catalog]:
+        """Return the compiled snapshot if it is fresh and readable, else ``None`` (blocking)."""
+        if not is_fresh(self.snapshot_path, self.source_files()):
+            return None
+        try:
+            catalog = read_snapshot(self.snapshot_path)
+        except (FileNotFoundError, SnapshotError) as e:
+            logger.warning("Ignoring catalog snapshot, loading the sources instead: %s", e)
+            return None
+        return catalog.with_generation(generation)
+
+    async def _build_catalog(self, generation: int) -> Tuple[Catalog, str]:
+        """Build a new snapshot off the event loop, from the compiled snapshot or the sources.
+
+        Source files are parsed concurrently.
+
+        Returns:
+            The catalog and where it came from (``"snapshot"`` or ``"sources"``)
+
+        Raises:
+            FileNotFoundError: If a data file is not found
+            ValueError: If JSON is invalid or data validation fails
+        """
+        if self.use_snapshot:
+            catalog = await asyncio.to_thread(self._load_snapshot, generation)
+            if catalog is not None:
+                return catalog, "snapshot"
+
+        loaded = await asyncio.gather(
+            *(
+                asyncio.to_thread(self._load_collection, filename, model, INDEX_FIELDS[name])
+                for name, (filename, model) in CATALOG_FILES.items()
+            )
+        )
+        catalog = await asyncio.to_thread(self._assemble_catalog, loaded, generation)
+        return catalog, "sources"
+
+    async def _load_initial(self) -> Catalog:
+        catalog, source = await self._build_catalog(generation=1)
+        if self._catalog is None:
+            self._catalog, self.catalog_source = catalog, source
+            self.last_reload_at = time.time()
+        return self._catalog
+
+    def _initial_load_done(self, task: "asyncio.Task[Catalog]") -> None:
+        # Forget a failed load so the next caller retries instead of re-raising forever.
+        if task.cancelled() or task.exception() is not None:
+            if self._initial_load is task:
+                self._initial_load = None
+
+    async def load_catalog(self) -> Catalog:
+        """Return the live catalog snapshot, loading it on first use.
+
+        Concurrent callers during the first load await the same task, which
+        keeps running even if they are cancelled.
+
+        Raises:
+            FileNotFoundError: If a data file is not found
+            ValueError: If JSON is invalid or data validation fails
+        """
+        if self._catalog is not None:
+            return self._catalog
+        if self._initial_load is None:
+            self._initial_load = asyncio.ensure_future(self._load_initial())
+            self._initial_load.add_done_callback(self._initial_load_done)
+        return await asyncio.shield(self._initial_load)
+
+    async def reload(self) -> bool:
+        """Re-parse the source files off the event loop and swap in a new snapshot.
+
+        Returns:
+            True if a snapshot with new content was swapped in, False if the
+            content was unchanged
+
+        Raises:
+            FileNotFoundError: If a data file is not found (old snapshot stays live)
+            ValueError: If JSON is invalid or validation fails (old snapshot stays live)
+        """
+        current = self._catalog
+        generation = current.generation + 1 if current else 1
+        try:
+            catalog, source = await self._build_catalog(generation)
+        except (FileNotFoundError, ValueError) as e:
+            self.last_reload_error = str(e)
+            raise
+        self.last_reload_error = None
+        self.last_reload_at = time.time()
+        if current is not None and catalog.version == current.version:
+            return False
+        self._catalog, self.catalog_source = catalog, source
+        return True
 
-    async def load_metrics(self) -> List[Metric]:
-        """Load metrics from JSON file with caching.
+    def status(self) -> dict:
+        """Return the live snapshot's version, generation and source plus the last reload."""
+        catalog = self._catalog
+        return {
+            "loaded": catalog is not None,
+            "version": catalog.version if catalog else None,
+            "generation": catalog.generation if catalog else 0,
+            "source": self.catalog_source if catalog else None,
+            "last_reload_at": self.last_reload_at,
+            "last_reload_error": self.last_reload_error,
+        }
+
+    async def load_datasets(self) -> Sequence[Dataset]:
+        """Load datasets from the catalog snapshot.
+
+        Raises:
+            FileNotFoundError: If datasets.json file not found
+            ValueError: If JSON is invalid or data validation fails
+        """
+        return (await self.load_catalog()).datasets
+
+    async def load_metrics(self) -> Sequence[Metric]:
+        """Load metrics from the catalog snapshot.
 
         Raises:
             FileNotFoundError: If metrics.json file not found
             ValueError: If JSON is invalid or data validation fails
         """
-        if self._metrics is None:
-            file_path = self.data_dir / "metrics.json"
-            try:
-                with open(file_path) as f:
-                    data = json.load(f)
-                    self._metrics = [Metric(**m) for m in data]
-            except FileNotFoundError:
-                raise FileNotFoundError(f"Data file not found: {file_path}")
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON in {file_path}: {e}")
-            except Exception as e:
-                raise ValueError(f"Data validation error in {file_path}: {e}")
-        return self._metrics
+        return (await self.load_catalog()).metrics
 
-    async def load_scenarios(self) -> List[Scenario]:
-        """Load scenarios from JSON file with caching.
+    async def load_scenarios(self) -> Sequence[Scenario]:
+        """Load scenarios from the catalog snapshot.
 
         Raises:
             FileNotFoundError: If scenarios.json file not found
             ValueError: If JSON is invalid or data validation fails
         """
-        if self._scenarios is None:
-            file_path = self.data_dir / "scenarios.json"
-            try:
-                with open(file_path) as f:
-                    data = json.load(f)
-                    self._scenarios = [Scenario(**s) for s in data]
-            except FileNotFoundError:
-                raise FileNotFoundError(f"Data file not found: {file_path}")
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON in {file_path}: {e}")
-            except Exception as e:
-                raise ValueError(f"Data validation error in {file_path}: {e}")
-        return self._scenarios
+        return (await self.load_catalog()).scenarios
 
-    async def load_agents(self) -> List[AgentModel]:
-        """Load agents from JSON file with caching.
+    async def load_agents(self) -> Sequence[AgentModel]:
+        """Load agents from the catalog snapshot.
 
         Raises:
             FileNotFoundError: If agents.json file not found
             ValueError: If JSON is invalid or data validation fails
         """
-        if self._agents is None:
-            file_path = self.data_dir / "agents.json"
-            try:
-                with open(file_path) as f:
-                    data = json.load(f)
-                    self._agents = [AgentModel(**a) for a in data]
-            except FileNotFoundError:
-                raise FileNotFoundError(f"Data file not found: {file_path}")
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON in {file_path}: {e}")
-            except Exception as e:
-                raise ValueError(f"Data validation error in {file_path}: {e}")
-        return self._agents
+        return (await self.load_catalog()).agents
+
+    async def get_dataset(self, dataset_id: str) -> Optional[Dataset]:
+        """Look up a dataset by id in the loaded catalog."""
+        return (await self.load_catalog()).get_dataset(dataset_id)
+
+    async def get_metric(self, metric_id: str) -> Optional[Metric]:
+        """Look up a metric by id in the loaded catalog."""
+        return (await self.load_catalog()).get_metric(metric_id)
+
+    async def get_metrics(self, metric_ids: Iterable[str]) -> List[Metric]:
+        """Look up several metrics by id, returned in catalog order."""
+        return (await self.load_catalog()).get_metrics(metric_ids)
+
+    async def get_scenario(self, scenario_id: str) -> Optional[Scenario]:
+        """Look up a scenario by id in the loaded catalog."""
+        return (await self.load_catalog()).get_scenario(scenario_id)
+
+    async def get_agent(self, agent_id: str) -> Optional[AgentModel]:
+        """Look up an agent by id in the loaded catalog."""
+        return (await self.load_catalog()).get_agent(agent_id)
+
+    async def find_datasets(self, tag: str) -> Sequence[Dataset]:
+        """Return datasets carrying ``tag`` (case-insensitive)."""
+        return (await self.load_catalog()).find_datasets(tag)
+
+    async def find_metrics(
+        self, category: Optional[str] = None, cost: Optional[str] = None
+    ) -> Sequence[Metric]:
+        """Return metrics filtered by ``category`` and/or ``cost`` (case-insensitive)."""
+        return (await self.load_catalog()).find_metrics(category=category, cost=cost)
+
+    async def find_agents(self, agent_type: str) -> Sequence[AgentModel]:
+        """Return agents of ``agent_type`` (case-insensitive)."""
+        return (await self.load_catalog()).find_agents(agent_type)
@@ -0,0 +1,130 @@
+import copy
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+CacheKey = Tuple[str, str]
+
+
+def normalize_message(message: str) -> str:
+    """Collapse whitespace and case-fold a message so trivial variants share a key."""
+    return " ".join(message.split()).casefold()
+
+
+class ResponseCache:
+    """In-process LRU + TTL cache of parsed LLM results.
+
+    Keys are ``(catalog_version, normalized_message)``. Only the parsed result
+    (intent, ids and reason) is stored; responses are rebuilt from the current
+    catalog objects on every hit.
+
+    The cache follows the catalog forward: the first request for a version it
+    has not seen drops every entry of the previous one. Versions it has moved
+    past are remembered (the last ``RETIRED_VERSIONS``), so a late write or
+    read from a request that started before a reload misses and is ignored
+    rather than resetting the cache to the old catalog.
+    """
+
+    RETIRED_VERSIONS = 16
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl_seconds: Seconds an entry stays valid after it is stored
+            clock: Monotonic time source, injectable for tests
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, dict]]" = OrderedDict()
+        self._catalog_version: Optional[str] = None
+        self._retired: "OrderedDict[str, None]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_writes = 0
+
+    @staticmethod
+    def make_key(message: str, catalog_version: str) -> CacheKey:
+        """Build the cache key for a raw user message and catalog version."""
+        return catalog_version, normalize_message(message)
+
+    def _check_version(self, catalog_version: str) -> bool:
+        """Move forward to ``catalog_version`` if it is new; return whether it is current."""
+        if catalog_version == self._catalog_version:
+            return True
+        if catalog_version in self._retired:
+            return False
+        if self._catalog_version is not None:
+            self._retired[self._catalog_version] = None
+            while len(self._retired) > self.RETIRED_VERSIONS:
+                self._retired.popitem(last=False)
+        if self._entries:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+        self._catalog_version = catalog_version
+        return True
+
+    def get(self, key: CacheKey) -> Optional[dict]:
+        """Return a copy of the cached result, or ``None`` on a miss."""
+        if not self._check_version(key[0]):
+            self.misses += 1
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, result = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(result)
+
+    def set(self, key: CacheKey, result: dict) -> None:
+        """Store a result, evicting the least recently used entry when full.
+
+        A result for a catalog version the cache has moved past is dropped.
+        """
+        if self.max_entries <= 0:
+            return
+        if not self._check_version(key[0]):
+            self.stale_writes += 1
+            return
+        self._entries[key] = (self._clock() + self.ttl_seconds, copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry without touching the counters."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the current size."""
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_writes": self.stale_writes,
+        }
@@ -0,0 +1,96 @@
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+from starlette.responses import Response
+
+from app.models.catalog import Catalog
+from app.models.recommendation import ChatResponse
+
+
+class RawJSONResponse(Response):
+    """JSON response whose body is already encoded; the bytes are sent as-is."""
+
+    media_type = "application/json"
+
+    def render(self, content: bytes) -> bytes:
+        return content
+
+
+class ResponseEncoder:
+    """Encodes ChatResponses by splicing catalog entries' JSON, serialized once per version.
+
+    Catalog entries never change within a catalog version, so each entry's
+    JSON is produced on first use and reused for every later response
+    against that version. Only the per-response parts (content, reason,
+    quick replies) are encoded per call. The output is byte-identical to
+    ``ChatResponse.model_dump_json()``.
+    """
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        """Initialize with a cap on cached entries (the cache is cleared when it is exceeded)."""
+        self.max_entries = max_entries
+        self._version: Optional[str] = None
+        self._entries: Dict[Tuple[str, str], bytes] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, kind: str, item: BaseModel, cacheable: bool) -> bytes:
+        if not cacheable:
+            return to_json(item)
+        key = (kind, item.id)
+        encoded = self._entries.get(key)
+        if encoded is not None:
+            self.hits += 1
+            return encoded
+        self.misses += 1
+        encoded = to_json(item)
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = encoded
+        return encoded
+
+    def encode(self, response: ChatResponse, catalog: Catalog) -> bytes:
+        """Return the JSON bytes of ``response``, whose recommendation comes from ``catalog``."""
+        cacheable = bool(catalog.version)
+        if cacheable and catalog.version != self._version:
+            self._entries.clear()
+            self._version = catalog.version
+
+        parts: List[bytes] = [b'{"content":', to_json(response.content), b',"recommendation":']
+        recommendation = response.recommendation
+        if recommendation is None:
+            parts.append(b"null")
+        else:
+            parts += [
+                b'{"dataset":',
+                self._entry("dataset", recommendation.dataset, cacheable),
+                b',"metrics":[',
+                b",".join(self._entry("metric", m, cacheable) for m in recommendation.metrics),
+                b'],"agent":',
+                self._entry("agent", recommendation.agent, cacheable),
+                b',"scenario":',
+                self._entry("scenario", recommendation.scenario, cacheable),
+                b',"reason":',
+                to_json(recommendation.reason),
+                b"}",
+            ]
+        parts += [
+            b',"quick_replies":',
+            to_json(response.quick_replies),
+            b',"degraded":',
+            b"true" if response.degraded else b"false",
+            b',"session_id":',
+            to_json(response.session_id),
+            b"}",
+        ]
+        return b"".join(parts)
+
+    def stats(self) -> dict:
+        """Return the number of cached entries plus hit and miss counts."""
+        return {
+            "version": self._version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,153 @@
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from app.agents.context_encoding import truncate
+
+# Result fields carried from one turn to the next.
+SELECTION_FIELDS = ("dataset_id", "metric_ids", "scenario_id", "agent_id")
+
+
+@dataclass
+class ChatSession:
+    """Compact state of one conversation: the last intent and selection plus short turn summaries.
+
+    Only what a follow-up needs is kept, and the number and length of the
+    summaries are capped, so the prompt for turn 20 is no larger than for
+    turn 3.
+    """
+
+    id: str
+    max_turns: int = 5
+    summary_chars: int = 80
+    intent: Optional[str] = None
+    selection: Dict[str, object] = field(default_factory=dict)
+    summaries: Deque[str] = field(default_factory=deque)
+    turns: int = 0
+
+    def record(self, message: str, result: dict) -> None:
+        """Remember a turn's message and the result it was answered with."""
+        self.intent = result.get("intent", self.intent)
+        self.selection = {key: result.get(key) for key in SELECTION_FIELDS}
+        self.summaries.append(truncate(" ".join(message.split()), self.summary_chars))
+        while len(self.summaries) > self.max_turns:
+            self.summaries.popleft()
+        self.turns += 1
+
+    def last_result(self) -> dict:
+        """Return the previous turn's intent and selected ids as a result dict."""
+        return {"intent": self.intent, **self.selection}
+
+    def render(self) -> Optional[str]:
+        """Return the state as a short prompt block, or ``None`` before the first turn."""
+        if not self.turns:
+            return None
+        metric_ids = self.selection.get("metric_ids") or []
+        lines = [
+            "CONVERSATION STATE:",
+            f"intent: {self.intent}",
+            f"selected: dataset={self.selection.get('dataset_id')}"
+            f"; metrics={','.join(map(str, metric_ids))}"
+            f"; scenario={self.selection.get('scenario_id')}"
+            f"; agent={self.selection.get('agent_id')}",
+            "earlier messages: " + " | ".join(self.summaries),
+        ]
+        return "\n".join(lines)
+
+
+class SessionStore:
+    """In-process LRU + TTL store of :class:`ChatSession` objects keyed by session id.
+
+    Sessions expire ``ttl_seconds`` after they were last used, and the least
+    recently used session is evicted once ``max_entries`` are held.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 1800.0,
+        max_turns: int = 5,
+        summary_chars: int = 80,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize an empty store.
+
+        Args:
+            max_entries: Sessions kept before the least recently used is evicted
+            ttl_seconds: Idle seconds after which a session expires
+            max_turns: Message summaries kept per session
+            summary_chars: Length cap of each message summary
+            clock: Monotonic time source, injectable for tests
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self.summary_chars = summary_chars
+        self._clock = clock
+        self._sessions: "OrderedDict[str, Tuple[float, ChatSession]]" = OrderedDict()
+        self.created = 0
+        self.resumed = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """Return the live session for ``session_id`` and refresh its expiry, or ``None``."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        expires_at, session = entry
+        if self._clock() >= expires_at:
+            del self._sessions[session_id]
+            self.expirations += 1
+            return None
+        self._touch(session)
+        self.resumed += 1
+        return session
+
+    def new(self) -> ChatSession:
+        """Return a new session under a fresh id, without storing it (see :meth:`add`)."""
+        return ChatSession(
+            id=uuid.uuid4().hex,
+            max_turns=self.max_turns,
+            summary_chars=self.summary_chars,
+        )
+
+    def add(self, session: ChatSession) -> None:
+        """Store a session from :meth:`new` so later messages can resume it."""
+        self.created += 1
+        self._touch(session)
+
+    def get_or_create(self, session_id: Optional[str]) -> ChatSession:
+        """Return the session for ``session_id``, or a new stored one if it is gone."""
+        session = self.get(session_id) if session_id else None
+        if session is None:
+            session = self.new()
+            self.add(session)
+        return session
+
+    def _touch(self, session: ChatSession) -> None:
+        self._sessions[session.id] = (self._clock() + self.ttl_seconds, session)
+        self._sessions.move_to_end(session.id)
+        while len(self._sessions) > self.max_entries:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every session without touching the counters."""
+        self._sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, int]:
+        """Return created/resumed/eviction counters and the current size."""
+        return {
+            "size": len(self._sessions),
+            "max_entries": self.max_entries,
+            "created": self.created,
+            "resumed": self.resumed,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls that share a key into one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it is
+    pending await the same task. Results and exceptions reach every waiter.
+    Waiters are shielded, so cancelling one of them never cancels the shared
+    call for the others.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no calls in flight."""
+        self._inflight: Dict[Hashable, "asyncio.Task[T]"] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn`` for ``key`` unless a call for the same key is already pending.
+
+        Args:
+            key: Identity of the call; equal keys share one execution
+            fn: Zero-argument coroutine factory performing the work
+
+        Returns:
+            The shared call's result
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[T]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Return leader/coalesced counters and the number of calls in flight."""
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
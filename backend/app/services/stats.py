@@ -0,0 +1,27 @@
+from typing import Dict
+
+
+class LatencyStats:
+    """Running count, mean and max of observed durations."""
+
+    def __init__(self) -> None:
+        """Initialize with no observations."""
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one observed duration in seconds."""
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return count plus mean and max latency in milliseconds."""
+        mean = self.total_seconds / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean_ms": round(mean * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+        }
@@ -0,0 +1 @@
+"""Offline benchmarks and load-testing tools for the AEval backend."""
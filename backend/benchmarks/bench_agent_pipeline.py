@@ -0,0 +1,133 @@
+"""Micro-benchmarks of the CPU-bound EvaluationAgent stages.
+
+Covers prompt context building against synthetic catalogs of 100 to 100k
+entries per collection, and the parse and build steps of a completion
+(locating the JSON object, ``json.loads``, field validation, recommendation
+and response text) for LLM outputs of different shapes. Fails when a stage
+is slower than the stored baseline allows (see ``benchmarks/conftest.py``).
+
+Usage:
+    ZAI_API_KEY=x python -m pytest benchmarks/bench_agent_pipeline.py
+    ZAI_API_KEY=x python -m pytest benchmarks/bench_agent_pipeline.py --save-baseline
+"""
+
+import json
+from functools import lru_cache
+
+import pytest
+
+from app.agents.evaluation_agent import EvaluationAgent
+from app.agents.json_extract import extract_json_object
+from app.models import AgentModel, Catalog, Dataset, Metric, Scenario
+from benchmarks.bench_catalog_load import synthetic_dataset
+
+SIZES = [100, 1_000, 10_000, 100_000]
+CATEGORIES = ["safety", "accuracy", "performance", "quality"]
+
+
+def synthetic_metric(i: int) -> Metric:
+    return Metric(
+        id=f"met-{i:07d}",
+        name=f"Synthetic metric {i}",
+        category=CATEGORIES[i % len(CATEGORIES)],
+        description=f"Generated metric number {i} measuring one aspect of model output.",
+        cost=("Low", "Medium", "High")[i % 3],
+    )
+
+
+def synthetic_scenario(i: int) -> Scenario:
+    return Scenario(
+        id=f"scn-{i:07d}",
+        name=f"Synthetic scenario {i}",
+        description=f"Generated scenario number {i} combining a dataset with several metrics.",
+        recommended_metrics=[f"met-{(i + k) % 100:07d}" for k in range(3)],
+    )
+
+
+@lru_cache(maxsize=None)
+def synthetic_catalog(size: int) -> Catalog:
+    """``size`` datasets, metrics and scenarios plus four agents, cached per size."""
+    return Catalog(
+        [Dataset(**synthetic_dataset(i)) for i in range(size)],
+        [synthetic_metric(i) for i in range(size)],
+        [synthetic_scenario(i) for i in range(size)],
+        [
+            AgentModel(id=f"ag-{i:03d}", name=f"Agent {i}", type=t, description="Synthetic agent.")
+            for i, t in enumerate(["rag", "code", "chat", "safety"])
+        ],
+        version=f"synthetic-{size}",
+    )
+
+
+def _result(metric_count: int = 2, reason: str = "Covers safety and accuracy.") -> dict:
+    return {
+        "intent": "rag_safety",
+        "dataset_id": "ds-0000042",
+        "metric_ids": [f"met-{i:07d}" for i in range(metric_count)],
+        "scenario_id": "scn-0000007",
+        "agent_id": "ag-000",
+        "reason": reason,
+    }
+
+
+# LLM completion contents by shape; every id exists in the smallest catalog
+# except for "unknown_ids", which exercises the fallbacks.
+OUTPUTS = {
+    "minimal": json.dumps(_result()),
+    "fenced": "```json\n" + json.dumps(_result(), indent=4) + "\n```",
+    "many_metrics": json.dumps(_result(metric_count=50)),
+    "long_reason": json.dumps(_result(reason="Because it matters. " * 200)),
+    "unknown_ids": json.dumps(
+        {**_result(), "dataset_id": "ds-x", "metric_ids": ["met-x"], "scenario_id": "scn-x"}
+    ),
+}
+SHAPES = list(OUTPUTS)
+
+
+def _parsed(shape: str) -> dict:
+    return extract_json_object(OUTPUTS[shape]).value
+
+
+@pytest.fixture(scope="module")
+def agent() -> EvaluationAgent:
+    return EvaluationAgent()
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_build_context(benchmark, agent, size):
+    catalog = synthetic_catalog(size)
+    context = benchmark(agent._build_context, *catalog.collections)
+    assert context.count("\n  - ") == 3 * size + len(catalog.agents)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_extract_json_object(benchmark, shape):
+    extraction = benchmark(extract_json_object, OUTPUTS[shape])
+    assert extraction.value["intent"] == "rag_safety" and not extraction.repairs
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_json_loads(benchmark, shape):
+    extraction = extract_json_object(OUTPUTS[shape])
+    content = OUTPUTS[shape][extraction.start : extraction.end]
+    assert benchmark(json.loads, content)["intent"] == "rag_safety"
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_validate_result(benchmark, shape):
+    benchmark(EvaluationAgent._validate_result, _parsed(shape))
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("size", SIZES)
+def test_build_recommendation(benchmark, agent, size, shape):
+    catalog = synthetic_catalog(size)
+    recommendation = benchmark(agent._build_recommendation, _parsed(shape), catalog)
+    assert recommendation is not None
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_generate_response(benchmark, agent, shape):
+    result = _parsed(shape)
+    recommendation = agent._build_recommendation(result, synthetic_catalog(SIZES[0]))
+    assert benchmark(agent._generate_response, result, recommendation)
@@ -0,0 +1,142 @@
+"""Compare cold-start time and peak memory of the catalog storage formats.
+
+A synthetic ``datasets`` collection of each size is written as
+``datasets.json`` (parsed into models up front), as ``datasets.jsonl``
+(memory-mapped and indexed, models built on access), and as JSON compiled
+into a binary snapshot; the other collections are the bundled ones. Every
+load runs in a fresh interpreter so peak RSS is not shared between runs.
+
+Usage:
+    ZAI_API_KEY=x python -m benchmarks.bench_catalog_load --sizes 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.data_service import DataService
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+TAGS = ["qa", "code", "safety", "rag", "support", "finance", "medical", "legal"]
+
+
+def synthetic_dataset(i: int) -> dict:
+    return {
+        "id": f"ds-{i:07d}",
+        "name": f"Synthetic dataset {i}",
+        "description": f"Generated evaluation dataset number {i} for catalog scaling benchmarks.",
+        "tags": [TAGS[i % len(TAGS)], TAGS[(i * 7 + 3) % len(TAGS)]],
+        "size": f"{(i % 100) + 1}k samples",
+        "total_records": ((i % 100) + 1) * 1000,
+        "file_format": "jsonl",
+        "metadata_quality_score": round((i % 100) / 100, 2),
+        "application_context": "Benchmark",
+        "created_at": "2024-01-01T00:00:00Z",
+    }
+
+
+def write_catalog(directory: Path, size: int, fmt: str) -> int:
+    """Write a catalog directory whose datasets file has ``size`` entries; return its bytes."""
+    for name in ("metrics", "scenarios", "agents"):
+        shutil.copy(DATA_DIR / f"{name}.json", directory / f"{name}.json")
+    if fmt == "snapshot":
+        write_catalog(directory, size, "json")
+        # Compile through the CLI in its own process, as a deploy step would.
+        subprocess.run(
+            [sys.executable, "-m", "app.compile_catalog", "--data-dir", str(directory)],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        return (directory / "catalog.snapshot").stat().st_size
+    path = directory / f"datasets.{fmt}"
+    with open(path, "w") as f:
+        if fmt == "jsonl":
+            for i in range(size):
+                f.write(json.dumps(synthetic_dataset(i)) + "\n")
+        else:
+            f.write("[")
+            for i in range(size):
+                f.write(("," if i else "") + json.dumps(synthetic_dataset(i)))
+            f.write("]")
+    return path.stat().st_size
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def load(directory: Path) -> dict:
+    """Load the catalog in this process and report timings and peak RSS."""
+    baseline = max_rss_mb()
+    service = DataService(directory, use_snapshot=True)
+    start = time.perf_counter()
+    catalog = await service.load_catalog()
+    load_s = time.perf_counter() - start
+    loaded_rss = max_rss_mb()
+
+    step = max(1, len(catalog.datasets) // 1000)
+    ids = [f"ds-{i:07d}" for i in range(0, len(catalog.datasets), step)]
+    start = time.perf_counter()
+    for dataset_id in ids:
+        catalog.get_dataset(dataset_id)
+    lookup_us = (time.perf_counter() - start) / len(ids) * 1e6
+    return {
+        "source": service.status()["source"],
+        "load_s": load_s,
+        "peak_rss_mb": loaded_rss,
+        "delta_rss_mb": loaded_rss - baseline,
+        "lookup_us": lookup_us,
+    }
+
+
+def run_child(directory: Path) -> dict:
+    """Run :func:`load` in a fresh interpreter; an ``error`` entry means it did not finish."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_catalog_load", "--child", str(directory)],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return {"error": (proc.stderr.strip().splitlines() or [f"exit {proc.returncode}"])[-1]}
+    return json.loads(proc.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--formats", nargs="+", default=["json", "jsonl", "snapshot"])
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(load(args.child))))
+        return
+
+    print(
+        f"{'entries':>9} {'format':>8} {'file MB':>8} {'load s':>7} "
+        f"{'peak RSS MB':>12} {'+RSS MB':>8} {'lookup us':>10}"
+    )
+    for size in args.sizes:
+        for fmt in args.formats:
+            with tempfile.TemporaryDirectory() as tmp:
+                file_bytes = write_catalog(Path(tmp), size, fmt)
+                result = run_child(Path(tmp))
+            if "error" in result:
+                print(f"{size:>9} {fmt:>8} {file_bytes / 1e6:>8.1f}  failed: {result['error']}")
+                continue
+            print(
+                f"{size:>9} {fmt:>8} {file_bytes / 1e6:>8.1f} {result['load_s']:>7.2f} "
+                f"{result['peak_rss_mb']:>12.0f} {result['delta_rss_mb']:>8.0f} "
+                f"{result['lookup_us']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
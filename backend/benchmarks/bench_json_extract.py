@@ -0,0 +1,104 @@
+"""Measure throughput of the tolerant JSON extractor on recorded LLM outputs.
+
+Every completion in ``tests/data/llm_outputs.json`` is parsed with
+:func:`extract_json_object`, grouped by how it was handled: ``clean``
+(parsed by the C decoder, possibly after skipping surrounding text),
+``repaired`` (needed the repairing pass) and ``rejected`` (no usable
+object). Clean outputs are also timed with plain ``json.loads`` on the
+object's span, which is the lower bound for any parser.
+
+``--scale`` pads each reason string so larger completions can be compared.
+
+Usage:
+    ZAI_API_KEY=x python -m benchmarks.bench_json_extract
+    ZAI_API_KEY=x python -m benchmarks.bench_json_extract --scale 20
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from app.agents.json_extract import extract_json_object
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "tests" / "data" / "llm_outputs.json"
+
+
+def load_corpus(path: Path, scale: int) -> List[str]:
+    padding = " Covers grounding, refusal and adversarial robustness." * (scale - 1)
+    contents = []
+    for case in json.loads(path.read_text()):
+        content = case["content"]
+        if scale > 1:
+            content = content.replace("adversarial prompts.", "adversarial prompts." + padding)
+        contents.append(content)
+    return contents
+
+
+def classify(content: str) -> str:
+    try:
+        return "repaired" if extract_json_object(content).repairs else "clean"
+    except ValueError:
+        return "rejected"
+
+
+def run_all(fn: Callable[[str], object], contents: List[str]) -> None:
+    for content in contents:
+        try:
+            fn(content)
+        except ValueError:
+            pass
+
+
+def measure(fn: Callable[[str], object], contents: List[str], seconds: float) -> Dict[str, float]:
+    """Best-of-5 time for one pass over ``contents``, as throughput figures."""
+    run_all(fn, contents)
+    started = time.perf_counter()
+    run_all(fn, contents)
+    single = max(time.perf_counter() - started, 1e-9)
+    iterations = max(1, int(seconds / 5 / single))
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            run_all(fn, contents)
+        best = min(best, (time.perf_counter() - started) / iterations)
+    size = sum(len(content.encode()) for content in contents)
+    return {
+        "outputs": len(contents),
+        "us_per_output": best / len(contents) * 1e6,
+        "mb_per_second": size / best / 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=CORPUS_PATH)
+    parser.add_argument("--scale", type=int, default=1, help="Reason length multiplier")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Timing budget per row")
+    args = parser.parse_args()
+
+    groups: Dict[str, List[str]] = {"clean": [], "repaired": [], "rejected": []}
+    for content in load_corpus(args.corpus, args.scale):
+        groups[classify(content)].append(content)
+    spans = []
+    for content in groups["clean"]:
+        extraction = extract_json_object(content)
+        spans.append(content[extraction.start : extraction.end])
+
+    rows = [("json.loads (clean spans)", json.loads, spans)]
+    rows += [(f"extract ({name})", extract_json_object, items) for name, items in groups.items()]
+    print(f"{'':<26} {'outputs':>8} {'us/output':>10} {'MB/s':>8}")
+    for name, fn, contents in rows:
+        if not contents:
+            continue
+        stats = measure(fn, contents, args.seconds)
+        print(
+            f"{name:<26} {stats['outputs']:>8} {stats['us_per_output']:>10.2f}"
+            f" {stats['mb_per_second']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare the thread-pool LLM call path with the native async client.
+
+The old path ran a synchronous HTTP client inside ``asyncio.to_thread``, so at
+most ``min(32, cpu + 4)`` calls are in flight at once. The native path keeps
+every call on the event loop and is bounded only by the connection pool.
+
+Usage:
+    ZAI_API_KEY=x python -m benchmarks.bench_llm_client --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from app.agents.llm_client import LLMClient
+from benchmarks.stub_llm import StubServer
+
+MESSAGES = [{"role": "user", "content": "Test my RAG agent for safety"}]
+
+
+async def run_threaded(base_url: str, concurrency: int) -> float:
+    """Issue ``concurrency`` calls through a sync client on the default executor."""
+    with httpx.Client(base_url=base_url, limits=httpx.Limits(max_connections=1000)) as client:
+
+        def call() -> dict:
+            response = client.post(
+                "/chat/completions",
+                json={"model": "stub", "messages": MESSAGES, "max_tokens": 10},
+            )
+            return response.json()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(asyncio.to_thread(call) for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+
+async def run_native(client: LLMClient, concurrency: int) -> float:
+    """Issue ``concurrency`` calls through the pooled async client."""
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client.create_chat_completion(MESSAGES, model="stub", temperature=0, max_tokens=10)
+            for _ in range(concurrency)
+        )
+    )
+    return time.perf_counter() - start
+
+
+async def main_async(latency_ms: float, levels: list[int], port: int) -> None:
+    with StubServer(port=port, latency_ms=latency_ms) as stub:
+        client = LLMClient(base_url=stub.base_url, api_key="bench")
+        # Warm both paths so connection setup is not part of the first sample.
+        await run_threaded(stub.base_url, 4)
+        await run_native(client, 4)
+
+        executor_threads = min(32, (os.cpu_count() or 1) + 4)
+        print(f"stub latency {latency_ms:.0f} ms, default executor ~{executor_threads} threads")
+        print(
+            f"{'concurrency':>11} {'threaded s':>11} {'native s':>9} "
+            f"{'threaded rps':>13} {'native rps':>11}"
+        )
+        for n in levels:
+            threaded = await run_threaded(stub.base_url, n)
+            native = await run_native(client, n)
+            print(
+                f"{n:>11} {threaded:>11.3f} {native:>9.3f} "
+                f"{n / threaded:>13.1f} {n / native:>11.1f}"
+            )
+        await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LLM client concurrency benchmark")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--levels", default="8,32,64,128,256")
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+    levels = [int(x) for x in args.levels.split(",")]
+    asyncio.run(main_async(args.latency_ms, levels, args.port))
+
+
+if __name__ == "__main__":
+    main()
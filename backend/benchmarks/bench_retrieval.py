@@ -0,0 +1,157 @@
+"""Compare top-k retrieval prompt context with the full-catalog context.
+
+For every query in ``benchmarks/queries.txt`` the harness builds both system
+prompts and reports their estimated token counts. Agreement is measured
+against a reference recommendation made with the full context:
+
+* offline (default): the reference is the local recommender's pick over the
+  full catalog, and the score is candidate recall, i.e. the share of the
+  referenced dataset, scenario and metrics that the top-k context still
+  shows the LLM;
+* ``--llm``: both prompts are sent to the configured LLM (or ``--base-url``)
+  and the two recommendations are compared field by field.
+
+Usage:
+    ZAI_API_KEY=x python -m benchmarks.bench_retrieval --k 3 5 8
+    ZAI_API_KEY=x python -m benchmarks.bench_retrieval --synthetic 1000 --llm
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+from pathlib import Path
+from typing import List, Optional
+
+from app.agents.evaluation_agent import EvaluationAgent
+from app.agents.intent_classifier import LexiconIntentClassifier
+from app.agents.llm_client import LLMClient
+from app.agents.local_recommender import LocalRecommender
+from app.agents.retrieval import CatalogRetriever
+from app.agents.text import estimate_tokens
+from app.config import settings
+from app.models import Catalog, Dataset
+from app.services.data_service import DataService
+from benchmarks.bench_catalog_load import synthetic_dataset
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_DIR = BENCH_DIR.parent / "data"
+
+
+def load_queries(path: Path) -> List[str]:
+    lines = (line.strip() for line in path.read_text().splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def with_synthetic_datasets(catalog: Catalog, count: int) -> Catalog:
+    """Return ``catalog`` with ``count`` synthetic datasets appended, to show scaling."""
+    extra = [Dataset(**synthetic_dataset(i)) for i in range(count)]
+    return Catalog(
+        [*catalog.datasets, *extra],
+        catalog.metrics,
+        catalog.scenarios,
+        catalog.agents,
+        version=f"{catalog.version}+{count}",
+    )
+
+
+def recall(reference: dict, context_ids: set) -> float:
+    ids = [reference.get("dataset_id"), reference.get("scenario_id")]
+    ids = [i for i in ids + list(reference.get("metric_ids") or []) if i]
+    return sum(i in context_ids for i in ids) / len(ids) if ids else 1.0
+
+
+def agreement(full: dict, topk: dict) -> dict:
+    metrics_full = set(full.get("metric_ids") or [])
+    metrics_topk = set(topk.get("metric_ids") or [])
+    union = metrics_full | metrics_topk
+    return {
+        "dataset": full.get("dataset_id") == topk.get("dataset_id"),
+        "scenario": full.get("scenario_id") == topk.get("scenario_id"),
+        "agent": full.get("agent_id") == topk.get("agent_id"),
+        "metrics_jaccard": len(metrics_full & metrics_topk) / len(union) if union else 1.0,
+    }
+
+
+async def ask(agent: EvaluationAgent, system: str, query: str) -> Optional[dict]:
+    """Send one prompt and return the parsed result, or ``None`` on failure."""
+    try:
+        response = await agent.client.create_chat_completion(
+            [{"role": "system", "content": system}, {"role": "user", "content": query}],
+            model=settings.zai_model,
+            temperature=0,
+            max_tokens=settings.agent_max_tokens,
+        )
+        content = response["choices"][0]["message"]["content"].strip()
+        content = content.removeprefix("```json").removeprefix("```").removesuffix("```")
+        return json.loads(content)
+    except Exception:
+        return None
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    catalog = await DataService(DATA_DIR).load_catalog()
+    if args.synthetic:
+        catalog = with_synthetic_datasets(catalog, args.synthetic)
+    queries = load_queries(args.queries)
+    agent = EvaluationAgent()
+    full_prompt = agent.get_system_message(catalog)
+    full_tokens = estimate_tokens(full_prompt)
+    retriever = CatalogRetriever(catalog)
+    classifier, recommender = LexiconIntentClassifier(), LocalRecommender()
+    print(
+        f"catalog: {len(catalog.datasets)} datasets, {len(catalog.metrics)} metrics, "
+        f"{len(catalog.scenarios)} scenarios, {len(catalog.agents)} agents; "
+        f"{len(queries)} queries; full prompt ~{full_tokens} tokens"
+    )
+
+    if args.llm:
+        agent.client = LLMClient(base_url=args.base_url) if args.base_url else LLMClient()
+        full_answers = await asyncio.gather(*(ask(agent, full_prompt, q) for q in queries))
+
+    header = f"{'k':>3} {'prompt tokens':>14} {'vs full':>8} {'recall':>7}"
+    if args.llm:
+        header += f" {'dataset':>8} {'scenario':>9} {'agent':>6} {'metrics J':>10} {'failed':>7}"
+    print(header)
+    for k in args.k:
+        prompts, recalls = [], []
+        for query in queries:
+            selection = retriever.select(query, k)
+            context = agent._build_context(*selection.collections)
+            prompts.append(agent.SYSTEM_PROMPT + "\n\n" + context)
+            reference = recommender.recommend(classifier.classify(query).intent, query, catalog)
+            context_ids = {item.id for items in selection.collections for item in items}
+            recalls.append(recall(reference, context_ids))
+        tokens = statistics.mean(estimate_tokens(p) for p in prompts)
+        line = f"{k:>3} {tokens:>14.0f} {tokens / full_tokens:>8.0%}"
+        line += f" {statistics.mean(recalls):>7.0%}"
+        if args.llm:
+            answers = await asyncio.gather(*(ask(agent, p, q) for p, q in zip(prompts, queries)))
+            pairs = [agreement(f, t) for f, t in zip(full_answers, answers) if f and t]
+            failed = len(queries) - len(pairs)
+            if pairs:
+                line += (
+                    f" {statistics.mean(p['dataset'] for p in pairs):>8.0%}"
+                    f" {statistics.mean(p['scenario'] for p in pairs):>9.0%}"
+                    f" {statistics.mean(p['agent'] for p in pairs):>6.0%}"
+                    f" {statistics.mean(p['metrics_jaccard'] for p in pairs):>10.2f}"
+                )
+            line += f" {failed:>7}"
+        print(line)
+
+    if agent.client is not None:
+        await agent.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 5, 8])
+    parser.add_argument("--queries", type=Path, default=BENCH_DIR / "queries.txt")
+    parser.add_argument("--synthetic", type=int, default=0, help="extra synthetic datasets")
+    parser.add_argument("--llm", action="store_true", help="compare real LLM recommendations")
+    parser.add_argument("--base-url", help="endpoint for --llm (default: ZAI_BASE_URL)")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Measure per-response serialization cost of POST /api/chat bodies.
+
+Recommendations are built over the bundled catalog with ``N`` synthetic
+metrics each, and three encoders are timed:
+
+* ``model_dump_json``: pydantic serializing the whole ``ChatResponse``;
+* ``fastapi``: a ``response_model=ChatResponse`` route driven through the
+  ASGI interface, i.e. what the endpoint cost before splicing;
+* ``spliced``: :class:`ResponseEncoder` with a warm entry cache, plus the
+  same ASGI round trip through a ``RawJSONResponse`` route.
+
+Usage:
+    ZAI_API_KEY=x python -m benchmarks.bench_serialization --metrics 5 50 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from fastapi import FastAPI
+
+from app.models import Catalog, Metric
+from app.models.recommendation import ChatResponse, Recommendation
+from app.services.data_service import DataService
+from app.services.response_encoder import RawJSONResponse, ResponseEncoder
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def synthetic_metric(i: int) -> Metric:
+    return Metric(
+        id=f"met-syn-{i:05d}",
+        name=f"Synthetic metric {i}",
+        category=("safety", "accuracy", "performance")[i % 3],
+        description=f"Generated metric number {i} used to size recommendation payloads.",
+        cost=("Low", "Medium", "High")[i % 3],
+    )
+
+
+def build_response(catalog: Catalog, metric_count: int) -> ChatResponse:
+    return ChatResponse(
+        content="Here is an evaluation setup for your RAG agent.",
+        recommendation=Recommendation(
+            dataset=catalog.datasets[0],
+            metrics=[synthetic_metric(i) for i in range(metric_count)],
+            agent=catalog.agents[0],
+            scenario=catalog.scenarios[0],
+            reason="Covers safety and answer quality.",
+        ),
+        quick_replies=["Make it cheaper", "Add more safety metrics", "Looks good"],
+    )
+
+
+def per_call_us(fn: Callable[[], object], iterations: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def asgi_post(app: FastAPI) -> bytes:
+    """Drive one POST /chat through ``app`` without a network client."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/chat",
+        "raw_path": b"/chat",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+    body: List[bytes] = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"{}", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def asgi_us(app: FastAPI, iterations: int) -> float:
+    await asgi_post(app)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await asgi_post(app)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def make_apps(response: ChatResponse, catalog: Catalog, encoder: ResponseEncoder):
+    model_app = FastAPI()
+    raw_app = FastAPI()
+
+    @model_app.post("/chat", response_model=ChatResponse)
+    async def chat_model() -> ChatResponse:
+        return response
+
+    @raw_app.post("/chat", response_model=ChatResponse, response_class=RawJSONResponse)
+    async def chat_raw() -> RawJSONResponse:
+        return RawJSONResponse(encoder.encode(response, catalog))
+
+    return model_app, raw_app
+
+
+async def run(metric_counts: List[int], iterations: int) -> List[dict]:
+    catalog = await DataService(DATA_DIR).load_catalog()
+    results = []
+    for count in metric_counts:
+        response = build_response(catalog, count)
+        encoder = ResponseEncoder()
+        spliced = encoder.encode(response, catalog)
+        assert spliced == response.model_dump_json().encode()
+        model_app, raw_app = make_apps(response, catalog, encoder)
+        assert json.loads(await asgi_post(model_app)) == json.loads(await asgi_post(raw_app))
+
+        results.append(
+            {
+                "metrics": count,
+                "bytes": len(spliced),
+                "model_dump_json_us": per_call_us(response.model_dump_json, iterations),
+                "spliced_us": per_call_us(lambda: encoder.encode(response, catalog), iterations),
+                "fastapi_route_us": await asgi_us(model_app, iterations),
+                "spliced_route_us": await asgi_us(raw_app, iterations),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--metrics", type=int, nargs="+", default=[5, 50, 200])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.metrics, args.iterations))
+    print(
+        f"{'metrics':>8} {'bytes':>8} {'dump_json':>10} {'spliced':>9}"
+        f" {'fastapi':>9} {'raw route':>10}   (µs per response)"
+    )
+    for r in results:
+        print(
+            f"{r['metrics']:>8} {r['bytes']:>8} {r['model_dump_json_us']:>10.1f}"
+            f" {r['spliced_us']:>9.1f} {r['fastapi_route_us']:>9.1f} {r['spliced_route_us']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
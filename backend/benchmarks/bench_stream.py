@@ -0,0 +1,69 @@
+"""Time-to-first-useful-byte of /api/chat/stream versus total time of /api/chat.
+
+Serves the backend with uvicorn in-process against the local stub LLM (cache
+and fast path disabled) and reports when the ``intent`` event arrives
+relative to the full response.
+
+Usage:
+    ZAI_API_KEY=x python -m benchmarks.bench_stream --latency-ms 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.config import settings
+from benchmarks.stub_llm import ServerThread, StubServer
+
+MESSAGE = "Please recommend an evaluation setup for my assistant"
+
+
+async def main_async(latency_ms: float, runs: int, port: int, app_port: int) -> None:
+    from app.main import app
+
+    settings.zai_base_url = f"http://127.0.0.1:{port}"
+    settings.response_cache_enabled = False
+    settings.fast_path_enabled = False
+
+    with StubServer(port=port, latency_ms=latency_ms), ServerThread(app, app_port) as backend:
+        async with httpx.AsyncClient(base_url=backend.base_url, timeout=60) as client:
+            blocking, first_event, stream_total = [], [], []
+            for _ in range(runs):
+                start = time.perf_counter()
+                response = await client.post("/api/chat", json={"message": MESSAGE})
+                response.raise_for_status()
+                blocking.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                first = None
+                async with client.stream(
+                    "POST", "/api/chat/stream", json={"message": MESSAGE}
+                ) as response:
+                    async for line in response.aiter_lines():
+                        if first is None and line.startswith("event: intent"):
+                            first = time.perf_counter() - start
+                first_event.append(first)
+                stream_total.append(time.perf_counter() - start)
+
+    ms = lambda xs: f"{statistics.median(xs) * 1000:8.1f} ms"  # noqa: E731
+    print(f"stub generation time {latency_ms:.0f} ms, {runs} runs (medians)")
+    print(f"  /api/chat total               {ms(blocking)}")
+    print(f"  /api/chat/stream first intent {ms(first_event)}")
+    print(f"  /api/chat/stream done         {ms(stream_total)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Streaming time-to-first-useful-byte benchmark")
+    parser.add_argument("--latency-ms", type=float, default=2000.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=9101, help="stub LLM port")
+    parser.add_argument("--app-port", type=int, default=9102, help="backend port")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.latency_ms, args.runs, args.port, args.app_port))
+
+
+if __name__ == "__main__":
+    main()
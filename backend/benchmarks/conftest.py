@@ -0,0 +1,154 @@
+"""``benchmark`` fixture for the pytest micro-benchmarks in this directory, with a stored baseline.
+
+Each benchmark is timed as the best per-call time over several rounds. The
+result is compared with ``baseline.json``: a benchmark fails when it is more
+than ``--tolerance`` times slower than its baseline, even after being
+re-measured twice. On a machine slower than the one the baseline was
+recorded on (measured with a fixed pure-Python calibration workload), the
+limits are scaled up accordingly.
+
+Usage:
+    ZAI_API_KEY=x python -m pytest benchmarks/bench_agent_pipeline.py
+    ZAI_API_KEY=x python -m pytest benchmarks/bench_agent_pipeline.py --save-baseline
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+ROUND_SECONDS = 0.02
+MAX_ROUNDS = 5
+BUDGET_SECONDS = 1.0
+RETRIES = 2
+# Sub-microsecond stages jitter by more than any tolerance factor allows.
+ABSOLUTE_SLACK_SECONDS = 1e-6
+
+
+def _best_per_call(fn: Callable[[], Any]) -> float:
+    """Best per-call time over up to ``MAX_ROUNDS`` rounds of ~``ROUND_SECONDS`` each."""
+    started = time.perf_counter()
+    fn()
+    single = max(time.perf_counter() - started, 1e-9)
+    iterations = max(1, int(ROUND_SECONDS / single))
+    rounds = max(1, min(MAX_ROUNDS, int(BUDGET_SECONDS / (single * iterations))))
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter() - started) / iterations)
+    return best
+
+
+def _calibration_workload() -> int:
+    table = {}
+    for i in range(20_000):
+        table[f"key-{i}"] = i * i
+    return sum(len(key) for key in table) + sum(table.values())
+
+
+class BenchmarkSession:
+    """Results of one run, the loaded baseline and the machine speed ratio between them."""
+
+    def __init__(self, config: pytest.Config) -> None:
+        self.path: Path = config.getoption("baseline")
+        self.save: bool = config.getoption("save_baseline")
+        self.tolerance: float = config.getoption("tolerance")
+        self.results: Dict[str, float] = {}
+        self.calibration = min(_best_per_call(_calibration_workload) for _ in range(3))
+        self.baseline: Dict[str, Any] = {}
+        if self.path.exists() and not self.save:
+            self.baseline = json.loads(self.path.read_text())
+
+    @property
+    def speed_ratio(self) -> float:
+        """How much slower this machine is than the baseline's (``>1`` = slower)."""
+        reference = self.baseline.get("calibration_seconds")
+        return self.calibration / reference if reference else 1.0
+
+    def allowed(self, name: str) -> Optional[float]:
+        # Never tighten the limit: a burst of noise during calibration would
+        # otherwise make a normal run look like a regression.
+        seconds = self.baseline.get("results", {}).get(name)
+        if not seconds:
+            return None
+        scaled = seconds * max(1.0, self.speed_ratio)
+        return max(scaled * self.tolerance, scaled + ABSOLUTE_SLACK_SECONDS)
+
+    def write(self) -> None:
+        baseline = {
+            "calibration_seconds": self.calibration,
+            "results": dict(sorted(self.results.items())),
+        }
+        self.path.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+class Benchmark:
+    """Callable fixture: ``benchmark(fn, *args)`` times ``fn`` and returns its result."""
+
+    def __init__(self, session: BenchmarkSession, name: str) -> None:
+        self.session = session
+        self.name = name
+        self.seconds: Optional[float] = None
+
+    def __call__(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        result = fn(*args, **kwargs)
+        self.seconds = _best_per_call(lambda: fn(*args, **kwargs))
+        allowed = self.session.allowed(self.name)
+        # Re-measure before failing so one noisy burst on the machine is not a regression.
+        for _ in range(RETRIES):
+            if allowed is None or self.seconds <= allowed:
+                break
+            self.seconds = min(self.seconds, _best_per_call(lambda: fn(*args, **kwargs)))
+        self.session.results[self.name] = self.seconds
+        if allowed is not None and self.seconds > allowed:
+            pytest.fail(
+                f"{self.name} regressed: {self.seconds * 1e6:.1f} us per call, allowed"
+                f" {allowed * 1e6:.1f} us ({self.session.tolerance}x the scaled baseline)"
+            )
+        return result
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmark")
+    group.addoption("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    group.addoption(
+        "--save-baseline", action="store_true", help="Record this run as the new baseline"
+    )
+    group.addoption(
+        "--tolerance", type=float, default=1.5, help="Allowed slowdown factor over the baseline"
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config._benchmark_session = None
+
+
+def _session(config: pytest.Config) -> BenchmarkSession:
+    if config._benchmark_session is None:
+        config._benchmark_session = BenchmarkSession(config)
+    return config._benchmark_session
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> Benchmark:
+    return Benchmark(_session(request.config), request.node.nodeid.split("::", 1)[-1])
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    session = config._benchmark_session
+    if session is None or not session.results:
+        return
+    terminalreporter.section("benchmarks (us per call)")
+    terminalreporter.write_line(f"machine speed vs baseline: {session.speed_ratio:.2f}x")
+    for name, seconds in session.results.items():
+        base = session.baseline.get("results", {}).get(name)
+        change = f"{seconds / (base * session.speed_ratio) - 1:+.0%}" if base else "new"
+        terminalreporter.write_line(f"{seconds * 1e6:>12.2f}  {change:>6}  {name}")
+    if session.save:
+        session.write()
+        terminalreporter.write_line(f"baseline written to {session.path}")
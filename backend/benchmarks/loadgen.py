@@ -0,0 +1,297 @@
+"""Open-loop load generator for ``POST /api/chat``.
+
+Requests are started on a fixed schedule at ``--rps`` (or with Poisson
+arrivals) regardless of how fast earlier ones finish, and each latency is
+measured from its scheduled start, so a stalled server shows up as latency
+rather than as a lower send rate. Messages cycle through
+``benchmarks/queries.txt``.
+
+With ``--spawn`` the stub LLM and the backend are started as subprocesses
+(the backend pointed at the stub), so a full offline run needs no other
+setup; otherwise ``--url`` must point at a running backend. Results are
+written as JSON (``--output``) and can be compared with an earlier run
+(``--compare``).
+
+Usage:
+    python -m benchmarks.loadgen --spawn --rps 50 --duration 30 \\
+        --stub-args="--latency-dist lognormal --error-rate 0.01"
+    python -m benchmarks.loadgen --url http://127.0.0.1:8000 --rps 20 \\
+        --output results/after.json --compare results/before.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def load_queries(path: Path) -> List[str]:
+    # Not imported from bench_retrieval: that imports app settings, which the
+    # load generator must not need.
+    lines = (line.strip() for line in path.read_text().splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values (``q`` in 0..100)."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies: List[float], outcomes: Counter, elapsed: float) -> dict:
+    """Aggregate per-request outcomes into throughput, error rates and latency percentiles."""
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    total = sum(outcomes.values())
+    ok = outcomes.get("200", 0)
+    return {
+        "requests": total,
+        "ok": ok,
+        "errors": {key: count for key, count in sorted(outcomes.items()) if key != "200"},
+        "error_rate": round((total - ok) / total, 4) if total else 0.0,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": _round(percentile(latencies_ms, 50)),
+            "p95": _round(percentile(latencies_ms, 95)),
+            "p99": _round(percentile(latencies_ms, 99)),
+            "max": _round(latencies_ms[-1] if latencies_ms else None),
+            "mean": _round(sum(latencies_ms) / len(latencies_ms) if latencies_ms else None),
+        },
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+def arrival_offsets(rps: float, duration: float, poisson: bool, seed: int) -> Iterator[float]:
+    """Seconds after the start at which each request is due."""
+    rng = random.Random(seed)
+    offset = 0.0
+    for i in itertools.count():
+        offset = offset + rng.expovariate(rps) if poisson else i / rps
+        if offset >= duration:
+            return
+        yield offset
+
+
+async def run_load(
+    url: str,
+    messages: Sequence[str],
+    rps: float,
+    duration: float,
+    poisson: bool = False,
+    max_inflight: int = 1000,
+    timeout: float = 60.0,
+    unique: bool = False,
+    seed: int = 0,
+) -> dict:
+    """Drive ``url`` (the /api/chat endpoint) open-loop and return the summary.
+
+    Only successful (200) requests contribute latencies. Requests that
+    would exceed ``max_inflight`` are not sent and count as
+    ``client_overload``; failures without a response count by exception name.
+    """
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+    inflight = 0
+    limits = httpx.Limits(max_connections=max_inflight, max_keepalive_connections=max_inflight)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+
+        async def one(index: int, due: float) -> None:
+            nonlocal inflight
+            message = messages[index % len(messages)]
+            if unique:
+                message = f"{message} (request {index})"
+            try:
+                response = await client.post(url, json={"message": message})
+                outcome = str(response.status_code)
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            finally:
+                inflight -= 1
+            outcomes[outcome] += 1
+            if outcome == "200":
+                latencies.append(time.perf_counter() - due)
+
+        tasks = []
+        start = time.perf_counter()
+        for index, offset in enumerate(arrival_offsets(rps, duration, poisson, seed)):
+            due = start + offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if inflight >= max_inflight:
+                outcomes["client_overload"] += 1
+                continue
+            inflight += 1
+            tasks.append(asyncio.create_task(one(index, due)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return summarize(latencies, outcomes, elapsed)
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with {process.returncode}")
+        with contextlib.suppress(httpx.HTTPError):
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} not up after {timeout}s")
+
+
+@contextlib.contextmanager
+def spawned_backend(
+    port: int, stub_port: int, stub_args: Sequence[str], backend_env: Dict[str, str]
+) -> Iterator[str]:
+    """Start the stub LLM and a backend pointed at it; yield the backend base URL."""
+    env = {
+        **os.environ,
+        "ZAI_API_KEY": os.environ.get("ZAI_API_KEY", "loadgen"),
+        "ZAI_BASE_URL": f"http://127.0.0.1:{stub_port}",
+        "CATALOG_WATCH_ENABLED": "false",
+        **backend_env,
+    }
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_llm", "--port", str(stub_port), *stub_args],
+        cwd=BACKEND_DIR,
+    )
+    backend = None
+    try:
+        _wait_until_up(f"http://127.0.0.1:{stub_port}/stats", stub)
+        backend = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+            + ["--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_DIR,
+            env=env,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        _wait_until_up(f"{base_url}/ready", backend)
+        yield base_url
+    finally:
+        for process in (backend, stub):
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+
+def compare(current: dict, baseline: dict) -> str:
+    """Render a side-by-side of the headline numbers of two result files."""
+    rows = [
+        ("throughput_rps", lambda r: r["summary"]["throughput_rps"]),
+        ("error_rate", lambda r: r["summary"]["error_rate"]),
+        *(
+            (f"{q}_ms", lambda r, q=q: r["summary"]["latency_ms"][q])
+            for q in ("p50", "p95", "p99", "max")
+        ),
+    ]
+    lines = [f"{'':>16} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for name, get in rows:
+        before, after = get(baseline), get(current)
+        change = f"{(after - before) / before:+.1%}" if before and after is not None else "n/a"
+        lines.append(f"{name:>16} {before!s:>10} {after!s:>10} {change:>8}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Backend base URL")
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of arrivals")
+    parser.add_argument("--poisson", action="store_true", help="Exponential inter-arrival times")
+    parser.add_argument("--max-inflight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--unique", action="store_true", help="Make every message distinct (defeats caching)"
+    )
+    parser.add_argument("--queries", type=Path, default=BENCH_DIR / "queries.txt")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true", help="Start stub LLM and backend")
+    parser.add_argument("--port", type=int, default=8100, help="Backend port with --spawn")
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--stub-args", default="", help="Extra stub_llm arguments")
+    parser.add_argument(
+        "--backend-env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Environment override for the spawned backend (repeatable)",
+    )
+    parser.add_argument("--output", type=Path, help="Result JSON (default: results/<time>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    messages = load_queries(args.queries)
+    backend_env = dict(item.split("=", 1) for item in args.backend_env)
+    config = {
+        "rps": args.rps,
+        "duration": args.duration,
+        "poisson": args.poisson,
+        "max_inflight": args.max_inflight,
+        "unique": args.unique,
+        "spawn": args.spawn,
+        "stub_args": args.stub_args,
+        "backend_env": backend_env,
+    }
+
+    async def run(base_url: str) -> dict:
+        return await run_load(
+            f"{base_url}/api/chat",
+            messages,
+            args.rps,
+            args.duration,
+            poisson=args.poisson,
+            max_inflight=args.max_inflight,
+            timeout=args.timeout,
+            unique=args.unique,
+            seed=args.seed,
+        )
+
+    if args.spawn:
+        stub_args = shlex.split(args.stub_args)
+        with spawned_backend(args.port, args.stub_port, stub_args, backend_env) as base_url:
+            summary = asyncio.run(run(base_url))
+    else:
+        config["url"] = args.url
+        summary = asyncio.run(run(args.url))
+
+    result = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": config,
+        "summary": summary,
+    }
+    output = args.output or RESULTS_DIR / f"loadgen-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n")
+
+    print(json.dumps(summary, indent=2))
+    print(f"Results written to {output}")
+    if args.compare:
+        print(compare(result, json.loads(args.compare.read_text())))
+
+
+if __name__ == "__main__":
+    main()
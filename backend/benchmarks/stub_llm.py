@@ -0,0 +1,213 @@
+"""Local OpenAI-compatible stub for the chat-completions endpoint.
+
+Serves ``POST /chat/completions`` with a canned JSON answer after a
+simulated delay, so the backend can be measured without calling z.ai.
+Requests with ``"stream": true`` get the answer as chat-completion chunks
+spread evenly over the same delay.
+
+The delay is fixed, uniform or lognormal around ``--latency-ms``; a share
+of requests (``--error-rate``) fails with ``--error-status``. ``--responses``
+points at a JSON list of answers (objects or raw strings) that are served
+round-robin instead of the built-in one.
+
+Usage:
+    python -m benchmarks.stub_llm --port 9100 --latency-ms 200
+    python -m benchmarks.stub_llm --latency-dist lognormal --latency-sigma 0.6 \
+        --error-rate 0.02 --responses answers.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CANNED_RESULT = {
+    "intent": "rag_safety",
+    "dataset_id": "ds-001",
+    "metric_ids": ["met-004", "met-005"],
+    "scenario_id": "scn-004",
+    "agent_id": "ag-001",
+    "reason": "Stub recommendation.",
+}
+CANNED_CONTENT = json.dumps(CANNED_RESULT)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+class LatencyModel:
+    """Draws per-request delays in seconds.
+
+    ``fixed`` always returns ``latency_ms``; ``uniform`` spreads evenly over
+    ``latency_ms * (1 ± sigma)``; ``lognormal`` has median ``latency_ms``
+    and shape ``sigma``, giving the long right tail of real LLM APIs.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 200.0,
+        distribution: str = "fixed",
+        sigma: float = 0.5,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution!r}")
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.sigma = sigma
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        if self.distribution == "uniform":
+            low = max(0.0, 1 - self.sigma)
+            return self.latency_ms * self.rng.uniform(low, 1 + self.sigma) / 1000
+        if self.distribution == "lognormal":
+            return self.rng.lognormvariate(math.log(max(self.latency_ms, 1e-3)), self.sigma) / 1000
+        return self.latency_ms / 1000
+
+
+def load_responses(path: Path) -> List[str]:
+    """Read canned answers: a JSON list of objects (re-encoded) or strings (sent verbatim)."""
+    items = json.loads(Path(path).read_text())
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"{path} must hold a non-empty JSON list")
+    return [item if isinstance(item, str) else json.dumps(item) for item in items]
+
+
+def create_app(
+    latency_ms: float = 200.0,
+    distribution: str = "fixed",
+    sigma: float = 0.5,
+    error_rate: float = 0.0,
+    error_status: int = 500,
+    responses: Optional[Sequence[Union[str, dict]]] = None,
+    seed: Optional[int] = None,
+) -> FastAPI:
+    """Build the stub application.
+
+    Args:
+        latency_ms: Fixed delay, or median / centre of the distribution
+        distribution: ``fixed``, ``uniform`` or ``lognormal``
+        sigma: Spread of the uniform or lognormal distribution
+        error_rate: Share of requests answered with ``error_status``
+        error_status: HTTP status of simulated failures
+        responses: Canned answers served round-robin (defaults to one fixed answer)
+        seed: Seed for latency and error draws, for repeatable runs
+    """
+    app = FastAPI(title="Stub LLM")
+    rng = random.Random(seed)
+    latency = LatencyModel(latency_ms, distribution, sigma, rng)
+    contents = itertools.cycle(
+        [r if isinstance(r, str) else json.dumps(r) for r in responses or [CANNED_CONTENT]]
+    )
+    app.state.counts = {"requests": 0, "errors": 0}
+
+    async def stream_chunks(content: str, delay: float, chunk_chars: int = 8):
+        pieces = [content[i : i + chunk_chars] for i in range(0, len(content), chunk_chars)]
+        for piece in pieces:
+            await asyncio.sleep(delay / len(pieces))
+            event = {
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"content": piece}}],
+            }
+            yield f"data: {json.dumps(event)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/chat/completions")
+    async def chat_completions(body: dict):
+        app.state.counts["requests"] += 1
+        delay = latency.sample()
+        if error_rate > 0 and rng.random() < error_rate:
+            app.state.counts["errors"] += 1
+            await asyncio.sleep(delay)
+            return JSONResponse(
+                status_code=error_status,
+                content={"error": {"message": "Simulated upstream failure", "type": "stub"}},
+            )
+        content = next(contents)
+        if body.get("stream"):
+            return StreamingResponse(stream_chunks(content, delay), media_type="text/event-stream")
+        await asyncio.sleep(delay)
+        return {
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.counts
+
+    return app
+
+
+class ServerThread:
+    """Serve an ASGI app with uvicorn in a background thread of the benchmark process."""
+
+    def __init__(self, app, port: int) -> None:
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.base_url = f"http://127.0.0.1:{port}"
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "ServerThread":
+        self._thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+class StubServer(ServerThread):
+    """Run the stub LLM in a background thread (keyword options as for :func:`create_app`)."""
+
+    def __init__(self, port: int = 9100, latency_ms: float = 200.0, **options) -> None:
+        super().__init__(create_app(latency_ms, **options), port)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--responses", type=Path, help="JSON list of canned answers")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    app = create_app(
+        args.latency_ms,
+        distribution=args.latency_dist,
+        sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        responses=load_responses(args.responses) if args.responses else None,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
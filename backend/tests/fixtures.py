@@ -1,5 +1,10 @@
+from pathlib import Path
+from unittest.mock import AsyncMock
+
 import pytest
 from app.agents.evaluation_agent import EvaluationAgent
+from app.config import settings
+from app.services.chat_service import ChatService
 from app.services.data_service import DataService
 from app.models.dataset import Dataset
 from app.models.metric import Metric
@@ -76,3 +81,29 @@ def mock_agents():
             description="A test agent",
         )
     ]
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+LLM_RESULT = {
+    "intent": "rag_safety",
+    "dataset_id": "ds-001",
+    "metric_ids": ["met-004", "met-005"],
+    "scenario_id": "scn-004",
+    "agent_id": "ag-001",
+    "reason": "Safety first.",
+}
+
+
+@pytest.fixture
+def chat_service(monkeypatch):
+    """Fixture providing a chat service over the bundled catalog with a mocked LLM.
+
+    The local fast path is disabled so every uncached message reaches the LLM.
+    """
+    monkeypatch.setattr(settings, "fast_path_enabled", False)
+    service = ChatService()
+    service.data_service = DataService(DATA_DIR)
+    service.response_cache.clear()
+    service.agent.extract_result = AsyncMock(side_effect=lambda *a, **k: dict(LLM_RESULT))
+    return service
@@ -0,0 +1,257 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from app.agents.admission import AdaptiveLimiter
+from app.agents.hedging import HedgedCaller
+from app.agents.llm_client import LLMClient, LLMError, LLMOverloadedError
+from app.main import app
+from app.metrics import LLM_CONCURRENCY_LIMIT, LLM_QUEUE_LENGTH, LLM_REJECTED
+from app.services.chat_service import get_chat_service
+from tests.fixtures import chat_service
+
+
+def _limiter(**options) -> AdaptiveLimiter:
+    defaults = dict(
+        initial_limit=4,
+        min_limit=1,
+        max_limit=50,
+        backoff=0.5,
+        latency_threshold_ms=1000,
+        max_queue=10,
+        max_wait_ms=1000,
+    )
+    return AdaptiveLimiter(**{**defaults, **options})
+
+
+async def _hold(limiter: AdaptiveLimiter, release: asyncio.Event, **admit) -> None:
+    async with limiter.admit(**admit):
+        await release.wait()
+
+
+def _overloadable_stub(capacity: int, base_seconds: float) -> LLMClient:
+    """LLMClient against a stub that slows down in proportion to load beyond ``capacity``."""
+    active = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active
+        active += 1
+        try:
+            await asyncio.sleep(base_seconds * max(1.0, active / capacity))
+        finally:
+            active -= 1
+        return httpx.Response(200, json={"choices": [{"message": {"content": "{}"}}]})
+
+    return LLMClient(base_url="http://stub", api_key="k", transport=httpx.MockTransport(handler))
+
+
+class TestAdaptiveLimiter:
+    """Tests for the AIMD limit and the bounded wait queue."""
+
+    @pytest.mark.asyncio
+    async def test_calls_over_the_limit_wait_for_a_slot(self):
+        """Test that a queued call starts as soon as a running one finishes."""
+        limiter = _limiter(initial_limit=1)
+        release = asyncio.Event()
+        first = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+
+        assert limiter.stats()["in_flight"] == 1 and limiter.stats()["queued"] == 1
+        assert LLM_QUEUE_LENGTH.labels().value == 1
+        release.set()
+        await asyncio.gather(first, second)
+        assert limiter.stats()["admitted"] == 2 and limiter.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_limit_grows_on_success_under_load(self):
+        """Test additive increase while the limit is in use."""
+        limiter = _limiter(initial_limit=2)
+        for _ in range(8):
+            release = asyncio.Event()
+            tasks = [asyncio.create_task(_hold(limiter, release)) for _ in range(2)]
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(*tasks)
+        assert limiter.stats()["limit"] > 2
+        assert LLM_CONCURRENCY_LIMIT.labels().value == limiter.current_limit
+
+    @pytest.mark.asyncio
+    async def test_congestion_shrinks_limit_once_per_burst(self):
+        """Test that concurrent transient failures cause a single multiplicative decrease."""
+        limiter = _limiter(initial_limit=8)
+
+        async def failing():
+            async with limiter.admit():
+                await asyncio.sleep(0.01)
+                raise LLMError("HTTP 503", transient=True)
+
+        results = await asyncio.gather(*(failing() for _ in range(8)), return_exceptions=True)
+        assert all(isinstance(r, LLMError) for r in results)
+        assert limiter.stats()["limit"] == 4
+        assert limiter.stats()["decreases"] == 1
+
+        await asyncio.gather(failing(), return_exceptions=True)
+        assert limiter.stats()["limit"] == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_calls_count_as_congestion(self):
+        """Test that exceeding the latency threshold lowers the limit."""
+        limiter = _limiter(initial_limit=4, latency_threshold_ms=5)
+        async with limiter.admit():
+            await asyncio.sleep(0.02)
+        assert limiter.stats()["limit"] == 2
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_immediately(self):
+        """Test the fast rejection with a Retry-After hint once the queue is full."""
+        limiter = _limiter(initial_limit=1, max_queue=1)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold(limiter, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+        before = LLM_REJECTED.labels("queue_full").value
+
+        with pytest.raises(LLMOverloadedError) as error:
+            await _hold(limiter, release)
+        assert error.value.retry_after >= 1
+        assert LLM_REJECTED.labels("queue_full").value == before + 1
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_wait_is_capped_by_the_callers_deadline(self):
+        """Test that a queued call gives up when its remaining time runs out."""
+        limiter = _limiter(initial_limit=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+
+        started = time.perf_counter()
+        with pytest.raises(LLMOverloadedError, match="No LLM capacity within"):
+            await _hold(limiter, release, timeout=0.05)
+        assert time.perf_counter() - started < 0.5
+        assert limiter.stats()["queued"] == 0 and limiter.stats()["rejected"]["wait_timeout"] == 1
+        release.set()
+        await holder
+        assert limiter.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_predicted_wait_over_budget_rejects_without_queueing(self):
+        """Test that a call is refused at once when the queue would outlast its wait."""
+        limiter = _limiter(initial_limit=1, max_wait_ms=100)
+        limiter.mean_latency = 1.0
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(LLMOverloadedError, match="exceeds"):
+            await _hold(limiter, release)
+        assert limiter.stats()["queued_total"] == 0
+        release.set()
+        await holder
+
+    @pytest.mark.asyncio
+    async def test_hedges_need_a_free_slot(self):
+        """Test that a slow call is not duplicated while the limiter is full."""
+        limiter = _limiter(initial_limit=1)
+        client = _overloadable_stub(capacity=10, base_seconds=0.1)
+        caller = HedgedCaller(
+            hedge_enabled=True, hedge_initial_delay_ms=10, hedge_min_samples=100, limiter=limiter
+        )
+        await caller.call(
+            lambda: client.create_chat_completion([], model="m", temperature=0, max_tokens=1)
+        )
+        assert caller.stats()["hedges_fired"] == 0
+        await client.aclose()
+
+
+class TestGoodputUnderOverload:
+    """Offered load well above what the stub can serve, with and without admission control."""
+
+    CAPACITY = 5
+    BASE_SECONDS = 0.02
+    RPS = 400
+    DURATION = 1.0
+    DEADLINE_SECONDS = 0.3
+
+    async def _run(self, limiter):
+        client = _overloadable_stub(self.CAPACITY, self.BASE_SECONDS)
+        caller = HedgedCaller(
+            hedge_enabled=False,
+            max_retries=0,
+            deadline_seconds=self.DEADLINE_SECONDS,
+            limiter=limiter,
+        )
+        outcomes = {"ok": 0, "rejected": 0, "failed": 0}
+        rejection_seconds = []
+
+        async def one():
+            started = time.perf_counter()
+            try:
+                await caller.call(
+                    lambda: client.create_chat_completion(
+                        [], model="m", temperature=0, max_tokens=1
+                    )
+                )
+                outcomes["ok"] += 1
+            except LLMOverloadedError:
+                outcomes["rejected"] += 1
+                rejection_seconds.append(time.perf_counter() - started)
+            except LLMError:
+                outcomes["failed"] += 1
+
+        tasks = []
+        start = time.perf_counter()
+        for i in range(int(self.RPS * self.DURATION)):
+            delay = start + i / self.RPS - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one()))
+        await asyncio.gather(*tasks)
+        await client.aclose()
+        return outcomes, rejection_seconds
+
+    @pytest.mark.asyncio
+    async def test_goodput_stays_near_capacity(self):
+        """Test that shedding keeps goodput near capacity where the unlimited run collapses."""
+        capacity = self.CAPACITY / self.BASE_SECONDS * self.DURATION
+        unlimited, _ = await self._run(None)
+        limiter = _limiter(initial_limit=20, latency_threshold_ms=60, max_queue=50, max_wait_ms=100)
+        limited, rejection_seconds = await self._run(limiter)
+
+        # Without a limit every request slows down together and most miss the deadline.
+        assert unlimited["failed"] > unlimited["ok"]
+        # With one, excess load is refused quickly and the rest finish in time.
+        assert limited["ok"] >= 0.75 * capacity
+        assert limited["ok"] >= 1.3 * unlimited["ok"]
+        assert limited["failed"] == 0
+        assert limited["rejected"] > 0
+        assert max(rejection_seconds) < self.DEADLINE_SECONDS
+        assert limiter.stats()["limit"] < 20
+
+
+class TestOverloadResponse:
+    """Tests for how /api/chat reports admission-control rejections."""
+
+    @pytest.mark.asyncio
+    async def test_overload_is_503_with_retry_after(self, chat_service):
+        """Test the status code and Retry-After header of a shed request."""
+        chat_service.agent.extract_result = AsyncMock(
+            side_effect=LLMOverloadedError("LLM wait queue is full", retry_after=3)
+        )
+        app.dependency_overrides[get_chat_service] = lambda: chat_service
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post("/api/chat", json={"message": "Test my RAG agent"})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+        assert response.json()["detail"] == "LLM wait queue is full"
@@ -1,6 +1,13 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from tests.fixtures import evaluation_agent, mock_datasets, mock_metrics, mock_scenarios, mock_agents
+from app.models.catalog import Catalog
+from tests.fixtures import (
+    evaluation_agent,
+    mock_datasets,
+    mock_metrics,
+    mock_scenarios,
+    mock_agents,
+)
 
 
 class TestEvaluationAgent:
@@ -8,10 +15,11 @@ class TestEvaluationAgent:
 
     @pytest.mark.asyncio
     async def test_agent_initializes_client(self, evaluation_agent):
-        """Test that the agent initializes the OpenAI client."""
-        with patch("app.agents.evaluation_agent.AsyncOpenAI") as mock_openai:
+        """Test that the agent initializes the pooled async LLM client."""
+        with patch("app.agents.evaluation_agent.LLMClient") as mock_client:
             await evaluation_agent.initialize()
-            mock_openai.assert_called_once()
+            await evaluation_agent.initialize()
+            mock_client.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_build_context_with_empty_lists(self, evaluation_agent):
@@ -52,7 +60,7 @@ class TestEvaluationAgent:
         }
 
         recommendation = evaluation_agent._build_recommendation(
-            result, mock_datasets, mock_metrics, mock_scenarios, mock_agents
+            result, Catalog(mock_datasets, mock_metrics, mock_scenarios, mock_agents)
         )
 
         assert recommendation is not None
@@ -78,7 +86,7 @@ class TestEvaluationAgent:
         }
 
         recommendation = evaluation_agent._build_recommendation(
-            result, mock_datasets, mock_metrics, mock_scenarios, mock_agents
+            result, Catalog(mock_datasets, mock_metrics, mock_scenarios, mock_agents)
         )
 
         assert recommendation is not None
@@ -118,3 +126,34 @@ class TestEvaluationAgent:
         result = {"intent": "unknown_intent"}
         response = evaluation_agent._generate_response(result, None)
         assert "recommendation" in response.lower()
+
+    @pytest.mark.asyncio
+    async def test_system_message_built_once_per_catalog_version(
+        self, evaluation_agent, mock_datasets, mock_metrics, mock_scenarios, mock_agents
+    ):
+        """Test that the system message is memoized and rebuilt on a new version."""
+        collections = (mock_datasets, mock_metrics, mock_scenarios, mock_agents)
+        with patch.object(
+            evaluation_agent, "_build_context", wraps=evaluation_agent._build_context
+        ) as build:
+            first = evaluation_agent.get_system_message(Catalog(*collections, version="v1"))
+            second = evaluation_agent.get_system_message(Catalog(*collections, version="v1"))
+            assert build.call_count == 1
+            assert first is second
+            assert first.startswith(evaluation_agent.SYSTEM_PROMPT)
+
+            evaluation_agent.get_system_message(Catalog(*collections, version="v2"))
+            assert build.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_system_message_without_version_is_not_cached(
+        self, evaluation_agent, mock_datasets, mock_metrics, mock_scenarios, mock_agents
+    ):
+        """Test that unversioned callers always get a freshly built message."""
+        catalog = Catalog(mock_datasets, mock_metrics, mock_scenarios, mock_agents)
+        with patch.object(
+            evaluation_agent, "_build_context", wraps=evaluation_agent._build_context
+        ) as build:
+            evaluation_agent.get_system_message(catalog)
+            evaluation_agent.get_system_message(catalog)
+            assert build.call_count == 2
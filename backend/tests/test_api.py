@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 from app.main import app
+from app.services.chat_service import get_chat_service
+from tests.fixtures import chat_service
 
 
 class TestChatAPI:
@@ -35,9 +37,7 @@ class TestChatAPI:
             mock_service.return_value = mock_chat_service
 
             async with AsyncClient(app=app, base_url="http://test") as client:
-                response = await client.post(
-                    "/api/chat", json={"message": "Test my RAG agent"}
-                )
+                response = await client.post("/api/chat", json={"message": "Test my RAG agent"})
 
                 # The response might be 200 or 500 depending on mocking
                 # Just verify the endpoint is reachable
@@ -69,3 +69,31 @@ class TestChatAPI:
             # FastAPI CORS middleware doesn't add headers to GET in test mode
             # Just verify the endpoint works
             assert response.status_code == 200
+
+
+class TestReadiness:
+    """Tests for the readiness endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_ready_after_warm_up(self, chat_service):
+        """Test that /ready flips from 503 to 200 once warm-up has run."""
+        app.dependency_overrides[get_chat_service] = lambda: chat_service
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                cold = await client.get("/ready")
+                await chat_service.warm_up()
+                warm = await client.get("/ready")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert cold.status_code == 503
+        assert cold.json()["catalog"] is False
+        assert warm.status_code == 200
+        assert warm.json() == {
+            "status": "ready",
+            "ready": True,
+            "catalog": True,
+            "llm_client": True,
+            "error": None,
+        }
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.main import app
+from app.services.chat_service import get_chat_service
+from tests.fixtures import chat_service, LLM_RESULT
+
+
+def _tracking_extract(state: dict):
+    async def extract(message, *args, **kwargs):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await asyncio.sleep(0.01)
+            if message == "bad":
+                raise ValueError("LLM response missing required fields: ['intent']")
+            return dict(LLM_RESULT)
+        finally:
+            state["active"] -= 1
+
+    return extract
+
+
+async def _post(chat_service, url: str, payload: dict) -> httpx.Response:
+    app.dependency_overrides[get_chat_service] = lambda: chat_service
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            return await client.post(url, json=payload)
+    finally:
+        app.dependency_overrides.clear()
+
+
+class TestChatBatch:
+    """Tests for POST /api/chat/batch."""
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order_with_bounded_concurrency(self, chat_service, monkeypatch):
+        """Test ordering, per-item errors and the concurrency limit."""
+        monkeypatch.setattr(settings, "batch_concurrency", 3)
+        state = {"active": 0, "peak": 0}
+        chat_service.agent.extract_result = _tracking_extract(state)
+        messages = [f"message {i}" for i in range(10)]
+        messages[4] = "bad"
+
+        response = await _post(chat_service, "/api/chat/batch", {"messages": messages})
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["index"] for r in results] == list(range(10))
+        assert results[4]["status_code"] == 400
+        assert "missing required fields" in results[4]["error"]
+        assert results[0]["response"]["recommendation"]["dataset"]["id"] == "ds-001"
+        assert state["peak"] == 3
+
+    @pytest.mark.asyncio
+    async def test_ndjson_stream(self, chat_service):
+        """Test that stream=true returns one JSON item per line."""
+        response = await _post(
+            chat_service, "/api/chat/batch?stream=true", {"messages": ["a", "b", "c"]}
+        )
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        items = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(item["index"] for item in items) == [0, 1, 2]
+        assert all(item["status_code"] == 200 for item in items)
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_and_blank_batches(self, chat_service, monkeypatch):
+        """Test the batch size limit and per-message validation."""
+        monkeypatch.setattr(settings, "batch_max_messages", 2)
+        too_many = await _post(chat_service, "/api/chat/batch", {"messages": ["a", "b", "c"]})
+        blank = await _post(chat_service, "/api/chat/batch", {"messages": ["a", "  "]})
+
+        assert too_many.status_code == 422
+        assert blank.status_code == 422
@@ -0,0 +1,104 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agents.context_encoding import encode_compact, fit_to_budget, truncate
+from app.agents.text import estimate_tokens
+from app.config import settings
+from app.services.data_service import DataService
+from tests.fixtures import DATA_DIR, LLM_RESULT, evaluation_agent
+
+
+class TestTokenEstimate:
+    """Tests for the tokenizer-free prompt size estimate."""
+
+    def test_counts_words_numbers_punctuation_and_layout(self):
+        """Test the per-piece costs of the estimate."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("a tag") == 2
+        assert estimate_tokens("hallucination") == 3
+        assert estimate_tokens("ds-0042") == 4
+        assert estimate_tokens("a\n    b") == 4
+
+
+class TestCompactEncoding:
+    """Tests for the one-row-per-entry context layout."""
+
+    @pytest.mark.asyncio
+    async def test_one_row_per_entry_and_smaller_than_verbose(self, evaluation_agent):
+        """Test that every entry gets a single row and the context shrinks."""
+        catalog = await DataService(DATA_DIR).load_catalog()
+        compact = encode_compact(*catalog.collections)
+        verbose = evaluation_agent._build_context(*catalog.collections)
+
+        rows = [line for line in compact.splitlines() if "|" in line and line[0].islower()]
+        assert len(rows) == sum(len(items) for items in catalog.collections)
+        assert "ds-002|HumanEval Python|code,python,benchmark|Standard benchmark" in compact
+        assert estimate_tokens(compact) < estimate_tokens(verbose)
+
+    def test_truncate_cuts_at_word_boundary(self):
+        """Test that truncated descriptions end on a whole word plus an ellipsis."""
+        assert truncate("short", 10) == "short"
+        assert truncate("Measures the accuracy of answers", 20) == "Measures the…"
+        assert truncate("anything", 0) == ""
+
+
+class TestTokenBudget:
+    """Tests for fitting the context into context_token_budget."""
+
+    @pytest.mark.asyncio
+    async def test_longest_descriptions_are_cut_first(self):
+        """Test that the budget is met by capping only descriptions above the cap."""
+        catalog = await DataService(DATA_DIR).load_catalog()
+        full_tokens = estimate_tokens(encode_compact(*catalog.collections))
+        budget = full_tokens - 100
+
+        context, tokens, cap = fit_to_budget(encode_compact, catalog.collections, budget)
+
+        assert tokens == estimate_tokens(context) <= budget
+        assert cap is not None and cap > 0
+        assert fit_to_budget(encode_compact, catalog.collections, budget) == (context, tokens, cap)
+        for items in catalog.collections[:3]:
+            for item in items:
+                if len(item.description) <= cap:
+                    assert item.description in context
+
+    @pytest.mark.asyncio
+    async def test_unreachable_budget_drops_descriptions_but_keeps_entries(self):
+        """Test the floor: no descriptions, every id still present."""
+        catalog = await DataService(DATA_DIR).load_catalog()
+
+        context, tokens, cap = fit_to_budget(encode_compact, catalog.collections, 10)
+
+        assert cap == 0 and tokens > 10
+        assert all(item.id in context for items in catalog.collections for item in items)
+
+
+class TestPromptStats:
+    """Tests for per-request prompt size recording."""
+
+    @pytest.mark.asyncio
+    async def test_extract_result_records_estimated_prompt_size(
+        self, evaluation_agent, monkeypatch
+    ):
+        """Test that each LLM request records its estimated size and truncation."""
+        monkeypatch.setattr(settings, "context_retrieval_enabled", False)
+        monkeypatch.setattr(settings, "context_encoding", "compact")
+        monkeypatch.setattr(settings, "context_token_budget", 700)
+        catalog = await DataService(DATA_DIR).load_catalog()
+        evaluation_agent.client = MagicMock()
+        evaluation_agent.client.create_chat_completion = AsyncMock(
+            return_value={"choices": [{"message": {"content": json.dumps(LLM_RESULT)}}]}
+        )
+
+        await evaluation_agent.extract_result("Test my RAG agent", catalog)
+
+        messages = evaluation_agent.client.create_chat_completion.call_args.kwargs["messages"]
+        expected = sum(estimate_tokens(m["content"]) for m in messages)
+        stats = evaluation_agent.prompt_stats()
+        assert stats["count"] == 1
+        assert stats["last_tokens"] == stats["max_tokens"] == expected
+        assert stats["truncated"] == 1
+        assert stats["encoding"] == "compact"
+        assert messages[0]["content"].startswith(evaluation_agent.SYSTEM_PROMPT)
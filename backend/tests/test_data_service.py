@@ -0,0 +1,283 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from app.models.agent import AgentModel
+from app.models.catalog import Catalog
+from app.models.jsonl_collection import JsonlCollection
+from app.models.metric import Metric
+from app.services.catalog_snapshot import compile_snapshot
+from app.services.catalog_watcher import CatalogWatcher
+from app.services.chat_service import ChatService
+from app.services.data_service import DataService
+from tests.fixtures import DATA_DIR
+
+
+class TestCatalogIndexes:
+    """Tests for the id and attribute indexes built with each catalog."""
+
+    @pytest.mark.asyncio
+    async def test_id_lookups(self):
+        """Test O(1) lookups by id, including unknown and malformed ids."""
+        catalog = await DataService(DATA_DIR).load_catalog()
+
+        assert catalog.get_dataset("ds-002").name == "HumanEval Python"
+        assert catalog.get_scenario("scn-004").id == "scn-004"
+        assert catalog.get_agent("missing") is None
+        assert catalog.get_dataset(["ds-001"]) is None
+
+    @pytest.mark.asyncio
+    async def test_get_metrics_keeps_catalog_order_and_dedupes(self):
+        """Test that metric lookups match the old linear-scan semantics."""
+        catalog = await DataService(DATA_DIR).load_catalog()
+        metrics = catalog.get_metrics(["met-010", "met-004", "nope", "met-004"])
+        assert [m.id for m in metrics] == ["met-004", "met-010"]
+
+    @pytest.mark.asyncio
+    async def test_secondary_indexes(self):
+        """Test tag, category, cost and type indexes."""
+        service = DataService(DATA_DIR)
+
+        assert {d.id for d in await service.find_datasets("CODE")} == {"ds-002", "ds-010"}
+        safety = await service.find_metrics(category="safety")
+        assert {m.category for m in safety} == {"Safety"}
+        cheap_safety = await service.find_metrics(category="Safety", cost="Low")
+        assert [m.id for m in cheap_safety] == ["met-017"]
+        assert all(m.cost == "High" for m in await service.find_metrics(cost="High"))
+        assert [a.id for a in await service.find_agents("rag")] == ["ag-001"]
+
+    def test_indexes_are_read_only(self):
+        """Test that the index mappings cannot be mutated."""
+        catalog = Catalog((), (), (), ())
+        with pytest.raises(TypeError):
+            catalog.datasets_by_id["x"] = None
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Fixture providing a writable copy of the bundled catalog."""
+    for path in DATA_DIR.glob("*.json"):
+        (tmp_path / path.name).write_bytes(path.read_bytes())
+    return tmp_path
+
+
+def _rewrite_metrics(data_dir, mutate):
+    path = data_dir / "metrics.json"
+    metrics = json.loads(path.read_text())
+    mutate(metrics)
+    path.write_text(json.dumps(metrics))
+    # Make the change visible to mtime polling even on coarse-grained filesystems.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestCatalogHotReload:
+    """Tests for atomic snapshot swaps driven by the catalog watcher."""
+
+    @pytest.mark.asyncio
+    async def test_change_swaps_new_snapshot_and_keeps_old_one_intact(self, data_dir):
+        """Test that a changed file produces a new generation while held snapshots stay valid."""
+        service = DataService(data_dir)
+        watcher = CatalogWatcher(service)
+        old = await service.load_catalog()
+        await watcher.check()
+
+        _rewrite_metrics(data_dir, lambda ms: ms[0].update(name="Exact Match v2"))
+        assert await watcher.check() is True
+
+        new = await service.load_catalog()
+        assert new.generation == old.generation + 1
+        assert new.version != old.version
+        assert new.get_metric("met-001").name == "Exact Match v2"
+        assert old.get_metric("met-001").name == "Exact Match"
+
+    @pytest.mark.asyncio
+    async def test_reload_prebuilds_derived_structures(self, data_dir):
+        """Test that the reload hook prepares the new snapshot before requests reach it."""
+        chat_service = ChatService()
+        chat_service.data_service = DataService(data_dir)
+        watcher = CatalogWatcher(chat_service.data_service, on_reload=chat_service.prepare_catalog)
+        await watcher.check()
+
+        _rewrite_metrics(data_dir, lambda ms: ms[0].update(name="Exact Match v2"))
+        assert await watcher.check() is True
+
+        new = await chat_service.data_service.load_catalog()
+        assert chat_service.local_recommender.ready_terms(new) is not None
+
+    @pytest.mark.asyncio
+    async def test_unchanged_files_do_not_reload(self, data_dir):
+        """Test that polling without changes keeps the same snapshot."""
+        service = DataService(data_dir)
+        watcher = CatalogWatcher(service)
+        await watcher.check()
+        first = await service.load_catalog()
+        assert await watcher.check() is False
+        assert await service.load_catalog() is first
+
+    @pytest.mark.asyncio
+    async def test_bad_file_keeps_old_snapshot_and_reports_error(self, data_dir):
+        """Test that an invalid catalog file never replaces the live snapshot."""
+        service = DataService(data_dir)
+        watcher = CatalogWatcher(service)
+        live = await service.load_catalog()
+        await watcher.check()
+
+        _rewrite_metrics(data_dir, lambda ms: ms[0].update(cost="Free"))
+        assert await watcher.check() is False
+
+        assert await service.load_catalog() is live
+        assert "metrics.json" in service.status()["last_reload_error"]
+        assert watcher.stats()["failures"] == 1
+
+
+class TestCatalogWarmUp:
+    """Tests for concurrent, once-only catalog loading."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_loads_parse_each_file_once(self):
+        """Test that racing first callers share one load."""
+        service = DataService(DATA_DIR)
+        with patch.object(service, "_load_collection", wraps=service._load_collection) as load:
+            catalogs = await asyncio.gather(*(service.load_catalog() for _ in range(10)))
+
+        assert all(c is catalogs[0] for c in catalogs)
+        assert sorted(call.args[0] for call in load.call_args_list) == [
+            "agents.json",
+            "datasets.json",
+            "metrics.json",
+            "scenarios.json",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_first_load_is_retried(self, data_dir):
+        """Test that a failed first load does not poison later calls."""
+        (data_dir / "agents.json").rename(data_dir / "agents.bak")
+        service = DataService(data_dir)
+        with pytest.raises(FileNotFoundError):
+            await service.load_catalog()
+
+        (data_dir / "agents.bak").rename(data_dir / "agents.json")
+        assert (await service.load_catalog()).get_agent("ag-001") is not None
+
+
+def _write_jsonl(data_dir, stem):
+    """Convert the bundled ``<stem>.json`` to JSONL next to it and return the entries."""
+    entries = json.loads((DATA_DIR / f"{stem}.json").read_text())
+    lines = [json.dumps(entry) for entry in entries]
+    (data_dir / f"{stem}.jsonl").write_text("\n".join(lines[:1] + [""] + lines[1:]) + "\n")
+    return entries
+
+
+class TestJsonlCatalog:
+    """Tests for memory-mapped JSONL collections."""
+
+    @pytest.mark.asyncio
+    async def test_jsonl_source_matches_json_source(self, data_dir):
+        """Test that a JSONL file takes precedence and answers lookups like the JSON one."""
+        entries = _write_jsonl(data_dir, "datasets")
+        expected = await DataService(DATA_DIR).load_catalog()
+        service = DataService(data_dir)
+        catalog = await service.load_catalog()
+
+        assert isinstance(catalog.datasets, JsonlCollection)
+        assert data_dir / "datasets.jsonl" in service.source_files()
+        assert len(catalog.datasets) == len(entries)
+        assert list(catalog.datasets) == list(expected.datasets)
+        assert catalog.datasets[-1] == expected.datasets[-1]
+        assert catalog.get_dataset("ds-002") == expected.get_dataset("ds-002")
+        assert catalog.get_dataset("missing") is None
+        assert list(catalog.find_datasets("CODE")) == list(expected.find_datasets("code"))
+        assert catalog.version != expected.version
+
+    def test_entries_are_materialized_on_demand(self, data_dir):
+        """Test that only recently accessed entries are held as models."""
+        _write_jsonl(data_dir, "metrics")
+        metrics = JsonlCollection(data_dir / "metrics.jsonl", Metric, ["category"], cache_size=2)
+
+        assert metrics.stats()["cached_models"] == 0
+        first = metrics[0]
+        assert metrics[0] is first
+        metrics[1], metrics[2]
+        assert metrics.stats()["cached_models"] == 2
+        assert metrics[0] is not first and metrics[0] == first
+
+    def test_concurrent_reads_keep_the_cache_bounded(self, data_dir):
+        """Test that entries read from many threads at once stay correct and within the cap."""
+        entries = _write_jsonl(data_dir, "metrics")
+        metrics = JsonlCollection(data_dir / "metrics.jsonl", Metric, cache_size=3)
+
+        def read(i: int) -> str:
+            return metrics[i % len(entries)].id
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            ids = list(pool.map(read, range(4000)))
+
+        assert ids == [entries[i % len(entries)]["id"] for i in range(4000)]
+        assert metrics.stats()["cached_models"] <= 3
+
+    def test_invalid_line_is_rejected_at_load(self, data_dir):
+        """Test that a bad entry fails the load rather than a later lookup."""
+        path = data_dir / "agents.jsonl"
+        valid = '{"id": "ag-001", "name": "A", "type": "rag", "description": "d"}\n'
+        path.write_text(valid + '{"id": "ag-002"}\n')
+
+        with pytest.raises(ValueError, match=f"validation error.* at byte {len(valid)}"):
+            JsonlCollection(path, AgentModel)
+
+
+class TestCatalogSnapshot:
+    """Tests for compiled binary catalog snapshots."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_snapshot_skips_source_parsing(self, data_dir):
+        """Test that a compiled snapshot loads the same catalog without reading the JSON."""
+        header = await compile_snapshot(data_dir)
+        expected = await DataService(data_dir, use_snapshot=False).load_catalog()
+        service = DataService(data_dir, use_snapshot=True)
+
+        with patch.object(service, "_load_collection") as load:
+            catalog = await service.load_catalog()
+
+        load.assert_not_called()
+        assert service.status()["source"] == "snapshot"
+        assert header["version"] == catalog.version == expected.version
+        assert catalog.generation == 1
+        assert catalog.collections == expected.collections
+        assert catalog.get_metric("met-004") == expected.get_metric("met-004")
+        assert list(catalog.find_datasets("code")) == list(expected.find_datasets("code"))
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_falls_back_to_sources(self, data_dir):
+        """Test that sources changed after compilation win over the snapshot."""
+        await compile_snapshot(data_dir)
+        _rewrite_metrics(data_dir, lambda metrics: metrics.pop())
+        service = DataService(data_dir, use_snapshot=True)
+
+        catalog = await service.load_catalog()
+
+        assert service.status()["source"] == "sources"
+        assert len(catalog.metrics) == len(json.loads((DATA_DIR / "metrics.json").read_text())) - 1
+
+    @pytest.mark.asyncio
+    async def test_corrupt_snapshot_falls_back_to_sources(self, data_dir):
+        """Test that a snapshot failing its payload hash is ignored."""
+        await compile_snapshot(data_dir)
+        snapshot = data_dir / "catalog.snapshot"
+        snapshot.write_bytes(snapshot.read_bytes()[:-10])
+        service = DataService(data_dir, use_snapshot=True)
+
+        await service.load_catalog()
+
+        assert service.status()["source"] == "sources"
+
+    @pytest.mark.asyncio
+    async def test_jsonl_sources_cannot_be_snapshotted(self, data_dir):
+        """Test that compiling refuses memory-mapped collections."""
+        _write_jsonl(data_dir, "datasets")
+        with pytest.raises(ValueError, match="datasets.jsonl"):
+            await compile_snapshot(data_dir)
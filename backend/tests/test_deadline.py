@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.main import app
+from app.services.chat_service import get_chat_service
+from tests.fixtures import chat_service, LLM_RESULT
+
+
+def _slow_llm(chat_service, seconds: float) -> None:
+    async def extract_result(*args, **kwargs):
+        await asyncio.sleep(seconds)
+        return dict(LLM_RESULT)
+
+    chat_service.agent.extract_result = extract_result
+
+
+class TestDeadlineFallback:
+    """Tests for answering from the local recommender when the LLM misses the deadline."""
+
+    @pytest.mark.asyncio
+    async def test_late_llm_returns_degraded_local_recommendation(self, chat_service):
+        """Test that a missed deadline yields the local recommendation, marked degraded."""
+        _slow_llm(chat_service, 0.5)
+        message = "Evaluate python coding ability"
+        expected = chat_service.local_recommender.recommend(
+            chat_service.classifier.classify(message).intent,
+            message,
+            await chat_service.data_service.load_catalog(),
+        )
+
+        response = await chat_service.process_message(message, deadline_ms=50)
+
+        assert response.degraded
+        assert response.recommendation.scenario.id == expected["scenario_id"]
+        assert [m.id for m in response.recommendation.metrics] == expected["metric_ids"]
+        assert chat_service.stats()["paths"]["fallback"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_late_llm_result_fills_the_cache(self, chat_service):
+        """Test that the LLM call outlives the deadline and its result is cached."""
+        _slow_llm(chat_service, 0.1)
+        first = await chat_service.process_message("Test my RAG agent", deadline_ms=20)
+        assert first.degraded
+
+        await asyncio.sleep(0.2)
+        second = await chat_service.process_message("Test my RAG agent", deadline_ms=20)
+        assert not second.degraded
+        assert second.recommendation.scenario.id == LLM_RESULT["scenario_id"]
+        assert chat_service.stats()["paths"]["cache"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_llm_within_deadline_is_not_degraded(self, chat_service):
+        """Test that an LLM answer arriving in time is used as usual."""
+        response = await chat_service.process_message("Test my RAG agent", deadline_ms=1000)
+
+        assert not response.degraded
+        assert response.recommendation.dataset.id == LLM_RESULT["dataset_id"]
+        assert chat_service.stats()["paths"]["llm"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fallback_only_built_when_needed(self, chat_service):
+        """Test that the local recommendation is skipped when the LLM answers in time."""
+        recommend = chat_service.local_recommender.recommend
+        calls = []
+        chat_service.local_recommender.recommend = lambda *a: calls.append(a) or recommend(*a)
+
+        await chat_service.process_message("Test my RAG agent", deadline_ms=1000)
+        assert calls == []
+
+        _slow_llm(chat_service, 0.5)
+        assert (await chat_service.process_message("Other message", deadline_ms=50)).degraded
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_fallback_starts_early(self, chat_service):
+        """Test that a known fallback cost is taken out of the budget, not added to it."""
+        _slow_llm(chat_service, 0.5)
+        recommend = chat_service.local_recommender.recommend
+
+        def slow_recommend(*args):
+            time.sleep(0.1)
+            return recommend(*args)
+
+        chat_service.local_recommender.recommend = slow_recommend
+        chat_service._fallback_seconds = 0.1
+        started = time.perf_counter()
+        response = await chat_service.process_message("Test my RAG agent", deadline_ms=150)
+
+        assert response.degraded
+        assert time.perf_counter() - started < 0.2
+
+    @pytest.mark.asyncio
+    async def test_server_default_deadline(self, chat_service, monkeypatch):
+        """Test that settings.chat_deadline_ms applies when the request sets none."""
+        monkeypatch.setattr(settings, "chat_deadline_ms", 20)
+        _slow_llm(chat_service, 0.2)
+        assert (await chat_service.process_message("Test my RAG agent")).degraded
+
+    @pytest.mark.asyncio
+    async def test_chat_endpoint_accepts_deadline(self, chat_service):
+        """Test that deadline_ms in the request body reaches the service."""
+        _slow_llm(chat_service, 0.5)
+        app.dependency_overrides[get_chat_service] = lambda: chat_service
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/api/chat", json={"message": "Test my RAG agent", "deadline_ms": 50}
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["degraded"] is True
+        assert response.json()["recommendation"] is not None
+
+    @pytest.mark.asyncio
+    async def test_zero_deadline_waits_for_llm(self, chat_service, monkeypatch):
+        """Test that deadline_ms=0 in the request overrides the server default deadline."""
+        monkeypatch.setattr(settings, "chat_deadline_ms", 20)
+        _slow_llm(chat_service, 0.1)
+        app.dependency_overrides[get_chat_service] = lambda: chat_service
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/api/chat", json={"message": "Test my RAG agent", "deadline_ms": 0}
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["degraded"] is False
+        assert response.json()["recommendation"]["scenario"]["id"] == LLM_RESULT["scenario_id"]
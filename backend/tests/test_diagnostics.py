@@ -0,0 +1,132 @@
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import profiling
+from app.api.debug import router as debug_router
+from app.main import app
+from app.middleware import ProfilingMiddleware, server_timing
+from app.profiling import PROFILES, ProfileStore
+from app.services.chat_service import get_chat_service
+from tests.fixtures import chat_service
+
+
+def _busy_wait(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _profiled_app(sample_rate: float = 0.0) -> FastAPI:
+    profiled = FastAPI()
+    profiled.add_middleware(
+        ProfilingMiddleware, store=PROFILES, sample_rate=sample_rate, interval_seconds=0.001
+    )
+    profiled.include_router(debug_router, prefix="/debug")
+
+    @profiled.get("/work")
+    async def work():
+        _busy_wait(0.05)
+        return {"ok": True}
+
+    return profiled
+
+
+async def _get(target: FastAPI, url: str, **kwargs) -> httpx.Response:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=target), base_url="http://test"
+    ) as client:
+        return await client.get(url, **kwargs)
+
+
+class TestServerTiming:
+    """Tests for the Server-Timing header on /api/chat."""
+
+    def test_header_format(self):
+        """Test millisecond durations with ``total`` last."""
+        assert server_timing({"llm": 0.5, "parse": 0.00025}, 0.6) == (
+            "llm;dur=500.000, parse;dur=0.250, total;dur=600.000"
+        )
+
+    @pytest.mark.asyncio
+    async def test_chat_response_has_stage_breakdown(self, chat_service):
+        """Test that chat and agent stages of this request are reported."""
+        app.dependency_overrides[get_chat_service] = lambda: chat_service
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post("/api/chat", json={"message": "Test my RAG agent"})
+                health = await client.get("/health")
+        finally:
+            app.dependency_overrides.clear()
+
+        names = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+        for stage in ("load_catalog", "cache_lookup", "llm", "build_recommendation"):
+            assert stage in names
+        assert names[-1] == "total"
+        assert "server-timing" not in health.headers
+
+
+class TestProfiling:
+    """Tests for the opt-in request profiler and its debug endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_debug_header_captures_call_tree(self):
+        """Test that a requested profile is stored and retrievable by id."""
+        profiled = _profiled_app()
+        response = await _get(profiled, "/work", headers={"X-Debug-Profile": "1"})
+        profile_id = response.headers["x-profile-id"]
+
+        listed = (await _get(profiled, "/debug/profiles")).json()
+        assert listed[0]["id"] == profile_id
+        assert "tree" not in listed[0]
+
+        profile = (await _get(profiled, f"/debug/profiles/{profile_id}")).json()
+        assert profile["path"] == "/work"
+        assert profile["samples"] > 0
+
+        def names(node):
+            yield node["name"]
+            for child in node["children"]:
+                yield from names(child)
+
+        assert any(name.startswith("_busy_wait") for name in names(profile["tree"]))
+
+    @pytest.mark.asyncio
+    async def test_unrequested_requests_not_profiled(self):
+        """Test that without the header or sampling nothing is captured."""
+        response = await _get(_profiled_app(sample_rate=0.0), "/work")
+        assert "x-profile-id" not in response.headers
+        assert (await _get(_profiled_app(), "/debug/profiles/missing")).status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_sampler_failure_is_recorded(self, monkeypatch):
+        """Test that an error in the sampler thread is stored on the profile."""
+
+        def broken(code):
+            raise RuntimeError("no frame name")
+
+        monkeypatch.setattr(profiling, "_frame_name", broken)
+        profiled = _profiled_app()
+        response = await _get(profiled, "/work", headers={"X-Debug-Profile": "1"})
+        profile_id = response.headers["x-profile-id"]
+
+        profile = (await _get(profiled, f"/debug/profiles/{profile_id}")).json()
+        assert profile["error"] == "RuntimeError: no frame name"
+
+    def test_frame_name_without_qualname(self):
+        """Test the fallback to co_name for code objects without co_qualname (Python 3.10)."""
+        code = SimpleNamespace(co_name="run", co_filename="/app/x.py", co_firstlineno=3)
+        assert profiling._frame_name(code) == "run (x.py:3)"
+
+    def test_store_keeps_most_recent(self):
+        """Test that the oldest profiles are dropped beyond capacity."""
+        store = ProfileStore(max_profiles=2)
+        for i in range(3):
+            store.add({"id": str(i), "tree": {}})
+        assert [p["id"] for p in store.summaries()] == ["2", "1"]
+        assert store.get("0") is None
@@ -0,0 +1,111 @@
+import pytest
+
+from app.agents import local_recommender
+from app.agents.intent_classifier import IntentPrediction, LexiconIntentClassifier
+from app.agents.local_recommender import LocalRecommender
+from app.agents.text import tokenize
+from app.config import settings
+from app.services.data_service import DataService
+from tests.fixtures import chat_service, DATA_DIR
+
+
+class TestLexiconIntentClassifier:
+    """Tests for the local weighted-lexicon classifier."""
+
+    @pytest.mark.parametrize(
+        "message,intent",
+        [
+            ("Test my RAG agent for safety and hallucinations", "rag_safety"),
+            ("Check my RAG pipeline accuracy and faithfulness", "rag_accuracy"),
+            ("Evaluate python coding ability", "code_eval"),
+            ("Test the conversational tone of my chatbot", "general_chat"),
+            ("Red-team my model for jailbreaks and toxic output", "safety"),
+        ],
+    )
+    def test_obvious_requests_are_confident(self, message, intent):
+        """Test that keyword-rich requests classify with high confidence."""
+        prediction = LexiconIntentClassifier().classify(message)
+        assert prediction.intent == intent
+        assert prediction.confidence >= 0.8
+
+    def test_no_evidence_has_zero_confidence(self):
+        """Test that messages without known keywords never take the fast path."""
+        assert LexiconIntentClassifier().classify("Make it cheaper").confidence == 0.0
+
+    def test_conflicting_topics_lower_confidence(self):
+        """Test that evidence for competing intents reduces confidence."""
+        prediction = LexiconIntentClassifier().classify("safety of my python code")
+        assert prediction.confidence < 0.8
+
+
+class TestLocalRecommender:
+    """Tests for catalog-only recommendations."""
+
+    @pytest.mark.asyncio
+    async def test_uses_scenario_recommended_metrics(self):
+        """Test that the chosen scenario's recommended metrics are included."""
+        catalog = await DataService(DATA_DIR).load_catalog()
+        result = LocalRecommender().recommend(
+            "code_eval", "evaluate python coding ability", catalog
+        )
+        scenario = next(s for s in catalog.scenarios if s.id == result["scenario_id"])
+
+        assert result["scenario_id"] == "scn-003"
+        assert result["dataset_id"] == "ds-002"
+        assert result["agent_id"] == "ag-002"
+        assert result["metric_ids"][: len(scenario.recommended_metrics)] == (
+            scenario.recommended_metrics
+        )
+
+    @pytest.mark.asyncio
+    async def test_catalog_tokenized_once_per_version(self, monkeypatch):
+        """Test that catalog entries are tokenized once, then only the message is."""
+        catalog = await DataService(DATA_DIR).load_catalog()
+        recommender = LocalRecommender()
+        first = recommender.recommend("rag_safety", "Test my RAG agent for safety", catalog)
+
+        calls = []
+        monkeypatch.setattr(
+            local_recommender, "tokenize", lambda text: calls.append(text) or tokenize(text)
+        )
+        second = recommender.recommend("rag_safety", "Test my RAG agent for safety", catalog)
+
+        assert second == first
+        assert calls == ["Test my RAG agent for safety"]
+
+
+class TestChatServiceFastPath:
+    """Tests for the fast path in ChatService.process_message."""
+
+    @pytest.mark.asyncio
+    async def test_confident_request_skips_llm(self, chat_service, monkeypatch):
+        """Test that a high-confidence request is answered without the LLM."""
+        monkeypatch.setattr(settings, "fast_path_enabled", True)
+        await chat_service.prepare_catalog()
+        response = await chat_service.process_message("Evaluate python coding ability")
+
+        chat_service.agent.extract_result.assert_not_awaited()
+        assert response.recommendation.scenario.id == "scn-003"
+        assert chat_service.stats()["paths"]["fast_path"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_low_confidence_request_uses_llm(self, chat_service, monkeypatch):
+        """Test that requests below the threshold still go to the LLM."""
+        monkeypatch.setattr(settings, "fast_path_enabled", True)
+        chat_service.classifier.classify = lambda m: IntentPrediction("safety", 0.5)
+        await chat_service.process_message("something vague")
+
+        chat_service.agent.extract_result.assert_awaited_once()
+        assert chat_service.stats()["paths"]["llm"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fast_path_waits_for_catalog_terms(self, chat_service, monkeypatch):
+        """Test that the fast path is skipped, not blocked, until the token sets are built."""
+        monkeypatch.setattr(settings, "fast_path_enabled", True)
+        await chat_service.process_message("Evaluate python coding ability")
+        chat_service.agent.extract_result.assert_awaited_once()
+
+        await chat_service._terms_build[1]
+        await chat_service.process_message("Evaluate coding ability in python")
+        chat_service.agent.extract_result.assert_awaited_once()
+        assert chat_service.stats()["paths"]["fast_path"]["count"] == 1
@@ -0,0 +1,181 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from app.agents.hedging import HedgedCaller, LatencyWindow
+from app.agents.llm_client import LLMClient, LLMError
+from app.metrics import LLM_ERRORS, LLM_HEDGES_FIRED, LLM_HEDGES_WON, LLM_RETRIES
+
+
+def _completion(content: str) -> dict:
+    return {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+
+
+def _stub_client(script):
+    """LLMClient against an in-process stub; ``script`` gives (delay, status) per request."""
+    calls = {"started": 0, "finished": 0}
+    steps = iter(script)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        index = calls["started"]
+        calls["started"] += 1
+        delay, status = next(steps)
+        await asyncio.sleep(delay)
+        calls["finished"] += 1
+        if status != 200:
+            return httpx.Response(status, json={"error": {"message": "stub"}})
+        return httpx.Response(200, json=_completion(f"call {index}"))
+
+    client = LLMClient(base_url="http://stub", api_key="k", transport=httpx.MockTransport(handler))
+    return client, calls
+
+
+def _caller(**options) -> HedgedCaller:
+    defaults = dict(
+        hedge_enabled=True,
+        hedge_initial_delay_ms=50,
+        hedge_min_samples=1000,
+        max_retries=2,
+        retry_base_ms=1,
+        retry_max_ms=5,
+        deadline_seconds=5,
+        rng=random.Random(0),
+    )
+    return HedgedCaller(**{**defaults, **options})
+
+
+async def _complete(caller: HedgedCaller, client: LLMClient) -> str:
+    response = await caller.call(
+        lambda: client.create_chat_completion([], model="m", temperature=0, max_tokens=1)
+    )
+    return response["choices"][0]["message"]["content"]
+
+
+class TestLatencyWindow:
+    """Tests for the sliding latency window behind the hedge delay."""
+
+    def test_percentile_over_recent_samples(self):
+        """Test nearest-rank percentiles and eviction of old samples."""
+        window = LatencyWindow(size=100)
+        assert window.percentile(95) is None
+        for ms in range(1, 201):
+            window.record(ms / 1000)
+        assert len(window) == 100
+        assert window.percentile(50) == 0.15
+        assert window.percentile(95) == 0.195
+
+    def test_hedge_delay_follows_percentile_after_warmup(self):
+        """Test the initial delay, the percentile and the lower bound."""
+        caller = _caller(hedge_min_samples=3, hedge_min_delay_ms=20, hedge_percentile=50)
+        assert caller.hedge_delay() == 0.05
+        for seconds in (0.01, 0.2, 0.3):
+            caller.latencies.record(seconds)
+        assert caller.hedge_delay() == 0.2
+        assert _caller(hedge_enabled=False).hedge_delay() is None
+
+
+class TestHedgedCaller:
+    """Tests for hedging, retries and the deadline against a stub with injected latency."""
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_hedged_and_duplicate_wins(self):
+        """Test that a duplicate is started after the delay and the slow call cancelled."""
+        client, calls = _stub_client([(1.0, 200), (0.0, 200)])
+        caller = _caller()
+        fired, won = LLM_HEDGES_FIRED.labels().value, LLM_HEDGES_WON.labels().value
+
+        started = asyncio.get_running_loop().time()
+        assert await _complete(caller, client) == "call 1"
+        assert asyncio.get_running_loop().time() - started < 0.5
+        await asyncio.sleep(0)
+
+        assert calls == {"started": 2, "finished": 1}
+        assert caller.stats()["hedges_fired"] == 1 and caller.stats()["hedges_won"] == 1
+        assert LLM_HEDGES_FIRED.labels().value == fired + 1
+        assert LLM_HEDGES_WON.labels().value == won + 1
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_fast_call_is_not_hedged(self):
+        """Test that calls finishing within the delay never start a duplicate."""
+        client, calls = _stub_client([(0.0, 200)])
+        caller = _caller()
+        assert await _complete(caller, client) == "call 0"
+        assert calls["started"] == 1
+        assert caller.stats()["hedges_fired"] == 0
+        assert caller.stats()["latency_samples"] == 1
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_primary_still_wins_if_hedge_fails(self):
+        """Test that a failed duplicate does not fail the attempt while the primary runs."""
+        client, calls = _stub_client([(0.1, 200), (0.0, 400)])
+        caller = _caller()
+        assert await _complete(caller, client) == "call 0"
+        assert caller.stats()["hedges_won"] == 0
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_failed_hedge_does_not_mask_transient_primary_error(self):
+        """Test that the primary's transient error decides the retry when both calls fail."""
+        client, calls = _stub_client([(0.1, 503), (0.0, 400), (0.0, 200)])
+        caller = _caller()
+        assert await _complete(caller, client) == "call 2"
+        assert caller.stats()["retries"] == 1
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_retried_with_backoff(self):
+        """Test that 503s are retried until a call succeeds."""
+        client, calls = _stub_client([(0.0, 503), (0.0, 503), (0.0, 200)])
+        caller = _caller(hedge_enabled=False)
+        before = LLM_RETRIES.labels().value
+
+        assert await _complete(caller, client) == "call 2"
+        assert caller.stats()["retries"] == 2
+        assert LLM_RETRIES.labels().value == before + 2
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_retries_are_bounded(self):
+        """Test that the last transient error surfaces once retries run out."""
+        client, calls = _stub_client([(0.0, 503)] * 3)
+        with pytest.raises(LLMError, match="HTTP 503"):
+            await _complete(_caller(hedge_enabled=False), client)
+        assert calls["started"] == 3
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_permanent_errors_not_retried(self):
+        """Test that a 400 fails immediately."""
+        client, calls = _stub_client([(0.0, 400)])
+        with pytest.raises(LLMError) as error:
+            await _complete(_caller(hedge_enabled=False), client)
+        assert not error.value.transient
+        assert calls["started"] == 1
+        await client.aclose()
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test full-jitter delays below the doubling, capped bound."""
+        caller = _caller(retry_base_ms=100, retry_max_ms=300)
+        delays = [caller.backoff(retry) for retry in (0, 1, 5) for _ in range(200)]
+        assert all(0 <= d <= 0.1 for d in delays[:200])
+        assert all(0 <= d <= 0.2 for d in delays[200:400])
+        assert all(0 <= d <= 0.3 for d in delays[400:])
+        assert len(set(delays)) == len(delays)
+
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_the_whole_call(self):
+        """Test that hedges and retries stop at the deadline."""
+        client, calls = _stub_client([(1.0, 200), (1.0, 200)])
+        caller = _caller(deadline_seconds=0.2)
+        before = LLM_ERRORS.labels("deadline").value
+
+        with pytest.raises(LLMError, match="0.2s deadline"):
+            await _complete(caller, client)
+        assert calls["finished"] == 0
+        assert caller.stats()["deadline_exceeded"] == 1
+        assert LLM_ERRORS.labels("deadline").value == before + 1
+        await client.aclose()
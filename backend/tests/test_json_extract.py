@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.agents.json_extract import extract_json_object
+from app.metrics import LLM_ERRORS, LLM_JSON_REPAIRS
+from tests.fixtures import LLM_RESULT, evaluation_agent
+
+CORPUS = json.loads((Path(__file__).parent / "data" / "llm_outputs.json").read_text())
+
+
+def _completion(content: str) -> dict:
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+class TestExtractJSONObject:
+    """Tests for finding and repairing the JSON object in an LLM completion."""
+
+    @pytest.mark.parametrize("case", CORPUS, ids=[case["name"] for case in CORPUS])
+    def test_corpus(self, case):
+        """Test every recorded completion shape against its expected object and repairs."""
+        if case["value"] is None:
+            with pytest.raises(ValueError):
+                extract_json_object(case["content"])
+            return
+        extraction = extract_json_object(case["content"])
+        assert extraction.value == case["value"]
+        assert list(extraction.repairs) == case["repairs"]
+
+    def test_reports_span_of_the_object(self):
+        """Test that start and end delimit the object within the text."""
+        text = 'Answer: {"a": [1, {"b": "}"}]} trailing'
+        extraction = extract_json_object(text)
+        assert text[extraction.start : extraction.end] == '{"a": [1, {"b": "}"}]}'
+
+    def test_repairs_are_listed_once_in_order_of_use(self):
+        """Test that a repair needed several times is reported once."""
+        extraction = extract_json_object("{'a': [1, 2,], 'b': {'c': True,},}")
+        assert extraction.value == {"a": [1, 2], "b": {"c": True}}
+        assert extraction.repairs == ("single_quotes", "trailing_comma", "python_literals")
+
+    def test_truncated_nested_containers_are_closed(self):
+        """Test closing every container left open at the end of the text."""
+        extraction = extract_json_object('{"a": {"b": [{"c": "d')
+        assert extraction.value == {"a": {"b": [{"c": "d"}]}}
+        assert extraction.repairs == ("truncated",)
+
+    def test_no_object(self):
+        """Test that text without any object is rejected."""
+        with pytest.raises(ValueError, match="no JSON object"):
+            extract_json_object("no braces here")
+
+
+class TestParseCompletion:
+    """Tests for the agent's use of the extractor on chat-completions bodies."""
+
+    def test_repaired_output_counted(self, evaluation_agent):
+        """Test that a malformed but recoverable completion parses and counts its repairs."""
+        content = "Here you go:\n```json\n" + json.dumps(LLM_RESULT)[:-1] + ",}\n```"
+        before = LLM_JSON_REPAIRS.labels("trailing_comma").value
+
+        assert evaluation_agent._parse_completion(_completion(content)) == LLM_RESULT
+        assert LLM_JSON_REPAIRS.labels("trailing_comma").value == before + 1
+
+    def test_unrecoverable_output_rejected(self, evaluation_agent):
+        """Test that output without a usable object still fails as invalid JSON."""
+        before = LLM_ERRORS.labels("invalid_json").value
+
+        with pytest.raises(ValueError, match="Invalid JSON response from LLM"):
+            evaluation_agent._parse_completion(_completion("I can't help with that."))
+        assert LLM_ERRORS.labels("invalid_json").value == before + 1
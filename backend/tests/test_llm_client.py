@@ -0,0 +1,125 @@
+import json
+
+import httpx
+import pytest
+
+from app.agents.evaluation_agent import EvaluationAgent
+from app.agents.llm_client import LLMClient, LLMError
+from tests.fixtures import mock_datasets, mock_metrics, mock_scenarios, mock_agents
+
+
+def _completion(content: str) -> dict:
+    return {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+
+
+class TestLLMClient:
+    """Tests for the native async LLM client."""
+
+    @pytest.mark.asyncio
+    async def test_posts_chat_completion_with_bearer_token(self):
+        """Test the request body, path and auth header sent upstream."""
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["path"] = request.url.path
+            seen["auth"] = request.headers["authorization"]
+            seen["body"] = json.loads(request.content)
+            return httpx.Response(200, json=_completion("hi"))
+
+        client = LLMClient(
+            base_url="http://stub/v4", api_key="k", transport=httpx.MockTransport(handler)
+        )
+        result = await client.create_chat_completion(
+            messages=[{"role": "user", "content": "x"}],
+            model="m",
+            temperature=0.1,
+            max_tokens=5,
+        )
+        await client.aclose()
+
+        assert result["choices"][0]["message"]["content"] == "hi"
+        assert seen["path"] == "/v4/chat/completions"
+        assert seen["auth"] == "Bearer k"
+        assert seen["body"]["model"] == "m"
+        assert seen["body"]["max_tokens"] == 5
+
+    @pytest.mark.asyncio
+    async def test_reuses_single_pooled_http_client(self):
+        """Test that every call goes through the same shared HTTP client."""
+        client = LLMClient(
+            base_url="http://stub",
+            api_key="k",
+            transport=httpx.MockTransport(lambda r: httpx.Response(200, json=_completion("x"))),
+        )
+        first = client.http_client
+        for _ in range(3):
+            await client.create_chat_completion([], model="m", temperature=0, max_tokens=1)
+        assert client.http_client is first
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_http_error_raises_llm_error(self):
+        """Test that non-2xx responses surface as LLMError."""
+        client = LLMClient(
+            base_url="http://stub",
+            api_key="k",
+            transport=httpx.MockTransport(lambda r: httpx.Response(429, text="slow down")),
+        )
+        with pytest.raises(LLMError, match="429"):
+            await client.create_chat_completion([], model="m", temperature=0, max_tokens=1)
+        await client.aclose()
+
+
+class TestEvaluationAgentWithLLMClient:
+    """Tests for the agent's executor-free request path."""
+
+    @pytest.mark.asyncio
+    async def test_process_request_parses_fenced_json(
+        self, mock_datasets, mock_metrics, mock_scenarios, mock_agents
+    ):
+        """Test that a fenced JSON completion is parsed into a recommendation."""
+        content = (
+            "```json\n"
+            + json.dumps(
+                {
+                    "intent": "rag_accuracy",
+                    "dataset_id": "ds-001",
+                    "metric_ids": ["m-001"],
+                    "scenario_id": "s-001",
+                    "agent_id": "a-001",
+                    "reason": "Because",
+                }
+            )
+            + "\n```"
+        )
+        agent = EvaluationAgent()
+        agent.client = LLMClient(
+            base_url="http://stub",
+            api_key="k",
+            transport=httpx.MockTransport(lambda r: httpx.Response(200, json=_completion(content))),
+        )
+
+        text, recommendation = await agent.process_request(
+            "check accuracy", mock_datasets, mock_metrics, mock_scenarios, mock_agents
+        )
+        await agent.aclose()
+
+        assert "Because" in text
+        assert recommendation.dataset.id == "ds-001"
+
+    @pytest.mark.asyncio
+    async def test_process_request_wraps_llm_error(
+        self, mock_datasets, mock_metrics, mock_scenarios, mock_agents
+    ):
+        """Test that upstream failures are reported as ValueError."""
+        agent = EvaluationAgent()
+        agent.client = LLMClient(
+            base_url="http://stub",
+            api_key="k",
+            transport=httpx.MockTransport(lambda r: httpx.Response(500, text="boom")),
+        )
+        with pytest.raises(ValueError, match="LLM API call failed"):
+            await agent.process_request(
+                "x", mock_datasets, mock_metrics, mock_scenarios, mock_agents
+            )
+        await agent.aclose()
@@ -0,0 +1,101 @@
+import httpx
+import pytest
+
+from app.agents.llm_client import LLMClient, LLMError
+from app.main import app
+from app.metrics import LLM_ERRORS, LLM_INFLIGHT, Counter, Histogram, Registry, _Metric
+from app.services.chat_service import get_chat_service
+from tests.fixtures import chat_service
+
+
+class TestMetricPrimitives:
+    """Tests for the Prometheus text rendering of the in-process metrics."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test ``le`` buckets, sum and count, with bounds inclusive."""
+        registry = Registry()
+        histogram = registry.register(Histogram("h_seconds", "Help.", ["stage"], buckets=[0.1, 1]))
+        child = histogram.labels("llm")
+        for value in (0.05, 0.1, 0.5, 3):
+            child.observe(value)
+
+        text = registry.render()
+        assert "# TYPE h_seconds histogram" in text
+        assert 'h_seconds_bucket{stage="llm",le="0.1"} 2' in text
+        assert 'h_seconds_bucket{stage="llm",le="1"} 3' in text
+        assert 'h_seconds_bucket{stage="llm",le="+Inf"} 4' in text
+        assert 'h_seconds_sum{stage="llm"} 3.65' in text
+        assert 'h_seconds_count{stage="llm"} 4' in text
+
+    def test_counter_labels_escaped(self):
+        """Test label value escaping and that unlabelled metrics start at zero."""
+        registry = Registry()
+        labelled = registry.register(Counter("c_total", "Help.", ["type"]))
+        registry.register(Counter("plain_total", "Help."))
+        labelled.labels('say "hi"\n').inc(2)
+
+        text = registry.render()
+        assert 'c_total{type="say \\"hi\\"\\n"} 2' in text
+        assert "plain_total 0" in text
+
+    def test_duplicate_names_rejected(self):
+        """Test that a metric name can only be registered once."""
+        registry = Registry()
+        registry.register(Counter("c_total", "Help."))
+        with pytest.raises(ValueError):
+            registry.register(Counter("c_total", "Help."))
+
+    def test_incomplete_metric_type_fails_on_creation(self):
+        """Test that a metric type without sample rendering cannot be instantiated."""
+
+        class NoSamples(_Metric):
+            def _new_child(self, values):
+                return object()
+
+        with pytest.raises(TypeError, match="_samples"):
+            NoSamples("broken", "Help.")
+
+
+class TestInstrumentation:
+    """Tests for the metrics recorded by the chat pipeline and LLM client."""
+
+    @pytest.mark.asyncio
+    async def test_llm_errors_counted_by_type(self):
+        """Test that an upstream 503 is counted and the in-flight gauge returns to zero."""
+        before = LLM_ERRORS.labels("http_503").value
+        client = LLMClient(
+            base_url="http://stub",
+            api_key="k",
+            transport=httpx.MockTransport(lambda request: httpx.Response(503, text="busy")),
+        )
+        with pytest.raises(LLMError):
+            await client.create_chat_completion(
+                messages=[{"role": "user", "content": "x"}], model="m", temperature=0, max_tokens=5
+            )
+        await client.aclose()
+
+        assert LLM_ERRORS.labels("http_503").value == before + 1
+        assert LLM_INFLIGHT.labels().value == 0
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint_exposes_stages(self, chat_service):
+        """Test that a chat request shows up in the scraped stage histograms."""
+        app.dependency_overrides[get_chat_service] = lambda: chat_service
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                await client.post("/api/chat", json={"message": "Test my RAG agent"})
+                response = await client.get("/metrics")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        for stage in ("load_catalog", "cache_lookup", "llm", "build_response", "encode"):
+            assert f'aeval_chat_stage_seconds_count{{stage="{stage}"}}' in text
+        assert 'aeval_agent_stage_seconds_count{stage="build_recommendation"}' in text
+        assert 'aeval_chat_request_seconds_count{path="llm"}' in text
+        assert "aeval_chat_inflight_requests 0" in text
+        assert "aeval_executor_queue_depth 0" in text
@@ -0,0 +1,115 @@
+import pytest
+
+from app.agents.refinement import RefinementEngine
+from app.config import settings
+from app.services.data_service import DataService
+from tests.fixtures import DATA_DIR, LLM_RESULT, chat_service
+
+
+@pytest.fixture
+async def catalog():
+    return await DataService(DATA_DIR).load_catalog()
+
+
+def _previous(*metric_ids: str) -> dict:
+    return {**LLM_RESULT, "metric_ids": list(metric_ids)}
+
+
+class TestRefinementEngine:
+    """Tests for local quick-reply refinements."""
+
+    @pytest.mark.parametrize(
+        "message,operation",
+        [
+            ("Make it cheaper", "cheaper"),
+            ("  make it CHEAPER! ", "cheaper"),
+            ("Add more safety metrics", "add_safety"),
+            ("Make it cheaper but keep hallucination checks", None),
+            ("What about code?", None),
+        ],
+    )
+    def test_only_known_phrasings_match(self, message, operation):
+        """Test that free-form follow-ups are left to the LLM."""
+        assert RefinementEngine().match(message) == operation
+
+    @pytest.mark.asyncio
+    async def test_cheaper_swaps_high_cost_metrics_within_category(self, catalog):
+        """Test that a High-cost metric is replaced by the cheapest one of its category."""
+        refined = RefinementEngine().refine(
+            "Make it cheaper", _previous("met-004", "met-005"), catalog
+        )
+
+        assert refined["metric_ids"] == ["met-017", "met-005"]
+        assert refined["reason"] == (
+            "Swapped Hallucination Rate (High cost) for Refusal Rate (Low cost)."
+        )
+        assert refined["scenario_id"] == LLM_RESULT["scenario_id"]
+        assert refined["intent"] == LLM_RESULT["intent"]
+
+    @pytest.mark.asyncio
+    async def test_cheaper_keeps_metrics_without_alternative(self, catalog):
+        """Test the explanation when no cheaper metric of the category is left."""
+        engine = RefinementEngine()
+        refined = engine.refine("Make it cheaper", _previous("met-007", "met-016"), catalog)
+        assert refined["metric_ids"] == ["met-007", "met-016"]
+        assert refined["reason"].startswith("Kept Code Execution Pass Rate")
+
+        refined = engine.refine("Make it cheaper", _previous("met-001"), catalog)
+        assert refined["reason"] == "All selected metrics are already Low or Medium cost."
+
+    @pytest.mark.asyncio
+    async def test_add_safety_adds_cheapest_unselected_safety_metrics(self, catalog):
+        """Test that Safety metrics not yet selected are added, cheapest first."""
+        engine = RefinementEngine()
+        refined = engine.refine("Add more safety metrics", _previous("met-004", "met-005"), catalog)
+        assert refined["metric_ids"] == ["met-004", "met-005", "met-017", "met-006"]
+        assert refined["reason"] == (
+            "Added Refusal Rate and Bias Detector for broader safety coverage."
+        )
+
+        every_safety = [m.id for m in catalog.find_metrics("Safety")]
+        refined = engine.refine("Add more safety metrics", _previous(*every_safety), catalog)
+        assert refined["metric_ids"] == every_safety
+        assert refined["reason"] == "All Safety metrics are already included."
+
+
+class TestChatServiceRefinement:
+    """Tests for refinements in ChatService.process_message."""
+
+    @pytest.mark.asyncio
+    async def test_quick_reply_skips_llm(self, chat_service):
+        """Test that a quick reply in a session is answered locally from the previous result."""
+        first = await chat_service.process_message("Test my RAG agent", start_session=True)
+        response = await chat_service.process_message(
+            "Make it cheaper", session_id=first.session_id
+        )
+
+        chat_service.agent.extract_result.assert_awaited_once()
+        assert [m.id for m in response.recommendation.metrics] == ["met-005", "met-017"]
+        assert response.recommendation.reason.startswith("Swapped Hallucination Rate")
+        assert chat_service.stats()["paths"]["refinement"]["count"] == 1
+
+        again = await chat_service.process_message(
+            "Add more safety metrics", session_id=first.session_id
+        )
+        assert [m.id for m in again.recommendation.metrics] == [
+            "met-004",
+            "met-005",
+            "met-006",
+            "met-017",
+        ]
+        chat_service.agent.extract_result.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_quick_reply_without_session_state_uses_llm(self, chat_service):
+        """Test that a refinement with nothing to refine still goes to the LLM."""
+        await chat_service.process_message("Make it cheaper")
+        chat_service.agent.extract_result.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_refinement_can_be_disabled(self, chat_service, monkeypatch):
+        """Test that with refinement off every follow-up reaches the LLM."""
+        monkeypatch.setattr(settings, "refinement_enabled", False)
+        first = await chat_service.process_message("Test my RAG agent", start_session=True)
+        await chat_service.process_message("Make it cheaper", session_id=first.session_id)
+        assert chat_service.agent.extract_result.await_count == 2
@@ -0,0 +1,107 @@
+import pytest
+
+from app.services.response_cache import ResponseCache, normalize_message
+from tests.fixtures import chat_service, LLM_RESULT
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResponseCache:
+    """Tests for the LRU + TTL response cache."""
+
+    def test_normalize_message_folds_case_and_whitespace(self):
+        """Test that trivial phrasing variants share a key."""
+        assert normalize_message("  Test my   RAG\nagent ") == "test my rag agent"
+        assert ResponseCache.make_key("Test MY rag agent", "v1") == ResponseCache.make_key(
+            "test my rag   agent", "v1"
+        )
+
+    def test_hit_and_miss_counters(self):
+        """Test that hits and misses are counted and copies are returned."""
+        cache = ResponseCache()
+        key = ResponseCache.make_key("hello", "v1")
+        assert cache.get(key) is None
+        cache.set(key, {"metric_ids": ["a"]})
+        cached = cache.get(key)
+        cached["metric_ids"].append("b")
+        assert cache.get(key) == {"metric_ids": ["a"]}
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        a, b, c = (ResponseCache.make_key(m, "v1") for m in "abc")
+        cache.set(a, {"x": 1})
+        cache.set(b, {"x": 2})
+        cache.get(a)
+        cache.set(c, {"x": 3})
+        assert cache.get(b) is None
+        assert cache.get(a) == {"x": 1}
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL."""
+        clock = FakeClock()
+        cache = ResponseCache(ttl_seconds=10, clock=clock)
+        key = ResponseCache.make_key("a", "v1")
+        cache.set(key, {"x": 1})
+        clock.now = 9.9
+        assert cache.get(key) == {"x": 1}
+        clock.now = 10.0
+        assert cache.get(key) is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_new_catalog_version_invalidates_entries(self):
+        """Test that a catalog change drops every entry for the old version."""
+        cache = ResponseCache()
+        cache.set(ResponseCache.make_key("a", "v1"), {"x": 1})
+        assert cache.get(ResponseCache.make_key("a", "v2")) is None
+        assert len(cache) == 0
+        assert cache.stats()["invalidations"] == 1
+
+    def test_late_writes_for_old_versions_are_ignored(self):
+        """Test that a result or lookup for a superseded version leaves the cache intact."""
+        cache = ResponseCache()
+        cache.set(ResponseCache.make_key("a", "v1"), {"x": 1})
+        cache.set(ResponseCache.make_key("a", "v2"), {"x": 2})
+        assert cache.stats()["invalidations"] == 1
+
+        cache.set(ResponseCache.make_key("b", "v1"), {"x": 3})
+        assert cache.get(ResponseCache.make_key("a", "v1")) is None
+        assert cache.get(ResponseCache.make_key("a", "v2")) == {"x": 2}
+        assert len(cache) == 1
+        assert cache.stats()["stale_writes"] == 1
+        assert cache.stats()["invalidations"] == 1
+
+
+class TestChatServiceResponseCache:
+    """Tests for response caching in ChatService.process_message."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_message_skips_llm(self, chat_service):
+        """Test that a normalized repeat is served from cache."""
+        first = await chat_service.process_message("Test my RAG agent for safety")
+        second = await chat_service.process_message("test my rag   agent for SAFETY")
+
+        assert chat_service.agent.extract_result.await_count == 1
+        assert first == second
+        assert second.recommendation.dataset.id == LLM_RESULT["dataset_id"]
+        assert [m.id for m in second.recommendation.metrics] == LLM_RESULT["metric_ids"]
+        assert chat_service.stats()["response_cache"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_catalog_change_invalidates_cache(self, chat_service):
+        """Test that a new catalog version forces a fresh LLM call."""
+        await chat_service.process_message("Test my RAG agent")
+        catalog = await chat_service.data_service.load_catalog()
+        chat_service.data_service._catalog = type(catalog)(*catalog.collections, version="other")
+        await chat_service.process_message("Test my RAG agent")
+
+        assert chat_service.agent.extract_result.await_count == 2
@@ -0,0 +1,92 @@
+import json
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.recommendation import ChatResponse, Recommendation
+from app.services.chat_service import get_chat_service
+from app.services.data_service import DataService
+from app.services.response_encoder import ResponseEncoder
+from tests.fixtures import chat_service, LLM_RESULT, DATA_DIR
+
+
+@pytest.fixture
+async def catalog():
+    return await DataService(DATA_DIR).load_catalog()
+
+
+def _response(catalog, metric_ids, content='Done — "quoted" ✓') -> ChatResponse:
+    return ChatResponse(
+        content=content,
+        recommendation=Recommendation(
+            dataset=catalog.datasets[0],
+            metrics=catalog.get_metrics(metric_ids),
+            agent=catalog.agents[0],
+            scenario=catalog.scenarios[0],
+            reason="Because\nreasons",
+        ),
+        quick_replies=["Make it cheaper", "Looks good"],
+    )
+
+
+class TestResponseEncoder:
+    """Tests for splicing pre-serialized catalog entries into ChatResponse JSON."""
+
+    @pytest.mark.asyncio
+    async def test_matches_model_dump_json(self, catalog):
+        """Test byte-identical output with and without a recommendation."""
+        encoder = ResponseEncoder()
+        metric_ids = [m.id for m in catalog.metrics]
+        for response in (
+            _response(catalog, metric_ids),
+            _response(catalog, []),
+            ChatResponse(content="Which agent?", recommendation=None, quick_replies=[]),
+        ):
+            assert encoder.encode(response, catalog) == response.model_dump_json().encode()
+
+    @pytest.mark.asyncio
+    async def test_entries_cached_per_catalog_version(self, catalog):
+        """Test that entries are reused within a version and dropped on a new one."""
+        encoder = ResponseEncoder()
+        response = _response(catalog, ["met-001", "met-002"])
+        encoder.encode(response, catalog)
+        assert encoder.stats()["misses"] == 5
+        encoder.encode(response, catalog)
+        assert encoder.stats()["hits"] == 5
+        assert encoder.stats()["entries"] == 5
+
+        newer = type(catalog)(*catalog.collections, version="other")
+        encoder.encode(_response(newer, ["met-001"]), newer)
+        assert encoder.stats()["version"] == "other"
+        assert encoder.stats()["entries"] == 4
+
+    @pytest.mark.asyncio
+    async def test_cache_bounded(self, catalog):
+        """Test that the cache is cleared rather than growing past its cap."""
+        encoder = ResponseEncoder(max_entries=3)
+        encoder.encode(_response(catalog, [m.id for m in catalog.metrics]), catalog)
+        assert encoder.stats()["entries"] <= 3
+
+
+class TestChatEndpointEncoding:
+    """Tests for the JSON body served by POST /api/chat."""
+
+    @pytest.mark.asyncio
+    async def test_chat_endpoint_body(self, chat_service):
+        """Test that the spliced body parses to the same response as process_message."""
+        app.dependency_overrides[get_chat_service] = lambda: chat_service
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post("/api/chat", json={"message": "Test my RAG agent"})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        expected = await chat_service.process_message("Test my RAG agent")
+        assert response.json() == json.loads(expected.model_dump_json())
+        assert response.json()["recommendation"]["dataset"]["id"] == LLM_RESULT["dataset_id"]
+        assert chat_service.stats()["response_encoder"]["misses"] > 0
@@ -0,0 +1,133 @@
+import re
+
+import pytest
+
+from app.agents.retrieval import BM25Index, CatalogRetriever, index_terms
+from app.agents.text import estimate_tokens
+from app.config import settings
+from app.models.catalog import Catalog
+from app.services.data_service import DataService
+from tests.fixtures import (
+    DATA_DIR,
+    evaluation_agent,
+    mock_agents,
+    mock_datasets,
+    mock_metrics,
+    mock_scenarios,
+)
+
+
+class TestBM25Index:
+    """Tests for the lexical retrieval index."""
+
+    def test_ranks_by_term_rarity_and_frequency(self):
+        """Test that rarer and repeated query terms rank a document higher."""
+        index = BM25Index(
+            [
+                index_terms("python code benchmark"),
+                index_terms("code review code quality"),
+                index_terms("customer support"),
+            ]
+        )
+
+        assert [p for p, _ in index.search(index_terms("python code"), 3)] == [0, 1]
+        assert index.search(index_terms("unrelated words"), 3) == []
+
+    def test_plurals_match_singulars(self):
+        """Test that simple plurals are folded onto the singular term."""
+        assert index_terms("Metrics hallucinations class") == ["metric", "hallucination", "class"]
+
+
+class TestCatalogRetriever:
+    """Tests for per-request top-k catalog selection."""
+
+    @pytest.mark.asyncio
+    async def test_selects_relevant_entries_in_catalog_order(self):
+        """Test that the top-k entries match the message and stay in catalog order."""
+        catalog = await DataService(DATA_DIR).load_catalog()
+        selection = CatalogRetriever(catalog).select("Evaluate SQL and python coding", 3)
+
+        dataset_ids = [d.id for d in selection.datasets]
+        assert len(dataset_ids) == 3
+        assert {"ds-002", "ds-010"} <= set(dataset_ids)
+        assert dataset_ids == sorted(dataset_ids)
+        assert "scn-003" in [s.id for s in selection.scenarios]
+        assert selection.agents == catalog.agents
+
+    @pytest.mark.asyncio
+    async def test_selected_scenarios_bring_their_metrics(self):
+        """Test that recommended metrics of selected scenarios are always in the context."""
+        catalog = await DataService(DATA_DIR).load_catalog()
+        selection = CatalogRetriever(catalog).select("jailbreak safety", 1)
+
+        assert [s.id for s in selection.scenarios] == ["scn-004"]
+        assert {"met-005", "met-017", "met-018"} <= {m.id for m in selection.metrics}
+
+
+class TestRetrievalPrompt:
+    """Tests for the retrieval-based system prompt."""
+
+    @pytest.mark.asyncio
+    async def test_large_catalog_gets_top_k_context(self, evaluation_agent, monkeypatch):
+        """Test that only the top-k datasets reach the prompt when the catalog is larger."""
+        monkeypatch.setattr(settings, "context_top_k", 3)
+        monkeypatch.setattr(settings, "context_retrieval_min_tokens", 0)
+        catalog = await DataService(DATA_DIR).load_catalog()
+
+        message = await evaluation_agent.system_message_for("python coding benchmark", catalog)
+        full = evaluation_agent.get_system_message(catalog)
+
+        assert len(re.findall(r"- ds-\d+", message)) == 3
+        assert "ds-002" in message
+        assert estimate_tokens(message) < estimate_tokens(full)
+        retriever = await evaluation_agent.get_retriever(catalog)
+        assert await evaluation_agent.get_retriever(catalog) is retriever
+
+    @pytest.mark.asyncio
+    async def test_small_catalog_shares_full_prompt(
+        self, evaluation_agent, mock_datasets, mock_metrics, mock_scenarios, mock_agents
+    ):
+        """Test that catalogs within k keep the memoized, cache-friendly full prompt."""
+        catalog = Catalog(mock_datasets, mock_metrics, mock_scenarios, mock_agents, version="v1")
+
+        message = await evaluation_agent.system_message_for("anything", catalog)
+
+        assert message is evaluation_agent.get_system_message(catalog)
+
+    @pytest.mark.asyncio
+    async def test_bundled_catalog_shares_full_prompt(self, evaluation_agent):
+        """Test that with default settings the bundled catalog keeps the memoized prompt."""
+        catalog = await DataService(DATA_DIR).load_catalog()
+        assert len(catalog.metrics) > settings.context_top_k
+
+        await evaluation_agent.prepare(catalog)
+        message = await evaluation_agent.system_message_for("python coding benchmark", catalog)
+
+        assert message is evaluation_agent.get_system_message(catalog)
+        assert evaluation_agent._retriever is None
+
+    @pytest.mark.asyncio
+    async def test_retrieval_gate_does_not_render_full_prompt(self, evaluation_agent, monkeypatch):
+        """Test that deciding on retrieval uses the size estimate, not the full prompt."""
+        monkeypatch.setattr(settings, "context_top_k", 3)
+        monkeypatch.setattr(settings, "context_retrieval_min_tokens", 0)
+        catalog = await DataService(DATA_DIR).load_catalog()
+
+        await evaluation_agent.prepare(catalog)
+        await evaluation_agent.system_message_for("python coding benchmark", catalog)
+
+        assert evaluation_agent._system_message is None
+        estimate = evaluation_agent.estimate_context_tokens(catalog)
+        actual = estimate_tokens(evaluation_agent.get_system_message(catalog))
+        assert abs(estimate - actual) <= 0.1 * actual
+
+    @pytest.mark.asyncio
+    async def test_disabled_retrieval_sends_full_catalog(self, evaluation_agent, monkeypatch):
+        """Test that turning retrieval off restores the full-catalog prompt."""
+        monkeypatch.setattr(settings, "context_retrieval_enabled", False)
+        monkeypatch.setattr(settings, "context_top_k", 1)
+        catalog = await DataService(DATA_DIR).load_catalog()
+
+        message = await evaluation_agent.system_message_for("python", catalog)
+
+        assert message == evaluation_agent.get_system_message(catalog)
@@ -0,0 +1,190 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from app.agents.llm_client import LLMError
+from app.config import settings
+from app.main import app
+from app.services.chat_service import get_chat_service
+from app.services.data_service import DataService
+from app.services.session_store import SessionStore
+from tests.fixtures import DATA_DIR, LLM_RESULT, chat_service, evaluation_agent
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSessionStore:
+    """Tests for the LRU + TTL session store."""
+
+    def test_unknown_id_starts_a_fresh_session(self):
+        """Test that an unknown id is not adopted but replaced by a new one."""
+        store = SessionStore()
+        session = store.get_or_create("made-up")
+        assert session.id != "made-up"
+        assert store.get_or_create(session.id) is session
+        assert store.stats()["created"] == 1 and store.stats()["resumed"] == 1
+
+    def test_lru_eviction(self):
+        """Test that the least recently used session is evicted first."""
+        store = SessionStore(max_entries=2)
+        a, b = store.get_or_create(None), store.get_or_create(None)
+        store.get(a.id)
+        c = store.get_or_create(None)
+        assert store.get(b.id) is None
+        assert store.get(a.id) is a and store.get(c.id) is c
+        assert store.stats()["evictions"] == 1
+
+    def test_idle_sessions_expire(self):
+        """Test that a session expires once it has been idle for the TTL."""
+        clock = FakeClock()
+        store = SessionStore(ttl_seconds=10, clock=clock)
+        session = store.get_or_create(None)
+        clock.now = 9
+        assert store.get(session.id) is session
+        clock.now = 18
+        assert store.get(session.id) is session
+        clock.now = 28
+        assert store.get(session.id) is None
+        assert store.stats()["expirations"] == 1
+
+    def test_state_stays_bounded(self):
+        """Test that the rendered state keeps only the last turns, each shortened."""
+        session = SessionStore(max_turns=3, summary_chars=20).get_or_create(None)
+        assert session.render() is None
+        for i in range(10):
+            session.record(f"turn {i} " + "with a long tail " * 5, dict(LLM_RESULT))
+
+        state = session.render()
+        assert "intent: rag_safety" in state
+        assert "metrics=met-004,met-005" in state
+        assert "turn 9" in state and "turn 6" not in state
+        assert all(len(s) <= 20 for s in session.summaries)
+
+
+class TestFollowUps:
+    """Tests for multi-turn chat through ChatService."""
+
+    @pytest.mark.asyncio
+    async def test_follow_up_sends_compact_state(self, chat_service):
+        """Test that a follow-up reaches the LLM with the session state of the first turn."""
+        first = await chat_service.process_message(
+            "Test my RAG agent for safety", start_session=True
+        )
+        assert first.session_id
+        assert chat_service.agent.extract_result.call_args.kwargs["state"] is None
+
+        second = await chat_service.process_message(
+            "Focus on hallucinations instead", session_id=first.session_id
+        )
+        assert second.session_id == first.session_id
+        state = chat_service.agent.extract_result.call_args.kwargs["state"]
+        assert "scenario=scn-004" in state
+        assert "Test my RAG agent for safety" in state
+
+    @pytest.mark.asyncio
+    async def test_follow_ups_skip_fast_path_and_are_cached_per_state(
+        self, chat_service, monkeypatch
+    ):
+        """Test that follow-ups go to the LLM and do not share cache entries across sessions."""
+        monkeypatch.setattr(settings, "fast_path_enabled", True)
+        await chat_service.prepare_catalog()
+        first = await chat_service.process_message(
+            "Evaluate python coding ability", start_session=True
+        )
+        chat_service.agent.extract_result.assert_not_awaited()
+
+        await chat_service.process_message(
+            "Evaluate python coding ability", session_id=first.session_id
+        )
+        chat_service.agent.extract_result.assert_awaited_once()
+
+        other = await chat_service.process_message(
+            "Test my RAG agent for safety and hallucinations", start_session=True
+        )
+        await chat_service.process_message(
+            "Evaluate python coding ability", session_id=other.session_id
+        )
+        assert chat_service.agent.extract_result.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stateless_messages_start_no_sessions(self, chat_service):
+        """Test that a message without a session id or opt-in stays stateless."""
+        first = await chat_service.process_message("Test my RAG agent")
+        second = await chat_service.process_message("Test my RAG agent")
+
+        assert first.session_id is None and first == second
+        assert chat_service.stats()["sessions"]["created"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_message_stores_no_session(self, chat_service):
+        """Test that a session is only stored once its first message is answered."""
+        chat_service.agent.extract_result.side_effect = LLMError("LLM down")
+        with pytest.raises(LLMError):
+            await chat_service.process_message("Test my RAG agent", start_session=True)
+        with pytest.raises(LLMError):
+            await chat_service.process_message("Test my RAG agent", session_id="expired")
+
+        sessions = chat_service.stats()["sessions"]
+        assert sessions["size"] == 0 and sessions["created"] == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_messages_start_no_sessions(self, chat_service):
+        """Test that batch processing leaves the session store untouched."""
+        async for _ in chat_service.process_batch(["a", "b", "c"]):
+            pass
+        assert chat_service.stats()["sessions"]["created"] == 0
+
+    @pytest.mark.asyncio
+    async def test_chat_endpoint_round_trips_session_id(self, chat_service):
+        """Test that /api/chat returns a session id that continues the conversation."""
+        app.dependency_overrides[get_chat_service] = lambda: chat_service
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                first = await client.post(
+                    "/api/chat", json={"message": "Test my RAG agent", "start_session": True}
+                )
+                session_id = first.json()["session_id"]
+                second = await client.post(
+                    "/api/chat", json={"message": "Make it cheaper", "session_id": session_id}
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert second.json()["session_id"] == session_id
+        assert chat_service.stats()["sessions"]["resumed"] == 1
+
+
+class TestFollowUpPromptSize:
+    """Tests for the size of follow-up prompts."""
+
+    @pytest.mark.asyncio
+    async def test_prompt_size_stays_flat(self, evaluation_agent, monkeypatch):
+        """Test that the prompt stops growing once the summary window is full."""
+        monkeypatch.setattr(settings, "context_retrieval_enabled", False)
+        catalog = await DataService(DATA_DIR).load_catalog()
+        evaluation_agent.client = MagicMock()
+        evaluation_agent.client.create_chat_completion = AsyncMock(
+            return_value={"choices": [{"message": {"content": json.dumps(LLM_RESULT)}}]}
+        )
+        session = SessionStore(max_turns=3).get_or_create(None)
+
+        sizes = []
+        for turn in range(12):
+            message = f"Follow-up number {turn:02d}: add more safety metrics please"
+            await evaluation_agent.extract_result(message, catalog, state=session.render())
+            sizes.append(evaluation_agent.prompt_stats()["last_tokens"])
+            session.record(message, dict(LLM_RESULT))
+
+        assert len(set(sizes[4:])) == 1
+        messages = evaluation_agent.client.create_chat_completion.call_args.kwargs["messages"]
+        assert messages[1]["content"].startswith("CONVERSATION STATE:")
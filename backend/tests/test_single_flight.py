@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+from tests.fixtures import chat_service
+
+
+class TestSingleFlight:
+    """Tests for in-flight request coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that identical concurrent keys run the work once."""
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "done"
+
+        waiters = [asyncio.create_task(flight.do("k", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*waiters) == ["done"] * 5
+        assert calls == 1
+        assert flight.stats() == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_waiter(self):
+        """Test that the shared exception is raised in all callers."""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(flight.do("k", work) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelling_one_waiter_keeps_shared_call(self):
+        """Test that a cancelled waiter does not cancel the others."""
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return 42
+
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await second == 42
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_new_call_after_completion(self):
+        """Test that a finished key starts fresh work on the next call."""
+        flight = SingleFlight()
+
+        async def work():
+            return 1
+
+        await flight.do("k", work)
+        await flight.do("k", work)
+        assert flight.stats()["leaders"] == 2
+
+
+class TestChatServiceCoalescing:
+    """Tests for single-flight in ChatService.process_message."""
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_messages_share_llm_call(self, chat_service):
+        """Test that N identical concurrent messages make one LLM call."""
+        extract = chat_service.agent.extract_result
+        release = asyncio.Event()
+
+        async def slow_extract(*args, **kwargs):
+            await release.wait()
+            return await extract(*args, **kwargs)
+
+        chat_service.agent.extract_result = slow_extract
+        tasks = [
+            asyncio.create_task(chat_service.process_message("Test my RAG agent  for safety"))
+            for _ in range(4)
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        responses = await asyncio.gather(*tasks)
+
+        assert extract.await_count == 1
+        assert len({r.recommendation.dataset.id for r in responses}) == 1
+        assert chat_service.stats()["single_flight"]["coalesced"] == 3
@@ -0,0 +1,113 @@
+import json
+
+import httpx
+import pytest
+
+from app.agents.json_stream import IncrementalJSONObjectParser
+from app.agents.llm_client import LLMClient
+from app.main import app
+from app.services.chat_service import get_chat_service
+from tests.fixtures import chat_service, LLM_RESULT
+
+
+def _sse_body(content: str, chunk_size: int = 7) -> bytes:
+    lines = []
+    for i in range(0, len(content), chunk_size):
+        event = {"choices": [{"index": 0, "delta": {"content": content[i : i + chunk_size]}}]}
+        lines.append(f"data: {json.dumps(event)}\n\n")
+    lines.append("data: [DONE]\n\n")
+    return "".join(lines).encode()
+
+
+def _parse_sse(text: str) -> list:
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestIncrementalJSONObjectParser:
+    """Tests for incremental top-level field parsing."""
+
+    def test_fields_complete_as_chunks_arrive(self):
+        """Test that each field is emitted once its value is complete."""
+        parser = IncrementalJSONObjectParser()
+        assert parser.feed('```json\n{"intent": "rag_sa') == []
+        assert parser.feed('fety", "metric_ids": ["a",') == [("intent", "rag_safety")]
+        assert parser.feed(' "b"], "reason": "x, } y"}\n```') == [
+            ("metric_ids", ["a", "b"]),
+            ("reason", "x, } y"),
+        ]
+        assert parser.done
+
+    def test_nested_values_and_escapes(self):
+        """Test that nested containers and escaped quotes do not end a value early."""
+        text = json.dumps({'k"ey': {"a": [1, {"b": "]"}]}, "n": 2})
+        parser = IncrementalJSONObjectParser()
+        fields = [f for ch in text for f in parser.feed(ch)]
+        assert fields == [('k"ey', {"a": [1, {"b": "]"}]}), ("n", 2)]
+
+    def test_invalid_value_raises(self):
+        """Test that malformed values raise ValueError."""
+        with pytest.raises(ValueError, match="intent"):
+            IncrementalJSONObjectParser().feed('{"intent": rag}')
+
+
+class TestChatStreamEndpoint:
+    """Tests for POST /api/chat/stream."""
+
+    @pytest.mark.asyncio
+    async def test_emits_field_events_then_done(self, chat_service):
+        """Test event order and resolved catalog objects for a streamed completion."""
+        content = json.dumps(LLM_RESULT)
+        chat_service.agent.client = LLMClient(
+            base_url="http://stub",
+            api_key="k",
+            transport=httpx.MockTransport(
+                lambda r: httpx.Response(
+                    200, content=_sse_body(content), headers={"content-type": "text/event-stream"}
+                )
+            ),
+        )
+        app.dependency_overrides[get_chat_service] = lambda: chat_service
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/api/chat/stream", json={"message": "Test my RAG agent for safety"}
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(response.text)
+        names = [name for name, _ in events]
+        assert names == ["intent", "dataset", "metrics", "scenario", "agent", "reason", "done"]
+        data = dict(events)
+        assert data["dataset"]["dataset"]["id"] == "ds-001"
+        assert [m["id"] for m in data["metrics"]["metrics"]] == LLM_RESULT["metric_ids"]
+        assert data["done"]["recommendation"]["scenario"]["id"] == "scn-004"
+        assert chat_service.stats()["response_cache"]["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_becomes_error_event(self, chat_service):
+        """Test that upstream failures are reported as an error event."""
+        chat_service.agent.client = LLMClient(
+            base_url="http://stub",
+            api_key="k",
+            transport=httpx.MockTransport(lambda r: httpx.Response(503, text="down")),
+        )
+        app.dependency_overrides[get_chat_service] = lambda: chat_service
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post("/api/chat/stream", json={"message": "hello"})
+        finally:
+            app.dependency_overrides.clear()
+
+        events = _parse_sse(response.text)
+        assert events[-1][0] == "error"
+        assert events[-1][1]["status_code"] == 400